@@ -0,0 +1,370 @@
+#! /usr/bin/env python3
+
+__copyright__ = "(C) 2017-2024 Guido Draheim, licensed under the Apache License 2.0"""
+__version__ = "1.6.3321"
+
+from typing import Optional, Union, Dict, List, Any, Callable
+from tabtotext import JSONList, JSONDict
+from datetime import date as Date
+from datetime import datetime as Time
+from fnmatch import fnmatchcase as fnmatch
+import tabtotext
+import random
+import time
+import json
+import sys
+import os
+
+import logging
+logg = logging.getLogger("BENCH")
+ROWS = 1000000
+COLS = 10
+SPARSE = 0.1
+SEED = 1234
+WORKERS = 4
+
+def make_table(rows: int, seed: int = SEED) -> JSONList:
+    """ some columns that need sorting over mixed types (with some None) """
+    rand = random.Random(seed)
+    data: JSONList = []
+    for num in range(rows):
+        item: JSONDict = {}
+        item["a"] = rand.choice(["x", "y", "z", None])
+        item["b"] = rand.randint(-1000, 100000)
+        item["c"] = Date(2020, 1, 1 + num % 28)
+        item["d"] = rand.random() * 1000
+        item["e"] = "item%i" % rand.randint(0, rows)
+        data.append(item)
+    return data
+
+def make_shape(rows: int, cols: int = COLS, sparse: float = SPARSE, seed: int = SEED) -> JSONList:
+    """ columns cycling through int, float, date and str (with some None) where a 'sparse'
+        part of the cells is missing from the rows """
+    rand = random.Random(seed)
+    names = ["c%i" % col for col in range(cols)]
+    data: JSONList = []
+    for num in range(rows):
+        item: JSONDict = {}
+        for col, name in enumerate(names):
+            if sparse and rand.random() < sparse:
+                continue
+            kind = col % 4
+            if rand.random() < 0.05:
+                item[name] = None
+            elif kind == 0:
+                item[name] = rand.randint(-1000, 100000)
+            elif kind == 1:
+                item[name] = round(rand.random() * 1000, 3)
+            elif kind == 2:
+                item[name] = Date(2020, 1 + num % 12, 1 + num % 28)
+            else:
+                item[name] = "item%i" % rand.randint(0, rows)
+        data.append(item)
+    return data
+
+def peak_rss() -> int:
+    """ the high-water mark of the resident memory of this process in bytes """
+    try:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    except ImportError:
+        return 0
+
+class TabToTextBench:
+    def __init__(self, rows: int = ROWS, cols: int = COLS, sparse: float = SPARSE) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.sparse = sparse
+        self.results: Dict[str, float] = {}
+        self.records: List[Dict[str, Any]] = []
+        self.workers = WORKERS
+        self.fork = hasattr(os, "fork")
+    def measured(self, bench: str, name: str, func: Callable[[], int]) -> Dict[str, Any]:
+        """ runs func (returning the bytes written or read) in a forked child, so that
+            the peak RSS is the one of that step (on top of the data already made) """
+        if not self.fork:
+            started = time.perf_counter()
+            size = func()
+            result = {"seconds": time.perf_counter() - started, "bytes": size, "peak_rss": peak_rss()}
+        else:
+            readfd, writefd = os.pipe()
+            pid = os.fork()
+            if not pid:
+                status = 1
+                try:
+                    os.close(readfd)
+                    started = time.perf_counter()
+                    size = func()
+                    result = {"seconds": time.perf_counter() - started, "bytes": size, "peak_rss": peak_rss()}
+                    status = 0
+                except BaseException as e:
+                    result = {"error": "%s: %s" % (type(e).__name__, e)}
+                finally:
+                    try:
+                        os.write(writefd, json.dumps(result).encode("utf-8"))
+                    finally:
+                        os._exit(status)
+            os.close(writefd)
+            with os.fdopen(readfd, "rb") as pipe:
+                text = pipe.read()
+            os.waitpid(pid, 0)
+            result = json.loads(text) if text else {"error": "no result"}
+            if "error" in result:
+                raise RuntimeError("%s %s failed: %s" % (bench, name, result["error"]))
+        seconds = result["seconds"] or 1e-9
+        record = {"bench": bench, "name": name, "rows": self.rows, "cols": self.cols, "sparse": self.sparse,
+                  "seconds": round(seconds, 4), "bytes": result["bytes"],
+                  "rows_per_s": round(self.rows / seconds, 1), "mb_per_s": round(result["bytes"] / seconds / (1024 * 1024), 3),
+                  "peak_rss": result["peak_rss"]}
+        logg.info("%s %s: %.3fs", bench, name, seconds)
+        self.results[name] = seconds
+        self.records.append(record)
+        print("%s: %-16s %i rows x %i cols, %.3fs, %.0f rows/s, %.2f MB/s, peak rss %.0f MB" % (
+            bench, name, self.rows, self.cols, seconds, record["rows_per_s"], record["mb_per_s"],
+            record["peak_rss"] / (1024 * 1024)))
+        return record
+    def save(self, filename: str) -> None:
+        """ the measured records as a json file to be compared across versions """
+        results = {"version": tabtotext.__version__, "python": sys.version.split()[0], "platform": sys.platform,
+                   "records": self.records}
+        with open(filename, "w") as f:
+            json.dump(results, f, indent=1)
+    def timed(self, name: str, func: Callable[[], Any]) -> float:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        logg.info("%s: %.3fs", name, elapsed)
+        self.results[name] = elapsed
+        return elapsed
+    def bench_1001(self) -> None:
+        """ sorting rows by a string key versus a tuple key """
+        data = make_table(self.rows)
+        sorts = ["a", "b", "c", "d", "e"]
+        sortstring = tabtotext.RowSortCallable(sorts, tuples=False)
+        sorttuples = tabtotext.RowSortCallable(sorts, tuples=True)
+        old = self.timed("sorted %i rows by string keys" % self.rows, lambda: sorted(data, key=sortstring))
+        new = self.timed("sorted %i rows by tuple keys" % self.rows, lambda: sorted(data, key=sorttuples))
+        print("bench_1001: sort %i rows, string keys %.3fs, tuple keys %.3fs, speedup %.2fx" % (
+            self.rows, old, new, old / new))
+    def bench_1002(self) -> None:
+        """ formatting cells with per-column formats """
+        data = make_table(self.rows)
+        formats = {"b": "{:>8n}", "c": "{:%Y-%m}", "d": "{:4h}", "e": "{:s}"}
+        format = tabtotext.FormatGFM(formats)
+        def formatting() -> None:
+            for item in data:
+                for name, value in item.items():
+                    format(name, value)
+        cells = self.rows * 5
+        took = self.timed("formatted %i cells" % cells, formatting)
+        print("bench_1002: format %i cells, %.3fs, %.0f cells/s" % (cells, took, cells / took))
+    def bench_1003(self) -> None:
+        """ formatting cells with and without the memo of formatted values """
+        data = make_table(self.rows)
+        formats = {"b": "{:>8n}", "c": "{:%Y-%m}", "d": "{:4h}", "e": "{:s}"}
+        def formatting(format: tabtotext.FormatJSONItem) -> None:
+            for item in data:
+                for name, value in item.items():
+                    format(name, value)
+        cells = self.rows * 5
+        for name in ["FormatGFM", "FormatJSON"]:
+            plain = getattr(tabtotext, name)(formats)
+            memo = getattr(tabtotext, name)(formats)
+            memo.memosize = 1000
+            old = self.timed("%s formatted %i cells" % (name, cells), lambda: formatting(plain))
+            new = self.timed("%s memo formatted %i cells" % (name, cells), lambda: formatting(memo))
+            print("bench_1003: %s %i cells, plain %.0f cells/s, memo %.0f cells/s, speedup %.2fx" % (
+                name, cells, cells / old, cells / new, old / new))
+
+    def bench_1004(self) -> None:
+        """ rendering markdown and csv with and without worker processes """
+        data = make_table(self.rows)
+        headers = ["a", "b:>8n", "c", "d:4h", "e"]
+        for fmt in ["md", "csv"]:
+            old = self.timed("%s rendered %i rows" % (fmt, self.rows), lambda: tabtotext.tabtotext(data, headers, fmt=fmt))
+            new = self.timed("%s rendered %i rows by %i workers" % (fmt, self.rows, self.workers),
+                             lambda: tabtotext.tabtotext(data, headers, fmt=fmt, workers=self.workers))
+            print("bench_1004: %s %i rows, serial %.3fs, %i workers %.3fs, speedup %.2fx" % (
+                fmt, self.rows, old, self.workers, new, old / new))
+    def bench_1005(self) -> None:
+        """ filtering cells by unmatched() versus a compiled FilterCallable """
+        data = make_table(self.rows)
+        conds = {"b": ">=500", "c": "<2020-01-20", "d": "<>3.5", "e": "<item9"}
+        filters = tabtotext.tabfilters(conds)
+        def unmatched() -> None:
+            for item in data:
+                for name, value in item.items():
+                    if name in conds:
+                        tabtotext.unmatched(value, conds[name])
+        def compiled() -> None:
+            for item in data:
+                for name, value in item.items():
+                    if name in filters:
+                        filters[name](value)
+        cells = self.rows * 4
+        old = self.timed("unmatched %i cells" % cells, unmatched)
+        new = self.timed("compiled filter %i cells" % cells, compiled)
+        print("bench_1005: filter %i cells, unmatched %.3fs, compiled %.3fs, speedup %.2fx" % (
+            cells, old, new, old / new))
+    def bench_1006(self) -> None:
+        """ rendering composite free format columns """
+        data = make_table(self.rows)
+        selected = ["{a}-{b:>8}", "{e}/{c}", "{a}:{d} ({b})", "{e} {a} {b}"]
+        took = self.timed("free formats for %i rows" % self.rows, lambda: tabtotext.tabtotext(data, [], selected, fmt="csv"))
+        cells = self.rows * len(selected)
+        print("bench_1006: free format %i cells, %.3fs, %.0f cells/s" % (cells, took, cells / took))
+    def bench_1007(self) -> None:
+        """ writing several formats by separate calls versus one fan-out """
+        import tempfile
+        import shutil
+        data = make_table(self.rows)
+        selected = ["a", "b:>8n", "c", "d:4h", "e", "b>0"]
+        tmp = tempfile.mkdtemp(prefix="bench.")
+        outputs = [tmp + "/output." + ext for ext in ["md", "html", "csv", "json", "yaml"]]
+        def separate() -> None:
+            for output in outputs:
+                tabtotext.print_tabtotext(output, data, [], selected)
+        def fanout() -> None:
+            tabtotext.print_tabtotexts(outputs, data, [], selected)
+        old = self.timed("separate %i outputs of %i rows" % (len(outputs), self.rows), separate)
+        new = self.timed("fan-out %i outputs of %i rows" % (len(outputs), self.rows), fanout)
+        shutil.rmtree(tmp)
+        print("bench_1007: %i outputs of %i rows, separate %.3fs, fan-out %.3fs, speedup %.2fx" % (
+            len(outputs), self.rows, old, new, old / new))
+    def bench_2001(self) -> None:
+        """ writing each output format """
+        import tabxlsx
+        import tempfile
+        import shutil
+        data = make_shape(self.rows, self.cols, self.sparse)
+        tmp = tempfile.mkdtemp(prefix="bench.")
+        def writer(func: Callable[..., str]) -> Callable[[], int]:
+            return lambda: len(func(data).encode("utf-8"))
+        for name, func in [("tabtoGFM", tabtotext.tabtoGFM), ("tabtoHTML", tabtotext.tabtoHTML),
+                           ("tabtoJSON", tabtotext.tabtoJSON), ("tabtoYAML", tabtotext.tabtoYAML),
+                           ("tabtoTOML", tabtotext.tabtoTOML), ("tabtoCSV", tabtotext.tabtoCSV)]:
+            self.measured("bench_2001", name, writer(func))
+        filename = os.path.join(tmp, "output.xlsx")
+        def xlsx() -> int:
+            workbook = tabxlsx.make_tabtoXLSX(data)  # type: ignore[arg-type]
+            tabxlsx.save_workbook(filename, workbook)
+            return os.path.getsize(filename)
+        self.measured("bench_2001", "save_workbook", xlsx)
+        shutil.rmtree(tmp)
+    def bench_2002(self) -> None:
+        """ reading each input format with its DictParser """
+        import tabxlsx
+        import tempfile
+        import shutil
+        data = make_shape(self.rows, self.cols, self.sparse)
+        tmp = tempfile.mkdtemp(prefix="bench.")
+        def reader(parser: tabtotext.DictParser, filename: str) -> Callable[[], int]:
+            def read() -> int:
+                for _ in parser.load(filename):
+                    pass
+                return os.path.getsize(filename)
+            return read
+        for name, fmt, parser in [("DictParserGFM", "md", tabtotext.DictParserGFM()), ("DictParserHTML", "html", tabtotext.DictParserHTML()),
+                                  ("DictParserJSON", "json", tabtotext.DictParserJSON()), ("DictParserYAML", "yaml", tabtotext.DictParserYAML()),
+                                  ("DictParserTOML", "toml", tabtotext.DictParserTOML()), ("DictParserCSV", "csv", tabtotext.DictParserCSV())]:
+            filename = os.path.join(tmp, "input." + fmt)
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(tabtotext.tabtotext(data, fmt=fmt))
+            self.measured("bench_2002", name, reader(parser, filename))
+        filename = os.path.join(tmp, "input.xlsx")
+        tabxlsx.tabtoXLSX(filename, data)  # type: ignore[arg-type]
+        def xlsx() -> int:
+            workbook = tabxlsx.load_workbook(filename)
+            tabxlsx.tabtext_workbook(workbook)
+            return os.path.getsize(filename)
+        self.measured("bench_2002", "load_workbook", xlsx)
+        shutil.rmtree(tmp)
+    def bench_2003(self) -> None:
+        """ reading a markdown table with DictParserGFM, also without the type conversion """
+        import tempfile
+        import shutil
+        data = make_shape(self.rows, self.cols, self.sparse)
+        tmp = tempfile.mkdtemp(prefix="bench.")
+        filename = os.path.join(tmp, "input.md")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(tabtotext.tabtoGFM(data))
+        del data
+        def reader(parser: tabtotext.DictParserGFM) -> Callable[[], int]:
+            def read() -> int:
+                for _ in parser.load(filename):
+                    pass
+                return os.path.getsize(filename)
+            return read
+        self.measured("bench_2003", "DictParserGFM", reader(tabtotext.DictParserGFM()))
+        plain = tabtotext.DictParserGFM()
+        plain.convert.toJSONItem = str  # type: ignore[assignment,method-assign]
+        self.measured("bench_2003", "DictParserGFM/str", reader(plain))
+        shutil.rmtree(tmp)
+    def bench_2004(self) -> None:
+        """ reading a csv table with DictParserCSV, also as raw strings """
+        import tempfile
+        import shutil
+        data = make_shape(self.rows, self.cols, self.sparse)
+        tmp = tempfile.mkdtemp(prefix="bench.")
+        filename = os.path.join(tmp, "input.csv")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(tabtotext.tabtoCSV(data))
+        del data
+        def reader(parser: tabtotext.DictParserCSV) -> Callable[[], int]:
+            def read() -> int:
+                for _ in parser.load(filename):
+                    pass
+                return os.path.getsize(filename)
+            return read
+        self.measured("bench_2004", "DictParserCSV", reader(tabtotext.DictParserCSV()))
+        self.measured("bench_2004", "DictParserCSV/raw", reader(tabtotext.DictParserCSV(raw=True)))
+        shutil.rmtree(tmp)
+    def bench_2005(self) -> None:
+        """ reading a json array with DictParserJSON, at once and as a stream of records """
+        import tempfile
+        import shutil
+        data = make_shape(self.rows, self.cols, self.sparse)
+        tmp = tempfile.mkdtemp(prefix="bench.")
+        filename = os.path.join(tmp, "input.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(tabtotext.tabtoJSON(data))
+        del data
+        def reader(stream: bool) -> Callable[[], int]:
+            def read() -> int:
+                parser = tabtotext.DictParserJSON()
+                for _ in (parser.records(parser.stream(filename)) if stream else parser.load(filename)):
+                    pass
+                return os.path.getsize(filename)
+            return read
+        self.measured("bench_2005", "DictParserJSON", reader(False))
+        self.measured("bench_2005", "DictParserJSON/stream", reader(True))
+        shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    cmdline = OptionParser("%prog bench...")
+    cmdline.add_option("-v", "--verbose", action="count", default=0, help="more verbose logging")
+    cmdline.add_option("-^", "--quiet", action="count", default=0, help="less verbose logging")
+    cmdline.add_option("-n", "--rows", metavar="N", type="int", default=ROWS, help="rows of test data [%default]")
+    cmdline.add_option("-c", "--cols", metavar="N", type="int", default=COLS, help="columns of test shapes [%default]")
+    cmdline.add_option("-s", "--sparse", metavar="F", type="float", default=SPARSE, help="missing cells in test shapes [%default]")
+    cmdline.add_option("-o", "--json", metavar="FILE", default="", help="save the bench_2xxx results as json")
+    cmdline.add_option("--nofork", action="store_true", default=False, help="measure in this process (peak rss is cumulative)")
+    cmdline.add_option("-j", "--workers", metavar="N", type="int", default=WORKERS, help="worker processes [%default]")
+    opt, args = cmdline.parse_args()
+    logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
+    if not args:
+        args = ["bench_*"]
+    bench = TabToTextBench(opt.rows, opt.cols, opt.sparse)
+    bench.workers = opt.workers
+    bench.fork = bench.fork and not opt.nofork
+    for arg in args:
+        if len(arg) > 2 and arg[0].isalpha() and arg[1] == "_":
+            arg = "bench_" + arg[2:]
+        if "*" not in arg: arg += "*"
+        for method in sorted(dir(bench)):
+            if fnmatch(method, arg):
+                getattr(bench, method)()
+    if opt.json:
+        bench.save(opt.json)
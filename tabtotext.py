@@ -14,8 +14,12 @@ and ".dat" files use $IFS as tabulator (like bash 'read').
 __copyright__ = "(C) 2017-2024 Guido Draheim, licensed under the Apache License 2.0"""
 __version__ = "1.6.3321"
 
-from typing import Optional, Union, Dict, List, Any, Sequence, Callable, Type, cast, Tuple, Iterable, Iterator, TextIO, NamedTuple
-from collections import OrderedDict
+from typing import Optional, Union, Dict, List, Any, Sequence, Callable, Type, cast, Tuple, Iterable, Iterator, TextIO, IO, NamedTuple, Mapping, MutableSequence, Deque, Set, AsyncIterable, AsyncIterator
+from collections import OrderedDict, deque
+from operator import itemgetter
+from itertools import islice, chain
+from functools import lru_cache
+from array import array
 from html import escape
 from datetime import date as Date
 from datetime import datetime as Time
@@ -24,8 +28,14 @@ from abc import abstractmethod
 import os
 import sys
 import re
+import string
 import logging
 import json
+import heapq
+import pickle
+import tempfile
+import time
+import tracemalloc
 from io import StringIO, TextIOWrapper
 logg = logging.getLogger("TABTOTEXT")
 
@@ -55,6 +65,24 @@ NIX = ""
 STRLIST: List[str] = []
 COL_SEP = "|"
 TABXLSX = False
+WRITEBATCH = 1000  # lines per write in print_tabtotext
+SORTTUPLES = True  # RowSortCallable returns tuples (or strings)
+SORTROWS = 0  # RowSorter spills sorted runs to temp files beyond that many rows (0 = never)
+SORTMEMORY = 0  # RowSorter spills sorted runs to temp files beyond that many bytes (0 = never)
+SORTBLOCK = 1000  # rows per pickle block in a sorted run
+FORMATMEMO = 0  # formatted values cached per column in the FormatJSONItem classes (0 = off)
+WORKCHUNK = 10000  # rows per chunk when formatting with workers
+DISTINCTMEMORY = 0  # RowDistinct moves the seen rows to a temp database beyond that many bytes (0 = never)
+ASYNCROWS = 1000  # rows queued for the renderer thread of the async functions
+READBUFFER = 1024 * 1024  # bytes per read of the file readers that decode blocks of lines
+JSONSTREAM = 64 * 1024 * 1024  # bytes of a json file above which DictParserJSON.load decodes the array one record at a time without reading the whole text (0 = always)
+SNIFFROWS = 1000  # values per column converted generically before the parsers pick a converter for its type (0 = off)
+SCHEMATYPES = {"string": "str", "text": "str", "integer": "int", "number": "float", "boolean": "bool", "time": "datetime"}  # type names in a schema
+MEMTOP = 10  # allocation sites shown per phase by TabMemProfile
+MEMGROWTH = 2.0  # TabMemProfile takes a new snapshot when the traced memory has grown by that factor
+MEMFLOOR = 1024 * 1024  # TabMemProfile takes no snapshot below that many bytes
+MEMFRAMES = 1  # TabMemProfile frames per trace (with more frames library allocations go to the calling tabto line, but it is much slower)
+MEMMODULES = ["tabtotext.py", "tabtoxlsx.py", "tabxlsx.py"]  # the allocation sites shown by TabMemProfile
 
 JSONData = Union[str, int, float, bool, Date, Time, None]
 
@@ -64,6 +92,7 @@ JSONDict = Dict[str, JSONItem]
 JSONList = List[JSONDict]
 JSONDictList = Dict[str, JSONList]
 JSONDictDict = Dict[str, JSONDict]
+JSONSchema = Mapping[str, Union[str, Type[Any]]]  # column name to type (or type name) for the input parsers
 
 # dataclass support
 
@@ -104,6 +133,130 @@ class TabText(NamedTuple):
     data: JSONList
     headers: List[str]
 
+# columnar tables
+
+class _MissingCell:
+    """ marks a cell of a TabColumns that was not in the row (different from None) """
+    def __repr__(self) -> str:
+        return "<missing>"
+    def __reduce__(self) -> str:
+        return "_Missing"
+
+_Missing = _MissingCell()
+
+_ArrayTypecodes: Dict[Type[Any], str] = {int: "q", float: "d"}
+
+class TabRow(Mapping[str, JSONItem]):
+    """ a row view into a TabColumns - the cell values are not copied """
+    __slots__ = ("table", "num")
+    def __init__(self, table: "TabColumns", num: int) -> None:
+        self.table = table
+        self.num = num
+    def __getitem__(self, name: str) -> JSONItem:
+        value = self.table.columns[name][self.num]
+        if value is _Missing:
+            raise KeyError(name)
+        return cast(JSONItem, value)
+    def __iter__(self) -> Iterator[str]:
+        num = self.num
+        return (name for name, column in self.table.columns.items() if column[num] is not _Missing)
+    def __len__(self) -> int:
+        num = self.num
+        return sum(1 for column in self.table.columns.values() if column[num] is not _Missing)
+    def __contains__(self, name: object) -> bool:
+        column = self.table.columns.get(cast(str, name))
+        return column is not None and column[self.num] is not _Missing
+    def get(self, name: str, default: Any = None) -> Any:
+        column = self.table.columns.get(name)
+        if column is None:
+            return default
+        value = column[self.num]
+        return default if value is _Missing else value
+    def items(self) -> Iterator[Tuple[str, JSONItem]]:  # type: ignore[override]
+        num = self.num
+        for name, column in self.table.columns.items():
+            value = column[num]
+            if value is not _Missing:
+                yield name, value
+    def asdict(self) -> JSONDict:
+        return dict(self.items())
+    def __repr__(self) -> str:
+        return "TabRow(%s)" % self.asdict()
+
+class TabColumns:
+    """ A table stored as one list (or array.array) per column along with the headers.
+        Iterating over it gives TabRow views, so it can be passed as the data
+        of any tabtoXYZ renderer. A cell not in a row is kept as _Missing. """
+    def __init__(self, headers: Sequence[str] = [], columns: Optional[Dict[str, MutableSequence[Any]]] = None) -> None:
+        self.headers: List[str] = list(headers)
+        self.columns: Dict[str, MutableSequence[Any]] = {} if columns is None else columns
+        self.rows = 0
+        for column in self.columns.values():
+            self.rows = max(self.rows, len(column))
+        for name, column in self.columns.items():
+            if len(column) < self.rows:
+                self.columns[name] = list(column) + [_Missing] * (self.rows - len(column))
+    @property
+    def data(self) -> "TabColumns":
+        """ like TabText.data - the rows (views) of the table """
+        return self
+    def __len__(self) -> int:
+        return self.rows
+    def __iter__(self) -> Iterator[TabRow]:
+        return (TabRow(self, num) for num in range(self.rows))
+    def __getitem__(self, num: int) -> TabRow:
+        if num < 0:
+            num += self.rows
+        if num < 0 or num >= self.rows:
+            raise IndexError(num)
+        return TabRow(self, num)
+    def column(self, name: str) -> MutableSequence[Any]:
+        return self.columns[name]
+    def append(self, item: JSONDict) -> None:
+        rows = self.rows
+        columns = self.columns
+        for name, value in item.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = [_Missing] * rows
+            elif isinstance(column, array) and _ArrayTypecodes.get(type(value)) != column.typecode:
+                column = columns[name] = list(column)
+            column.append(value)
+        if len(item) < len(columns):
+            for name, column in columns.items():
+                if len(column) == rows:
+                    if isinstance(column, array):
+                        column = columns[name] = list(column)
+                    column.append(_Missing)
+        self.rows = rows + 1
+    def extend(self, data: Iterable[JSONDict]) -> None:
+        for item in data:
+            self.append(item)
+    def compact(self) -> "TabColumns":
+        """ store columns of only int or only float as array.array """
+        for name, column in self.columns.items():
+            if isinstance(column, array) or not column:
+                continue
+            kind = type(column[0])
+            if kind not in _ArrayTypecodes:
+                continue
+            if all(type(value) is kind for value in column):
+                try:
+                    self.columns[name] = array(_ArrayTypecodes[kind], column)
+                except OverflowError:
+                    pass
+        return self
+    def totabtext(self) -> TabText:
+        return TabText([row.asdict() for row in self], list(self.headers))
+
+def tabcolumns(data: Iterable[JSONDict], headers: Sequence[str] = [], *, compact: bool = False) -> TabColumns:
+    """ converts the rows (or a TabText.data) into a TabColumns """
+    table = TabColumns(headers)
+    table.extend(data)
+    if compact:
+        table.compact()
+    return table
+
 # helper functions
 
 _None_String = "~"
@@ -204,6 +357,136 @@ def unmatched(value: JSONItem, cond: str) -> bool:
         logg.warning("unmatched value %s does not work for cond (*%s)", type(value), cond)
     return False
 
+_FilterOps = ["=~", "<>", "==", "<=", "<", ">=", ">"]
+_FilterTrue = ["1", "True", "true", "yes", "(yes)", "*", "+"]
+_FilterFalse = ["0", "False", "false", "no", "(no)", "", "-", "~"]
+
+def _filternumber(text: str) -> Optional[float]:
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def _filtercompare(op: str, const: Any) -> Callable[[Any], bool]:
+    """ the unmatched test of the op against a pre-converted constant """
+    if op in ["=~", "=="]:
+        return lambda value: bool(value != const)
+    if op == "<>":
+        return lambda value: bool(value == const)
+    if op == "<=":
+        return lambda value: bool(value > const)
+    if op == "<":
+        return lambda value: bool(value >= const)
+    if op == ">=":
+        return lambda value: bool(value < const)
+    if op == ">":
+        return lambda value: bool(value <= const)
+    return lambda value: False
+
+def _filtercompare_eps(op: str, const: Optional[float], eps: float = 0.005) -> Callable[[Any], bool]:
+    """ the unmatched test of the op against a number constant, with an epsilon like in unmatched() """
+    if const is None:
+        return lambda value: False
+    if op == "=~":
+        return lambda value: bool(value - eps > const or const > value + eps)
+    if op == "<>":
+        return lambda value: bool(value - eps < const and const < value + eps)
+    if op == "==":
+        return lambda value: float(value) != const
+    if op == "<=":
+        return lambda value: bool(value - eps > const)
+    if op == "<":
+        return lambda value: bool(value + eps >= const)
+    if op == ">=":
+        return lambda value: bool(value + eps < const)
+    if op == ">":
+        return lambda value: bool(value - eps <= const)
+    return lambda value: False
+
+class FilterCallable:
+    """ compiled form of unmatched(value, cond) - the cond is parsed once and the constant
+        is converted to float, date and str up front, so that a call needs one comparison. """
+    def __init__(self, cond: str) -> None:
+        self.cond = cond
+        self.op = ""
+        for op in _FilterOps:
+            if cond.startswith(op):
+                self.op = op
+                break
+        arg = cond[len(self.op):]
+        boolarg = arg
+        if cond[:2] in ["==", "=~", "<=", ">="] or (cond[:1] in ["<", ">"] and self.op != "<>"):
+            if arg in _FilterTrue:
+                boolarg = "1"
+            if arg in _FilterFalse:
+                boolarg = "0"
+        self.datefmt = DATEFMT
+        self.strtest = _filtercompare(self.op, arg)
+        self.numtest = _filtercompare_eps(self.op, _filternumber(arg))
+        self.booltest = _filtercompare_eps(self.op, _filternumber(boolarg))
+        self.datetest: Optional[Callable[[Any], bool]] = None
+        if self.datefmt == "%Y-%m-%d" and re.match(r"\d\d\d\d-\d\d-\d\d$", arg):
+            try:
+                self.datetest = _filtercompare(self.op, Date.fromisoformat(arg))
+            except ValueError:
+                pass
+    def __call__(self, value: JSONItem) -> bool:
+        kind = value.__class__
+        if kind is str:
+            return self.strtest(value)
+        if kind is int or kind is float:
+            return self.numtest(value)
+        if value is None or value is False or value is True:
+            return self.booltest(1 if value is True else 0)
+        if isinstance(value, Date):
+            if self.datetest is not None and value.year >= 1000:
+                return self.datetest(value.date() if isinstance(value, Time) else value)
+            return self.strtest(value.strftime(self.datefmt))
+        if isinstance(value, (int, float)):
+            return self.numtest(value)
+        return self.strtest(str(value))
+    def __repr__(self) -> str:
+        return "FilterCallable(%r)" % self.cond
+
+def tabfilters(filtered: Dict[str, str]) -> Dict[str, FilterCallable]:
+    """ compiles the TabSpec.filtered conds of each column """
+    return dict((name, FilterCallable(cond)) for name, cond in filtered.items())
+
+def tab_filters_from(conds: Union[str, Sequence[str], Dict[str, str]]) -> Dict[str, str]:
+    """ the 'name<cond', 'name>cond' and 'name=cond' selections (like in tabspec) as TabSpec.filtered """
+    if isinstance(conds, dict):
+        return conds
+    if isinstance(conds, str):
+        conds = conds.split(",")
+    filtered: Dict[str, str] = {}
+    for cond in conds:
+        for selcol in cond.split("|"):
+            part = selcol.split("@", 1)[0].split(":", 1)[0]
+            for op in ["<", ">", "="]:
+                if op in part:
+                    name, arg = part.split(op, 1)
+                    filtered[name] = op + arg
+                    break
+    return filtered
+
+class RowFilterCallable:
+    """ true for a row where each of the filtered columns (if present) matches its cond """
+    def __init__(self, conds: Union[str, Sequence[str], Dict[str, str]]) -> None:
+        self.filtered = tab_filters_from(conds)
+        self.unmatched = tabfilters(self.filtered)
+    def __call__(self, item: JSONDict) -> bool:
+        for name, unmatched in self.unmatched.items():
+            if name in item and unmatched(item[name]):
+                return False
+        return True
+
+def tabfilter(data: Iterable[JSONDict], conds: Union[str, Sequence[str], Dict[str, str]]) -> Iterator[JSONDict]:
+    """ a filter stage that can be put in front of any renderer or after any reader. Note
+        that the row numbers ("#") of a renderer do then count the accepted rows only. """
+    if not conds:
+        return iter(data)
+    return filter(RowFilterCallable(conds), data)
+
 class DictParser:
     @abstractmethod
     def load(self, filename: str) -> Iterator[JSONDict]:
@@ -214,6 +497,25 @@ class DictParser:
         while False:
             yield {}
 
+def _readlines(filename: str, encoding: str = "utf-8") -> Iterator[str]:
+    """ the lines of a file read as blocks of READBUFFER bytes with one decode per block
+        (the line ends are not included, a "\r" before them is kept for strip()) """
+    with open(filename, "rb") as f:
+        rest = b""
+        while True:
+            block = f.read(READBUFFER)
+            if not block:
+                break
+            end = block.rfind(b"\n")
+            if end < 0:
+                rest += block
+                continue
+            text = (rest + block[:end]).decode(encoding)
+            rest = block[end + 1:]
+            yield from text.split("\n")
+        if rest:
+            yield from rest.decode(encoding).split("\n")
+
 class FormatJSONItem:
     @abstractmethod
     def __call__(self, col: str, val: JSONItem) -> str:
@@ -232,6 +534,8 @@ class BaseFormatJSONItem(FormatJSONItem):
         self.formatleft = re.compile("[{]:[^{}]*<[^{}]*[}]")
         self.formatright = re.compile("[{]:[^{}]*>[^{}]*[}]")
         self.formatnumber = re.compile("[{]:[^{}]*[defghDEFGHMQR$%][}]")
+        self.formatters: Dict[str, Callable[[JSONItem], str]] = {}
+        self.memosize = FORMATMEMO
     def right(self, col: str) -> bool:
         if col in self.formats and not NORIGHT:
             if self.formats[col].startswith(" "):
@@ -246,7 +550,48 @@ class BaseFormatJSONItem(FormatJSONItem):
                 return True
         return False
     def __call__(self, col: str, val: JSONItem) -> str:
-        return self.item(val)
+        formatter = self.formatters.get(col)
+        if formatter is None:
+            formatter = self.formatters[col] = self.memoize(col, self.compile(col))
+        return formatter(val)
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["formatters"] = {}  # compiled again in a worker process
+        return state
+    def compile(self, col: str) -> Callable[[JSONItem], str]:
+        return self.item
+    def memoize(self, col: str, formatter: Callable[[JSONItem], str]) -> Callable[[JSONItem], str]:
+        """ with a 'memosize' the formatted values of a column are cached by (type, value), evicting
+            the older half when full. After evicting as many values as the memo holds, the column
+            is taken to be high-cardinality and it goes back to the plain formatter. """
+        if not self.memosize:
+            return formatter
+        maxsize = max(2, self.memosize)
+        memo: Dict[Tuple[Type[Any], Any], str] = {}
+        evicted = 0
+        def memoized(val: JSONItem) -> str:
+            nonlocal evicted
+            key = (val.__class__, val)
+            try:
+                return memo[key]
+            except KeyError:
+                text = formatter(val)
+            except TypeError:  # unhashable
+                return formatter(val)
+            if val.__class__ is float and (val == 0 or val != val):
+                return text  # -0.0 equals 0.0 and nan never equals itself
+            if len(memo) >= maxsize:
+                if evicted >= maxsize:
+                    logg.debug("column '%s' has too many values for the memo", col)
+                    memo.clear()
+                    self.formatters[col] = formatter
+                    return text
+                for old in list(islice(memo, maxsize // 2)):
+                    del memo[old]
+                evicted += maxsize // 2
+            memo[key] = text
+            return text
+        return memoized
     def item(self, val: JSONItem) -> str:
         return strJSONItem(val, self.datedelim, self.datefmt)
 
@@ -304,6 +649,171 @@ class ParseJSONItem:
         if as_date:
             return Date(int(as_date.group(1)), int(as_date.group(2)), int(as_date.group(3)))
         return val  # str
+    def column(self, sniff: Optional[int] = None, kind: Union[None, str, Type[Any]] = None) -> "SniffJSONItem":
+        """ a converter for the values of one column that infers the column type,
+            unless the type is declared (see 'declared') """
+        if kind:
+            column = SniffJSONItem(self, 0)
+            column.convert = self.declared(kind)
+            return column
+        return SniffJSONItem(self, SNIFFROWS if sniff is None else sniff)
+    def columns(self, sniff: Optional[int] = None, schema: Optional[JSONSchema] = None, raw: bool = False) -> "SniffJSONColumns":
+        """ the converters by column name, made on first use (all "str" when raw) """
+        return SniffJSONColumns(self, sniff, schema, raw)
+    def declared(self, kind: Union[str, Type[Any]]) -> Callable[[str], JSONItem]:
+        """ the converter for a column declared in a schema - the constructor of the type
+            with the generic toJSONItem only for the values it fails on (like "" or None).
+            The values of a "str" column are not converted at all. """
+        name = kind.__name__ if isinstance(kind, type) else SCHEMATYPES.get(kind, kind)
+        generic = self.toJSONItem
+        if name == "str":
+            return str
+        if name == "int":
+            def intvalue(val: str) -> JSONItem:
+                try:
+                    return int(val)
+                except ValueError:
+                    return generic(val)
+            return intvalue
+        if name == "float":
+            def floatvalue(val: str) -> JSONItem:
+                try:
+                    return float(val)
+                except ValueError:
+                    return generic(val)
+            return floatvalue
+        if name == "bool":
+            bools = {self.True_String: True, self.False_String: False, "true": True, "false": False}
+            def boolvalue(val: str) -> JSONItem:
+                try:
+                    return bools[val]
+                except KeyError:
+                    return generic(val)
+            return boolvalue
+        if name == "date":
+            def datevalue(val: str) -> JSONItem:
+                try:
+                    return Date.fromisoformat(val)
+                except ValueError:
+                    return generic(val)
+            return datevalue
+        if name == "datetime":
+            def timevalue(val: str) -> JSONItem:
+                try:
+                    return Time.fromisoformat(val)
+                except ValueError:
+                    return generic(val)
+            return timevalue
+        logg.error("unknown schema type '%s' (using the generic conversion)", kind)
+        return generic
+
+class SniffJSONItem:
+    """ The first 'sniff' values of a column go through the generic toJSONItem while the
+        result types are recorded. If all of them (ignoring None and "") have the same type
+        then 'convert' is switched to a converter for that type, which gives the same
+        result as toJSONItem but uses the generic path only for values not of that type. """
+    def __init__(self, parse: ParseJSONItem, sniff: int = 0) -> None:
+        self.parse = parse
+        self.sniff = sniff
+        self.types: Set[Type[Any]] = set()
+        self.convert: Callable[[str], JSONItem] = self.sniffing if sniff > 0 else parse.toJSONItem
+    def sniffing(self, val: str) -> JSONItem:
+        value = self.parse.toJSONItem(val)
+        if value is not None and value != "":
+            self.types.add(value.__class__)
+        self.sniff -= 1
+        if self.sniff <= 0:
+            self.convert = self.typed(self.types)
+            logg.debug("column types %s converted by %s", self.types, self.convert.__name__)
+        return value
+    def typed(self, types: Set[Type[Any]]) -> Callable[[str], JSONItem]:
+        parse = self.parse
+        generic = parse.toJSONItem
+        if types == {int}:
+            def intvalue(val: str) -> JSONItem:
+                if val.isdigit() or (val[1:].isdigit() and val[:1] in "+-"):
+                    try:
+                        return int(val)
+                    except ValueError:  # other unicode digits
+                        pass
+                return generic(val)
+            return intvalue
+        if types == {float} or types == {int, float}:
+            is_float = parse.is_float.match
+            def floatvalue(val: str) -> JSONItem:
+                if is_float(val):
+                    if "." in val or "e" in val:
+                        return float(val)
+                    return int(val)
+                return generic(val)
+            return floatvalue
+        if types == {bool}:
+            bools = {parse.True_String: True, parse.False_String: False}
+            def boolvalue(val: str) -> JSONItem:
+                try:
+                    return bools[val]
+                except KeyError:
+                    return generic(val)
+            return boolvalue
+        if types == {str}:
+            special = {parse.None_String, parse.True_String, parse.False_String}
+            def strvalue(val: str) -> JSONItem:
+                head = val[:1]
+                if head.isalpha() and head.isascii() and head not in "hH" and val not in special:
+                    return val  # not a number, date or frac
+                return generic(val)
+            return strvalue
+        if parse.datedelim != "-":
+            return generic
+        if types == {Date}:
+            is_date = parse.is_date.match
+            def datevalue(val: str) -> JSONItem:
+                as_date = is_date(val)
+                if as_date:
+                    return Date(int(as_date.group(1)), int(as_date.group(2)), int(as_date.group(3)))
+                return generic(val)
+            return datevalue
+        if types == {Time} or types == {Date, Time}:
+            toDate = parse.toDate
+            def timevalue(val: str) -> JSONItem:
+                value = toDate(val)
+                if value is val:
+                    return generic(val)
+                return value
+            return timevalue
+        return generic
+
+class SniffJSONColumns(Dict[str, SniffJSONItem]):
+    def __init__(self, parse: ParseJSONItem, sniff: Optional[int] = None, schema: Optional[JSONSchema] = None,
+                 raw: bool = False) -> None:
+        dict.__init__(self)
+        self.parse = parse
+        self.sniff = sniff
+        self.schema = schema or {}
+        self.raw = raw
+    def __missing__(self, name: str) -> SniffJSONItem:
+        column = self[name] = self.parse.column(self.sniff, "str" if self.raw else self.schema.get(name))
+        return column
+
+def tabschema(schema: Union[None, str, JSONSchema] = None, filename: str = NIX) -> JSONSchema:
+    """ a string is taken as the name of a json file with the schema. Without a schema
+        the input 'filename' may have a sidecar "name.schema.json" (for "name.csv"). """
+    if schema is None:
+        if not filename:
+            return {}
+        sidecar = os.path.splitext(filename)[0] + ".schema.json"
+        if not os.path.isfile(sidecar):
+            return {}
+        schema = sidecar
+    if isinstance(schema, str):
+        with open(schema, encoding="utf-8") as f:
+            loaded = json.load(f)
+        if not isinstance(loaded, dict):
+            logg.error("schema is not a json object: %s", schema)
+            return {}
+        logg.debug("schema %s = %s", schema, loaded)
+        return cast(JSONSchema, loaded)
+    return schema
 
 def tabWithDateTime() -> None:
     global DATEFMT
@@ -325,52 +835,188 @@ def tabWithDateOnly() -> None:
 
 RowSortList = Union[Sequence[str], Dict[str, str], Callable[[JSONDict], str]]
 
+RowSortKey = Union[str, Tuple[Any, ...]]
+
 class RowSortCallable:
     """ The column names in the sorts-list are used here for one of their 
-        functions as sorting the rows of the table by returning a sort-string
+        functions as sorting the rows of the table by returning a sort-key
         from the record. You can override that with a callable but then it
         can not be used anymore with its double function to also move the
-        sort-columns to the left of the table. See 'reorder' below."""
-    def __init__(self, sorts: RowSortList, datedelim: str = '-') -> None:
+        sort-columns to the left of the table. See 'reorder' below.
+        The sort-key is a tuple of (rank, value) pairs unless the 'tuples'
+        option (default SORTTUPLES) is off where it is a sort-string."""
+    def __init__(self, sorts: RowSortList, datedelim: str = '-', *, tuples: Optional[bool] = None) -> None:
         """ only a few tabto-functions have a local datedelim to pass"""
         self.sorts = sorts
         self.datedelim = datedelim
-    def __call__(self, item: JSONDict) -> str:
-        """ makes the class to be of type Callable[[JSONDict], str] """
+        self.tuples = SORTTUPLES if tuples is None else tuples
+        self.cols: List[str] = []
+        if not callable(sorts):
+            self.cols = [(sort.split("@", 1)[0] if "@" in sort else sort) for sort in sorts]
+    def __call__(self, item: JSONDict) -> RowSortKey:
+        """ makes the class to be of type Callable[[JSONDict], RowSortKey] """
         sorts = self.sorts
         if callable(sorts):
             return sorts(item)
+        elif self.tuples:
+            return self.sortkey(item)
         else:
-            sortvalue = ""
-            for sort in sorts:
-                # numbers before empty before strings
-                if "@" in sort:
-                    col, rename = sort.split("@", 1)
-                else:
-                    col = sort
-                if col in item:
-                    value = item[col]
-                    if value is None:
-                        sortvalue += "\n?"
-                    elif value is False:
-                        sortvalue += "\n"
-                    elif value is True:
-                        sortvalue += "\n!"
-                    elif isinstance(value, int):
-                        val = "%i" % value
-                        sortvalue += "\n" + (":" * len(val)) + val
-                    elif isinstance(value, float):
-                        val = "%.6f" % value
-                        sortvalue += "\n" + (":" * val.index(".")) + val
-                    elif isinstance(value, Time):
-                        sortvalue += "\n" + value.strftime("%Y%m%d.%H%MS")
-                    elif isinstance(value, Date):
-                        sortvalue += "\n" + value.strftime("%Y%m%d")
-                    else:
-                        sortvalue += "\n" + str(value)
+            return self.sortstring(item)
+    def sortkey(self, item: JSONDict) -> Tuple[Any, ...]:
+        """ numbers before empty before strings (False, True, dates, numbers, None, strings) where
+            a string keeps the place it has in the sort-string by its first char, so that "10" and
+            "1abc" go with the dates (compared as "yyyymmdd" strings) before the numbers """
+        sortvalue: List[Any] = []
+        for col in self.cols:
+            value = item.get(col)
+            kind = type(value)
+            if kind is str:
+                if value >= "?":  # the first char is at least "?"
+                    sortvalue += (8, value)
                 else:
+                    sortvalue += (_sortrank(value), value) if value else (0, 0)  # empty string like False
+            elif kind is int or kind is float:
+                sortvalue += (5, value)
+            elif kind is Date:
+                sortvalue += (4, "%04i%02i%02i" % (value.year, value.month, value.day))  # type: ignore[union-attr]
+            elif value is None:
+                sortvalue += (7, 0)
+            elif value is False:
+                sortvalue += (0, 0)
+            elif value is True:
+                sortvalue += (2, 0)
+            elif isinstance(value, Time):
+                sortvalue += (4, "%04i%02i%02i.%02i%02iS" % (value.year, value.month, value.day, value.hour, value.minute))
+            elif isinstance(value, Date):
+                sortvalue += (4, "%04i%02i%02i" % (value.year, value.month, value.day))  # before any time on that day
+            elif isinstance(value, (int, float)):
+                sortvalue += (5, value)
+            else:
+                text = str(value)
+                sortvalue += (_sortrank(text), text) if text else (0, 0)
+        return tuple(sortvalue)
+    def sortstring(self, item: JSONDict) -> str:
+        """ numbers before empty before strings (as a string with padded numbers) """
+        sortvalue = ""
+        for col in self.cols:
+            if col in item:
+                value = item[col]
+                if value is None:
                     sortvalue += "\n?"
-            return sortvalue
+                elif value is False:
+                    sortvalue += "\n"
+                elif value is True:
+                    sortvalue += "\n!"
+                elif isinstance(value, int):
+                    val = "%i" % value
+                    sortvalue += "\n" + (":" * len(val)) + val
+                elif isinstance(value, float):
+                    val = "%.6f" % value
+                    sortvalue += "\n" + (":" * val.index(".")) + val
+                elif isinstance(value, Time):
+                    sortvalue += "\n" + value.strftime("%Y%m%d.%H%MS")
+                elif isinstance(value, Date):
+                    sortvalue += "\n" + value.strftime("%Y%m%d")
+                else:
+                    sortvalue += "\n" + str(value)
+            else:
+                sortvalue += "\n?"
+        return sortvalue
+
+def _sortrank(text: str) -> int:
+    """ the rank of a non-empty string in the sort-key tuple, by the slot of its first char in the
+        sort-string (True "!", dates "0-9", numbers ":", None "?") """
+    first = text[0]
+    if first >= "?":
+        return 8
+    if first >= ":":
+        return 6
+    if first >= "0":
+        return 4
+    if first >= "!":
+        return 3
+    return 1
+
+class RowSorter:
+    """ The rows of a table are collected here to be returned sorted by the key. When
+        there are more than 'maxrows' (SORTROWS) rows or when their estimated size is
+        more than 'maxmemory' (SORTMEMORY) bytes then the sorted run is spilled to a
+        temp file, and the runs are merged at the end. Iterating over the RowSorter
+        yields the same order as 'sorted(rows, key=key)' being a stable sort.
+        With a 'limit' only the first rows after 'offset' are kept in a bounded
+        buffer which is cut down with heapq.nsmallest, and nothing is spilled."""
+    def __init__(self, key: Callable[[Any], Any], *, maxrows: Optional[int] = None, maxmemory: Optional[int] = None,
+                 limit: int = 0, offset: int = 0) -> None:
+        self.key = key
+        self.maxrows = SORTROWS if maxrows is None else maxrows
+        self.maxmemory = SORTMEMORY if maxmemory is None else maxmemory
+        self.limit = limit
+        self.offset = offset
+        self.rows: List[Any] = []
+        self.size = 0
+        self.count = 0
+        self.runs: List[IO[bytes]] = []
+    def __len__(self) -> int:
+        return self.count
+    def append(self, row: Any) -> None:
+        self.rows.append(row)
+        self.count += 1
+        if self.limit:
+            keep = self.offset + self.limit
+            if len(self.rows) >= 2 * keep:
+                self.rows = heapq.nsmallest(keep, self.rows, key=self.key)
+            return
+        if self.maxmemory:
+            self.size += _rowsize(row)
+            if self.size >= self.maxmemory:
+                self.spill()
+        if self.maxrows and len(self.rows) >= self.maxrows:
+            self.spill()
+    def sortedrun(self) -> List[Tuple[Any, Any]]:
+        """ the rows in memory as (key, row) pairs """
+        rows, self.rows, self.size = self.rows, [], 0
+        return sorted(zip(map(self.key, rows), rows), key=itemgetter(0))
+    def spill(self) -> None:
+        if not self.rows:
+            return
+        keyed = self.sortedrun()
+        run = tempfile.TemporaryFile(prefix="tabtotext.")
+        for start in range(0, len(keyed), SORTBLOCK):
+            pickle.dump(keyed[start:start + SORTBLOCK], run, protocol=pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        logg.debug("spilled %s rows to sort run #%s", len(keyed), len(self.runs) + 1)
+        self.runs.append(run)
+    def __iter__(self) -> Iterator[Any]:
+        if self.limit:
+            rows = heapq.nsmallest(self.offset + self.limit, self.rows, key=self.key)
+            return iter(rows[self.offset:])
+        if not self.runs:
+            rows = sorted(self.rows, key=self.key)
+            return iter(rows[self.offset:] if self.offset else rows)
+        if self.offset:
+            return islice(self.merged(), self.offset, None)
+        return self.merged()
+    def merged(self) -> Iterator[Any]:
+        runs = [self.readrun(run) for run in self.runs] + [iter(self.sortedrun())]
+        self.runs = []
+        for _, row in heapq.merge(*runs, key=itemgetter(0)):
+            yield row
+    def readrun(self, run: IO[bytes]) -> Iterator[Tuple[Any, Any]]:
+        try:
+            while True:
+                yield from pickle.load(run)
+        except EOFError:
+            pass
+        finally:
+            run.close()
+
+def _rowsize(row: Any) -> int:
+    """ estimated memory of a row (only one level deep) """
+    if isinstance(row, dict):
+        return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+    if isinstance(row, tuple):
+        return sys.getsizeof(row) + sum(_rowsize(part) for part in row)
+    return sys.getsizeof(row)
 
 ColSortList = Union[Sequence[str], Dict[str, str], Callable[[str], str]]
 
@@ -403,107 +1049,173 @@ class ColSortCallable:
 
 LegendList = Union[Dict[str, str], Sequence[str]]
 
-# ================================= #### GFM
-class NumFormatJSONItem(BaseFormatJSONItem):
-    def __init__(self, formats: Dict[str, str] = {}, tab: str = '|'):
-        BaseFormatJSONItem.__init__(self, formats)
-        self.floatfmt = FLOATFMT
-    def __call__(self, col: str, val: JSONItem) -> str:
-        if col in self.formats:
-            fmt = self.formats[col]
-            if fmt.startswith("{:") and fmt[-1] == "}" and "%s" in fmt:
-                fmt = fmt[2:-1].replace("%s", "{:s}")
-            if fmt.startswith("{:%") and fmt[-1] == "}" and fmt[-2] in "sf":
-                fmt = fmt.replace("{:%", "{:")
-            if "{:" in fmt:
-                for fmt4 in fmt.split("|"):
-                    val4 = val
-                    q = fmt4.rindex("}")
-                    if q > 0 and fmt4[q - 1] in "hHqQM$":
-                        val4 = Frac4(val)  # type: ignore[assignment,arg-type]
-                    try:
-                        return fmt4.format(val4)
-                    except Exception as e:
-                        logg.debug("format <%s> does not apply: %s", fmt, e)
-            # only a few percent-formatting variants are supported
-            if isinstance(val, float):
-                m = re.search(r"%\d(?:[.]\d)f", fmt)
-                if m:
-                    try:
-                        return fmt % val
-                    except Exception as e:
-                        logg.debug("format <%s> does not apply: %e", fmt, e)
-            logg.debug("unknown format '%s' for col '%s'", fmt, col)
-        if isinstance(val, float):
-            return self.floatfmt % val
-        return self.item(val)
-class FormatGFM(NumFormatJSONItem):
-    def __init__(self, formats: Dict[str, str] = {}, tab: str = '|'):
-        NumFormatJSONItem.__init__(self, formats)
-        self.tab = tab
+# ================================= stats
+
+class TabStats:
+    """ The wall time per phase and some counters of a conversion. Each phase gets only
+        its own time - while rendering pulls rows from a scan that pulls rows from the
+        reader, the time goes to the innermost phase being run. The phases are "spec",
+        "read", "distinct", "filter", "scan" (select, rename and column widths), "format",
+        "sort", "render" and "write". The counters are "rows_in", "rows_read", "rows_filtered",
+        "rows_out", "format_calls", "bytes_read" and "bytes_written". """
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.current = ""
+        self.started = time.perf_counter()
+    def enter(self, phase: str) -> str:
+        """ switches to the phase, returns the previous phase """
+        now = time.perf_counter()
+        self.seconds[self.current] = self.seconds.get(self.current, 0.) + (now - self.started)
+        self.started = now
+        previous, self.current = self.current, phase
+        return previous
+    def count(self, name: str, num: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + num
+    def timed(self, phase: str, items: Iterable[Any], counter: str = "") -> Iterator[Any]:
+        """ the time to produce each item goes to the phase, the items are counted """
+        previous = self.enter(phase)
+        try:
+            iterator = iter(items)
+        finally:
+            self.enter(previous)
+        while True:
+            previous = self.enter(phase)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.enter(previous)
+            if counter:
+                self.count(counter)
+            yield item
+    def filtering(self, accept: Callable[[JSONDict], bool]) -> Callable[[JSONDict], bool]:
+        def accepted(item: JSONDict) -> bool:
+            previous = self.enter("filter")
+            try:
+                if accept(item):
+                    return True
+                self.count("rows_filtered")
+                return False
+            finally:
+                self.enter(previous)
+        return accepted
+    def formatter(self, format: "FormatJSONItem") -> "FormatJSONItem":
+        return TabStatsFormat(format, self)
+    def asdict(self) -> Dict[str, Any]:
+        self.enter(self.current)
+        seconds = dict((phase or "other", round(took, 6)) for phase, took in self.seconds.items())
+        seconds["total"] = round(sum(self.seconds.values()), 6)
+        return {"seconds": seconds, "counts": dict(self.counts)}
+
+class TabStatsFormat(FormatJSONItem):
+    """ a formatter counting its calls with their time in the "format" phase """
+    def __init__(self, format: FormatJSONItem, stats: TabStats) -> None:
+        self.format = format
+        self.stats = stats
     def __call__(self, col: str, val: JSONItem) -> str:
-        if not self.tab:
-            return NumFormatJSONItem.__call__(self, col, val)
-        if self.tab == '|':
-            rep = '!'
-        else:
-            rep = '|'
-        return NumFormatJSONItem.__call__(self, col, val).replace(self.tab, rep)
+        stats = self.stats
+        stats.count("format_calls")
+        previous = stats.enter("format")
+        try:
+            return self.format(col, val)
+        finally:
+            stats.enter(previous)
+    def right(self, col: str) -> bool:
+        return self.format.right(col)
 
-def tabToGFMx(result: Union[JSONList, JSONDict, DataList, DataItem],  # ..
-              sorts: Sequence[str] = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
-              *, noheaders: bool = False, legend: LegendList = [], tab: str = "|",  #
-              ) -> str:
-    if isinstance(result, Dict):
-        results = [result]
-    elif _is_dataitem(result):
-        results = [_dataitem_asdict(cast(DataItem, result))]
-    elif hasattr(result, "__len__") and len(cast(List[Any], result)) and (_is_dataitem(cast(List[Any], result)[0])):
-        results = list(_dataitem_asdict(cast(DataItem, item)) for item in cast(List[Any], result))
-    else:
-        results = cast(JSONList, result)
-    return tabToGFM(results, sorts, formats, selected, noheaders=noheaders, legend=legend, tab=tab)
-def tabToGFM(result: Iterable[JSONDict],  # ..
-             sorts: RowSortList = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
-             *, noheaders: bool = False, legend: LegendList = [], tab: str = "|", padding: str = " ",
-             reorder: ColSortList = []) -> str:
-    """ old-style RowSortList and FormatsDict assembled into headers with microsyntax """
-    headers: List[str] = []
-    sorting: RowSortList = []
-    formatter: FormatsDict = {}
-    if isinstance(sorts, Sequence) and isinstance(formats, dict):
-        sortheaders: List[str] = []
-        for header in sorts:
-            cols: List[str] = []
-            for headercol in header.split("|"):
-                if "@" in headercol:
-                    name, suffix = headercol.split("@", 1)
-                    if suffix:
-                        renames = "@" + suffix
-                else:
-                    name, renames = headercol, ""
-                sortheaders += [name]
-                if name in formats:
-                    cols += [name + ":" + formats[name] + renames]
-                else:
-                    cols += [name + renames]
-            headers += ["|".join(cols)]
-        logg.info("headers = %s", headers)
-        logg.info("sorting = %s", sortheaders)
-        sorting = sortheaders
-    else:
-        sorting = sorts
-        formatter = formats
-    return tabtoGFM(result, headers, selected, legend=legend,  # ..
-                    noheaders=noheaders, tab=tab, padding=padding,  # ..
-                    reorder=reorder, sorts=sorting, formatter=formatter)
+class TabMemProfile(TabStats):
+    """ A TabStats that also records the peak of traced memory per phase with tracemalloc.
+        Whenever the traced memory has grown by MEMGROWTH a snapshot is taken for the phase
+        that was running, so that the report can show its top allocation sites in the tabto
+        modules - with MEMFRAMES > 1 an allocation in a library (like json) goes to the line
+        calling it. (Phases that never raised the high-water mark show only their peak) """
+    def __init__(self, top: int = 0) -> None:
+        self.top = top or MEMTOP
+        self.tracing = not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start(MEMFRAMES)
+        self.peaks: Dict[str, int] = {}
+        self.snapshots: Dict[str, tracemalloc.Snapshot] = {}
+        self.snapsize = MEMFLOOR
+        tracemalloc.reset_peak()
+        TabStats.__init__(self)
+    def enter(self, phase: str) -> str:
+        current, peak = tracemalloc.get_traced_memory()
+        done = self.current
+        if peak > self.peaks.get(done, 0):
+            self.peaks[done] = peak
+        if current > self.snapsize:
+            self.snapsize = int(current * MEMGROWTH)
+            self.snapshots[done] = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        return TabStats.enter(self, phase)
+    def stop(self) -> None:
+        """ stops tracemalloc if it was started here """
+        self.enter(self.current)
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+    def sites(self, phase: str) -> List[Tuple[str, int, int]]:
+        """ the top allocation sites of the phase as ("file:line", size, blocks) """
+        if phase not in self.snapshots:
+            return []
+        sites: Dict[str, List[int]] = {}
+        for stat in self.snapshots[phase].statistics("traceback"):
+            for frame in reversed(stat.traceback):
+                filename = os.path.basename(frame.filename)
+                if filename in MEMMODULES:
+                    site = "%s:%s" % (filename, frame.lineno)
+                    if site not in sites:
+                        sites[site] = [0, 0]
+                    sites[site][0] += stat.size
+                    sites[site][1] += stat.count
+                    break
+        top = sorted(sites.items(), key=lambda x: -x[1][0])[:self.top]
+        return [(site, size, blocks) for site, (size, blocks) in top]
+    def asdict(self) -> Dict[str, Any]:
+        result = TabStats.asdict(self)
+        memory: Dict[str, Any] = {}
+        for phase, peak in self.peaks.items():
+            memory[phase or "other"] = {"peak": peak, "sites": self.sites(phase)}
+        result["memory"] = memory
+        return result
+    def report(self) -> List[str]:
+        lines: List[str] = []
+        self.enter(self.current)
+        for phase, peak in sorted(self.peaks.items(), key=lambda x: -x[1]):
+            lines.append("%-8s peak %10.3f MiB" % (phase or "other", peak / (1024 * 1024)))
+            for site, size, blocks in self.sites(phase):
+                lines.append("    %-20s %10.3f MiB %8i blocks" % (site, size / (1024 * 1024), blocks))
+        return lines
 
-def tabtoGFM(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
-             *, legend: LegendList = [], minwidth: int = 0, noheaders: bool = False, unique: bool = False,
-             tab: str = "|", padding: str = " ",
-             reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {}) -> str:
-    logg.debug("tabtoGFM:")
-    minwidth = minwidth or MINWIDTH
+# ================================= headers
+
+class TabSpec(NamedTuple):
+    """ The headers and selected columns are given in a microsyntax like "a|b@x:.2f" or "{a} {b}"
+        and with filters like "a<3" - the TabSpec is the compiled plan of it that is shared by
+        all the tabtoXYZ renderers. Use 'tabspec()' to get a cached instance. Do not modify."""
+    renameheaders: Dict[str, str]
+    showheaders: List[str]
+    sortheaders: List[str]
+    formats: Dict[str, str]
+    combined: Dict[str, List[str]]
+    renaming: Dict[str, str]
+    filtered: Dict[str, str]
+    selcols: List[str]
+    freecols: Dict[str, str]
+    colnames: Dict[str, str]
+    sortcolumns: List[str]
+    selcolumns: List[str]
+    selheaders: List[str]
+
+def tabspec(headers: Sequence[str] = [], selected: Sequence[str] = []) -> TabSpec:
+    """ the same headers and selected columns will return the same TabSpec from an lru cache """
+    return _tabspec(tuple(headers), tuple(selected))
+
+@lru_cache(maxsize=256)
+def _tabspec(headers: Tuple[str, ...], selected: Tuple[str, ...]) -> TabSpec:
     renameheaders: Dict[str, str] = {}
     showheaders: List[str] = []
     sortheaders: List[str] = []
@@ -532,9 +1244,8 @@ def tabtoGFM(data: Iterable[JSONDict], headers: List[str] = [], selected: List[s
                 freehdrs[name] = selcol
             elif ":" in selcol:
                 name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
+                fmts = form if "{" in form else ("{:" + form + "}")
+                formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
             else:
                 name = selcol
             showheaders += [name]  # headers make a default column order
@@ -631,205 +1342,661 @@ def tabtoGFM(data: Iterable[JSONDict], headers: List[str] = [], selected: List[s
             newsorts[name] = newsort
     logg.debug("newsorts = %s", newsorts)
     logg.debug("colnames = %s", colnames)
-    if sorts:
-        sortcolumns = sorts
-    else:
-        sortcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols or sortheaders)]
-        if newsorts:
-            for num, name in enumerate(sortcolumns):
-                if name not in newsorts:
-                    newsorts[name] = ("@" * len(str(num)) + str(num))
-            sortcolumns = sorted(newsorts, key=lambda x: newsorts[x])
-            logg.debug("sortcolumns : %s", sortcolumns)
-        else:
-            logg.debug("sortcolumns = %s", sortcolumns)
-    format: FormatJSONItem
-    if formatter and isinstance(formatter, FormatJSONItem):
-        format = formatter
+    sortcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols or sortheaders)]
+    if newsorts:
+        for num, name in enumerate(sortcolumns):
+            if name not in newsorts:
+                newsorts[name] = ("@" * len(str(num)) + str(num))
+        sortcolumns = sorted(newsorts, key=lambda x: newsorts[x])
+        logg.debug("sortcolumns : %s", sortcolumns)
     else:
-        logg.debug("formats = %s | tab=%s", formats, tab)
-        format = FormatGFM(formats, tab=tab)
+        logg.debug("sortcolumns = %s", sortcolumns)
     selcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols)]
     selheaders = [(name if name not in colnames else colnames[name]) for name in (showheaders)]
-    sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
-    sortrow = RowSortCallable(sortcolumns)
-    rows: List[JSONDict] = []
-    cols: Dict[str, int] = {}
+    return TabSpec(renameheaders, showheaders, sortheaders, formats, combined, renaming, filtered,
+                   selcols, freecols, colnames, sortcolumns, selcolumns, selheaders)
+
+def tabrejected(item: JSONDict, spec: TabSpec, cols: Dict[str, int], minwidth: int) -> None:
+    """ a row dropped by the filters is not formatted - it only registers its column names """
+    renameheaders, selcols, colnames = spec.renameheaders, spec.selcols, spec.colnames
+    if "#" in selcols and "#" not in cols:
+        cols["#"] = 1
+    for name in item.keys():
+        selname = name
+        if name in renameheaders and renameheaders[name] in selcols:
+            selname = renameheaders[name]
+        if selcols and selname not in selcols and "*" not in selcols:
+            continue
+        colname = selname if selname not in colnames else colnames[selname]
+        if colname not in cols:
+            cols[colname] = max(minwidth, len(colname))
+
+class RowDistinct:
+    """ true for a row whose selected values were not seen before, checked in a hash set.
+        The key has the type of each value, so 1, True and 1.0 are different. When the
+        seen keys take more than 'maxmemory' (DISTINCTMEMORY) bytes then they are moved
+        into a temporary sqlite database on disk. """
+    def __init__(self, spec: Optional[TabSpec] = None, *, maxmemory: Optional[int] = None) -> None:
+        self.spec = spec if spec is not None else tabspec()
+        self.maxmemory = DISTINCTMEMORY if maxmemory is None else maxmemory
+        self.memory = 0
+        self.seen: Set[Tuple[Any, ...]] = set()
+        self.names: Dict[str, bool] = {}  # the item names being part of the key
+        self.database: Any = None
+        selcols = self.spec.selcols
+        self.allnames = not selcols or "*" in selcols
+        self.freenames = set(" ".join(self.spec.freecols.keys()).split(" "))
+    def selected(self, name: str) -> bool:
+        if self.allnames or name in self.freenames:
+            return True
+        renameheaders, selcols = self.spec.renameheaders, self.spec.selcols
+        if name in renameheaders and renameheaders[name] in selcols:
+            return True
+        return name in selcols
+    def key(self, item: JSONDict) -> Tuple[Any, ...]:
+        names = self.names
+        parts: List[Tuple[str, str, Any]] = []
+        for name, value in item.items():
+            use = names.get(name)
+            if use is None:
+                use = names[name] = self.selected(name)
+            if use:
+                if isinstance(value, (dict, list)):
+                    parts.append((name, value.__class__.__name__, repr(value)))
+                else:
+                    parts.append((name, value.__class__.__name__, value))
+        parts.sort(key=itemgetter(0))
+        return tuple(parts)
+    def __call__(self, item: JSONDict) -> bool:
+        key = self.key(item)
+        if self.database is not None:
+            cursor = self.database.execute("INSERT OR IGNORE INTO seen VALUES (?)", (pickle.dumps(key),))
+            return bool(cursor.rowcount == 1)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        if self.maxmemory:
+            self.memory += _rowsize(key)
+            if self.memory > self.maxmemory:
+                self.spill()
+        return True
+    def spill(self) -> None:
+        import sqlite3
+        logg.debug("distinct rows: moving %s keys to a temp database", len(self.seen))
+        self.database = sqlite3.connect("")  # a temporary database on disk
+        self.database.execute("CREATE TABLE seen (key BLOB PRIMARY KEY)")
+        self.database.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((pickle.dumps(key),) for key in self.seen))
+        self.seen = set()
+        self.memory = 0
+
+def tabdistinct(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
+                *, spec: Optional[TabSpec] = None, maxmemory: Optional[int] = None) -> Iterator[JSONDict]:
+    """ a streaming stage dropping the rows with the same selected values as an earlier row.
+        It goes in front of any renderer, the "#" row numbers do then count the distinct rows. """
+    spec = tabspec(headers, selected) if spec is None else spec
+    return filter(RowDistinct(spec, maxmemory=maxmemory), data)
+
+@lru_cache(maxsize=256)
+def _freetemplate(freecol: str, freeformat: str) -> Optional[str]:
+    """ the free format with positional fields, or None when it has fields that are not plain names """
+    template: List[str] = []
+    names: List[str] = []
+    try:
+        for literal, field, spec, conv in string.Formatter().parse(freeformat):
+            template.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is None:
+                continue
+            if conv or not field or "{" in (spec or "") or "." in field or "[" in field:
+                return None
+            names.append(field)
+            template.append("{:" + spec + "}" if spec else "{}")
+    except ValueError:
+        return None
+    if names != freecol.split(" "):
+        return None
+    return "".join(template)
+
+class FreeFormatCallable:
+    """ a free format column like '{a}-{b:>5}' compiled to the source column of each field
+        and one positional str.format. The fields get the formatted cell value of the source
+        column or the 'none' string when it is missing. A field that might be filled from
+        more than one source column (by renaming) falls back to scanning the row items. """
+    def __init__(self, freecol: str, freeformat: str, renameheaders: Dict[str, str],  # ..
+                 format: FormatJSONItem, none: str = _None_String) -> None:
+        self.freecol = freecol
+        self.freeformat = freeformat
+        self.renameheaders = renameheaders
+        self.format = format
+        self.none = none
+        self.freenames = freecol.split(" ")
+        self.sources: Optional[List[str]] = None
+        template = _freetemplate(freecol, freeformat)
+        if template is not None:
+            sources: List[str] = []
+            for freename in self.freenames:
+                names = [name for name, rename in renameheaders.items() if rename == freename]
+                if not (freename in renameheaders and renameheaders[freename] in self.freenames):
+                    names.append(freename)
+                if len(names) != 1:
+                    break
+                sources += names
+            else:
+                self.sources = sources
+                self.template = template.format
+    def __call__(self, item: JSONDict) -> str:
+        sources = self.sources
+        if sources is None:
+            return self.scan(item)
+        format, none = self.format, self.none
+        return self.template(*[(format(name, item[name]) if name in item else none) for name in sources])
+    def scan(self, item: JSONDict) -> str:
+        renameheaders, freenames = self.renameheaders, self.freenames
+        freeitem: JSONDict = dict([(freename, self.none) for freename in freenames])
+        for name, value in item.items():
+            itemname = name
+            if name in renameheaders and renameheaders[name] in freenames:
+                itemname = renameheaders[name]
+            if itemname in freenames:
+                freeitem[itemname] = self.format(name, value)
+        return self.freeformat.format(**freeitem)
+
+def tabfreeformats(spec: TabSpec, format: FormatJSONItem, none: str = _None_String) -> Dict[str, FreeFormatCallable]:
+    """ the compiled free format columns of the spec, to be called for each row """
+    return dict([(freecol, FreeFormatCallable(freecol, freeformat, spec.renameheaders, format, none))
+                 for freecol, freeformat in spec.freecols.items()])
+
+def _scanrows(data: Iterable[JSONDict], spec: TabSpec, format: FormatJSONItem,  # ..
+              minwidth: int, cols: Dict[str, int], stats: Optional[TabStats] = None) -> Iterator[JSONDict]:
+    """ the rows to be shown with their renamed columns, registering the cols on the way """
+    renameheaders, filtered, selcols, freecols, colnames = spec.renameheaders, spec.filtered, spec.selcols, spec.freecols, spec.colnames
+    accept = RowFilterCallable(filtered) if filtered else None
+    if stats is not None and accept is not None:
+        accept = stats.filtering(accept)
+    freeformatted = tabfreeformats(spec, format)
     for num, item in enumerate(data):
+        if accept is not None and not accept(item):
+            tabrejected(item, spec, cols, minwidth)
+            continue
         row: JSONDict = {}
         if "#" in selcols:
             row["#"] = num + 1
             cols["#"] = len(str(num + 1))
-        skip = False
         for name, value in item.items():
             selname = name
             if name in renameheaders and renameheaders[name] in selcols:
                 selname = renameheaders[name]
             if selcols and selname not in selcols and "*" not in selcols:
                 continue
-            try:
-                if name in filtered:
-                    skip = skip or unmatched(value, filtered[name])
-            except: pass
             colname = selname if selname not in colnames else colnames[selname]
             row[colname] = value
-            oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-            cols[colname] = max(oldlen, len(format(colname, value)))
+            if colname not in cols:
+                cols[colname] = max(minwidth, len(colname))  # no widths, the cell is formatted on output
         for freecol, freeformat in freecols.items():
             try:
-                freenames = freecol.split(" ")
-                freeitem: JSONDict = dict([(freename, _None_String) for freename in freenames])
-                for name, value in item.items():
-                    itemname = name
-                    if name in renameheaders and renameheaders[name] in freenames:
-                        itemname = renameheaders[name]
-                    if itemname in freenames:
-                        freeitem[itemname] = format(name, value)
-                value = freeformat.format(**freeitem)
+                value = freeformatted[freecol](item)
                 colname = freecol if freecol not in colnames else colnames[freecol]
                 row[colname] = value
                 oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
                 cols[colname] = max(oldlen, len(value))
             except Exception as e:
                 logg.info("formatting '%s' at %s bad for:\n\t%s", freeformat, e, item)
-        if not skip:
-            rows.append(row)
-    ws = (""," ","  ","   ","    ","     ","      ","       ","        ") # " "*(0...8)
-    colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
-    colw = tuple((cols[col] for col in colo)) # widths of cols ordered
-    colr = tuple((format.right(col) for col in colo)) # rightalign of cols ordered
-    tab2 = tab[0] + padding if tab else ""
-    rtab = padding + tab[1] if len(tab) > 1 else ""
-    lines: List[str] = []
-    if not noheaders:
-        hpad = [(ws[w] if w < 9 else (" " * w)) for w in ((colw[m]-len(col)) for m, col in enumerate(colo))]
-        line = [tab2+(hpad[m]+col if colr[m] else col+hpad[m]) for m, col in enumerate(colo)]
-        if rtab:
-            lines += [(padding.join(line)) + rtab]
-        else:
-            lines += [(padding.join(line)).rstrip()]
-        if tab and padding:
-            seps = ["-" * colw[m] for m, col in enumerate(colo)]
-            seperators = [tab2+(seps[m][:-1]+":" if colr[m] else seps[m]) for m, col in enumerate(colo) ]
-            lines.append(padding.join(seperators) + rtab)
-    old: Dict[str, str] = {}
-    same: List[str] = []
-    for item in sorted(rows, key=sortrow):
-        values: Dict[str, str] = {}
-        for name, value in item.items():
-            values[name] = format(name, value)
-        vals = [values.get(col, _None_String) for col in colo]
-        vpad = [(ws[w] if w < 9 else (" " * w)) for w in ((colw[m] - len(vals[m])) for m, col in enumerate(colo))]
-        line = [tab2+(vpad[m]+vals[m] if colr[m] else vals[m]+vpad[m]) for m, col in enumerate(colo)]
-        if unique:
-            same = [sel for sel in selcols if sel in values and sel in old and values[sel] == old[sel]]
-        if not selcols or same != selcols:
-            if rtab:
-                lines.append((padding.join(line)) + rtab)
-            else:
-                lines.append((padding.join(line)).rstrip())
-        old = values
-    return "\n".join(lines) + "\n" + legendToGFM(legend, sorts, reorder)
-
-def legendToGFM(legend: LegendList, sorts: RowSortList = [], reorder: ColSortList = []) -> str:
-    sortkey = ColSortCallable(sorts, reorder)
-    if isinstance(legend, dict):
-        lines = []
-        for key in sorted(legend.keys(), key=sortkey):
-            line = "%s: %s" % (key, legend[key])
-            lines.append(line)
-        return listToGFM(lines)
-    elif isinstance(legend, str):
-        return listToGFM([legend])
-    else:
-        return listToGFM(legend)
+        yield row
 
-def listToGFM(lines: Sequence[str]) -> str:
-    if not lines: return ""
-    return "\n" + "".join(["- %s\n" % line.strip() for line in lines if line and line.strip()])
+def _roworder(sortkey: Callable[[str], str]) -> Callable[[Dict[str, Any]], List[str]]:
+    """ the ordered column names of a row when not all columns are known, cached per name set """
+    orders: Dict[Tuple[str, ...], List[str]] = {}
+    def roworder(values: Dict[str, Any]) -> List[str]:
+        names = tuple(values)
+        if names not in orders:
+            orders[names] = sorted(names, key=sortkey)
+        return orders[names]
+    return roworder
 
-def loadGFM(text: str, datedelim: str = '-', tab: str = '|') -> JSONList:
-    parser = DictParserGFM(datedelim=datedelim, tab=tab)
-    return list(parser.loads(text))
-def readFromGFM(filename: str, datedelim: str = '-', tab: str = '|') -> JSONList:
-    parser = DictParserGFM(datedelim=datedelim, tab=tab)
-    return list(parser.load(filename))
-def tabtextfileGFM(filename: str, datedelim: str = '-', tab: str = '|') -> TabText:
-    parser = DictParserGFM(datedelim=datedelim, tab=tab)
-    data = list(parser.load(filename))
-    return TabText(data, parser.headers)
+# ================================= workers
 
-class DictParserGFM(DictParser):
-    def __init__(self, *, datedelim: str = '-', tab: str = '|') -> None:
-        self.convert = ParseJSONItem(datedelim)
-        self.tab = tab
-        self.headers = STRLIST
-    def load(self, filename: str, *, tab: Optional[str] = None) -> Iterator[JSONDict]:
-        return self.read(open(filename))
-    def loads(self, text: str, *, tab: Optional[str] = None) -> Iterator[JSONDict]:
-        return self.read(text.splitlines())
-    def read(self, rows: Iterable[str], *, tab: Optional[str] = None) -> Iterator[JSONDict]:
-        tab = tab if tab is not None else self.tab
-        at = "start"
-        for row in rows:
-            line = row.strip()
-            if not line or line.startswith("#"):
-                continue
-            if not line or line.startswith("- "):
-                continue
-            if tab in "\t" and row.startswith(tab):
-                line = tab + line  # was removed by strip()
-            if line.startswith(tab) or (tab in "\t" and tab in line):
-                if at == "start":
-                    cols = [name.strip() for name in line.split(tab)]
-                    at = "header"
-                    self.headers = cols
-                    logg.fatal("found cols %s", cols)
-                    continue
-                if at == "header":
-                    newcols = [name.strip() for name in line.split(tab)]
-                    logg.fatal("found newcols %s", newcols)
-                    if len(newcols) != len(cols):
-                        logg.error("header divider has not the same length")
-                        at = "data"  # promote anyway
-                        continue
-                    at = "divider"
-                if at == "divider":
-                    ok = True
-                    for col in newcols:
-                        if not col: continue
-                        if not re.match(r"^ *:*--*:* *$", col):
-                            logg.warning("no header divider: %s", col)
-                            ok = False
-                    if not ok:
-                        at = "data"
-                        # fallthrough
-                    else:
-                        at = "data"
-                        continue
-                if at == "data":
-                    values = [field.strip() for field in line.split(tab)]
-                    record = []
-                    for value in values:
-                        record.append(self.convert.toJSONItem(value.strip()))
-                    newrow = dict(zip(cols, record))
-                    if "" in newrow:
-                        del newrow[""]
-                    yield newrow
+def workerchunks(func: Callable[..., Any], data: Iterable[JSONDict], workers: int, *args: Any) -> Iterator[Any]:
+    """ runs func(chunk, start, *args) in a process pool over chunks of WORKCHUNK rows where
+        'start' is the number of rows before the chunk. The results are yielded in the order
+        of the chunks. The args and rows must be picklable, so row views become dicts. """
+    from concurrent.futures import ProcessPoolExecutor, Future
+    items = iter(data)
+    start = 0
+    pending: Deque[Future[Any]] = deque()
+    counted = [num for num, arg in enumerate(args) if isinstance(arg, TabStatsFormat)]
+    stats = args[counted[0]].stats if counted else None
+    if counted:  # the counters of the TabStatsFormat are made in the worker and added here
+        args = (func, counted) + tuple((arg.format if num in counted else arg) for num, arg in enumerate(args))
+        func = _statschunk
+    with ProcessPoolExecutor(workers) as pool:
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = [(item if isinstance(item, dict) else dict(item.items())) for item in islice(items, WORKCHUNK)]
+                if not chunk:
+                    break
+                pending.append(pool.submit(func, chunk, start, *args))
+                start += len(chunk)
+            if not pending:
+                break
+            if stats is not None:
+                result, counts = pending.popleft().result()
+                for name, num in counts.items():
+                    stats.count(name, num)
+                yield result
             else:
-                logg.warning("unrecognized line: %s", line.replace(tab, "|"))
+                yield pending.popleft().result()
 
-# ================================= #### HTML
-class FormatHTML(NumFormatJSONItem):
-    def __init__(self, formats: Dict[str, str] = {}):
-        NumFormatJSONItem.__init__(self, formats)
+def _statschunk(data: List[JSONDict], start: int, func: Callable[..., Any], counted: List[int], *args: Any) -> Tuple[Any, Dict[str, int]]:
+    """ runs a workerchunks func with the formats at the 'counted' args in a TabStatsFormat of
+        a new TabStats, returning the result with its counters (its time is not for the parent) """
+    stats = TabStats()
+    args = tuple((TabStatsFormat(arg, stats) if num in counted else arg) for num, arg in enumerate(args))
+    return func(data, start, *args), stats.counts
 
-def tabToHTMLx(result: Union[JSONList, JSONDict, DataList, DataItem],  # ..
-               sorts: RowSortList = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
-               *, legend: LegendList = [], combine: Dict[str, str] = {}) -> str:
-    if isinstance(result, Dict):
-        results = [result]
-    elif _is_dataitem(result):
+# ================================= #### GFM
+class NumFormatJSONItem(BaseFormatJSONItem):
+    def __init__(self, formats: Dict[str, str] = {}, tab: str = '|'):
+        BaseFormatJSONItem.__init__(self, formats)
+        self.floatfmt = FLOATFMT
+    def plain(self, val: JSONItem) -> str:
+        if isinstance(val, float):
+            return self.floatfmt % val
+        return self.item(val)
+    def compile(self, col: str) -> Callable[[JSONItem], str]:
+        """ examine the format of a column once, returning the formatter for its cells """
+        if col not in self.formats:
+            return self.plain
+        fmt = self.formats[col]
+        if fmt.startswith("{:") and fmt[-1] == "}" and "%s" in fmt:
+            fmt = fmt[2:-1].replace("%s", "{:s}")
+        if fmt.startswith("{:%") and fmt[-1] == "}" and fmt[-2] in "sf":
+            fmt = fmt.replace("{:%", "{:")
+        # only a few percent-formatting variants are supported
+        percent = re.search(r"%\d(?:[.]\d)f", fmt) is not None
+        def fallback(val: JSONItem) -> str:
+            if percent and isinstance(val, float):
+                try:
+                    return fmt % val
+                except Exception as e:
+                    logg.debug("format <%s> does not apply: %s", fmt, e)
+            logg.debug("unknown format '%s' for col '%s'", fmt, col)
+            return self.plain(val)
+        if "{:" not in fmt:
+            return fallback
+        parts: List[Tuple[Callable[..., str], bool]] = []
+        broken = False  # a part without "}" has always been an error
+        for fmt4 in fmt.split("|"):
+            q = fmt4.rfind("}")
+            if q < 0:
+                broken = True
+                break
+            parts.append((fmt4.format, q > 0 and fmt4[q - 1] in "hHqQM$"))
+        if len(parts) == 1 and not broken:
+            format4, frac = parts[0]
+            if frac:
+                def formatfrac(val: JSONItem) -> str:
+                    try:
+                        return format4(Frac4(val))  # type: ignore[arg-type]
+                    except Exception as e:
+                        logg.debug("format <%s> does not apply: %s", fmt, e)
+                    return fallback(val)
+                return formatfrac
+            def formatted(val: JSONItem) -> str:
+                try:
+                    return format4(val)
+                except Exception as e:
+                    logg.debug("format <%s> does not apply: %s", fmt, e)
+                return fallback(val)
+            return formatted
+        def formatparts(val: JSONItem) -> str:
+            for format4, frac in parts:
+                try:
+                    return format4(Frac4(val) if frac else val)  # type: ignore[arg-type]
+                except Exception as e:
+                    logg.debug("format <%s> does not apply: %s", fmt, e)
+            if broken:
+                raise ValueError("format <%s> has a part without '}'" % fmt)
+            return fallback(val)
+        return formatparts
+class FormatGFM(NumFormatJSONItem):
+    def __init__(self, formats: Dict[str, str] = {}, tab: str = '|'):
+        NumFormatJSONItem.__init__(self, formats)
+        self.tab = tab
+        self.rep = '!' if tab == '|' else '|'
+    def __call__(self, col: str, val: JSONItem) -> str:
+        formatter = self.formatters.get(col)
+        if formatter is None:
+            formatter = self.formatters[col] = self.memoize(col, self.compile(col))
+        text = formatter(val)
+        if self.tab and self.tab in text:
+            return text.replace(self.tab, self.rep)
+        return text
+
+def tabToGFMx(result: Union[JSONList, JSONDict, DataList, DataItem],  # ..
+              sorts: Sequence[str] = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
+              *, noheaders: bool = False, legend: LegendList = [], tab: str = "|",  #
+              ) -> str:
+    if isinstance(result, Dict):
+        results = [result]
+    elif _is_dataitem(result):
+        results = [_dataitem_asdict(cast(DataItem, result))]
+    elif hasattr(result, "__len__") and len(cast(List[Any], result)) and (_is_dataitem(cast(List[Any], result)[0])):
+        results = list(_dataitem_asdict(cast(DataItem, item)) for item in cast(List[Any], result))
+    else:
+        results = cast(JSONList, result)
+    return tabToGFM(results, sorts, formats, selected, noheaders=noheaders, legend=legend, tab=tab)
+def tabToGFM(result: Iterable[JSONDict],  # ..
+             sorts: RowSortList = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
+             *, noheaders: bool = False, legend: LegendList = [], tab: str = "|", padding: str = " ",
+             reorder: ColSortList = []) -> str:
+    """ old-style RowSortList and FormatsDict assembled into headers with microsyntax """
+    headers: List[str] = []
+    sorting: RowSortList = []
+    formatter: FormatsDict = {}
+    if isinstance(sorts, Sequence) and isinstance(formats, dict):
+        sortheaders: List[str] = []
+        for header in sorts:
+            cols: List[str] = []
+            for headercol in header.split("|"):
+                if "@" in headercol:
+                    name, suffix = headercol.split("@", 1)
+                    if suffix:
+                        renames = "@" + suffix
+                else:
+                    name, renames = headercol, ""
+                sortheaders += [name]
+                if name in formats:
+                    cols += [name + ":" + formats[name] + renames]
+                else:
+                    cols += [name + renames]
+            headers += ["|".join(cols)]
+        logg.info("headers = %s", headers)
+        logg.info("sorting = %s", sortheaders)
+        sorting = sortheaders
+    else:
+        sorting = sorts
+        formatter = formats
+    return tabtoGFM(result, headers, selected, legend=legend,  # ..
+                    noheaders=noheaders, tab=tab, padding=padding,  # ..
+                    reorder=reorder, sorts=sorting, formatter=formatter)
+
+def tabtoGFM(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
+             *, legend: LegendList = [], minwidth: int = 0, noheaders: bool = False, unique: bool = False,
+             tab: str = "|", padding: str = " ",
+             reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+             limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, workers: int = 0,
+             stats: Optional[TabStats] = None) -> str:
+    return "".join(tabtoGFM_lines(data, headers, selected, legend=legend, minwidth=minwidth,
+                                  noheaders=noheaders, unique=unique, tab=tab, padding=padding,
+                                  reorder=reorder, sorts=sorts, formatter=formatter, limit=limit, offset=offset, spec=spec,
+                                  workers=workers, stats=stats))
+
+def _scanGFM(data: Iterable[JSONDict], start: int, spec: TabSpec, format: FormatJSONItem,  # ..
+             minwidth: int, limit: int, cols: Dict[str, int], stats: Optional[TabStats] = None) -> Iterator[Tuple[JSONDict, Dict[str, str]]]:
+    """ the rows and their formatted values to be shown, widening the cols on the way """
+    renameheaders, filtered, selcols, freecols, colnames = spec.renameheaders, spec.filtered, spec.selcols, spec.freecols, spec.colnames
+    accept = RowFilterCallable(filtered) if filtered else None
+    if stats is not None and accept is not None:
+        accept = stats.filtering(accept)
+    freeformatted = tabfreeformats(spec, format)
+    for num, item in enumerate(data, start):
+        if accept is not None and not accept(item):
+            tabrejected(item, spec, cols, minwidth)
+            continue
+        row: JSONDict = {}
+        values: Dict[str, str] = {}
+        if "#" in selcols:
+            row["#"] = num + 1
+            if not limit:
+                values["#"] = format("#", num + 1)
+                cols["#"] = len(str(num + 1))
+            elif "#" not in cols:
+                cols["#"] = 1
+        for name, value in item.items():
+            selname = name
+            if name in renameheaders and renameheaders[name] in selcols:
+                selname = renameheaders[name]
+            if selcols and selname not in selcols and "*" not in selcols:
+                continue
+            colname = selname if selname not in colnames else colnames[selname]
+            row[colname] = value
+            if not limit:
+                values[colname] = format(colname, value)
+                oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
+                cols[colname] = max(oldlen, len(values[colname]))
+            elif colname not in cols:
+                cols[colname] = max(minwidth, len(colname))
+        for freecol, freeformat in freecols.items():
+            try:
+                value = freeformatted[freecol](item)
+                colname = freecol if freecol not in colnames else colnames[freecol]
+                row[colname] = value
+                if not limit:
+                    values[colname] = format(colname, value)
+                    oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
+                    cols[colname] = max(oldlen, len(value))
+                elif colname not in cols:
+                    cols[colname] = max(minwidth, len(colname))
+            except Exception as e:
+                logg.info("formatting '%s' at %s bad for:\n\t%s", freeformat, e, item)
+        yield row, values
+
+def _scanGFM_chunk(data: List[JSONDict], start: int, spec: TabSpec, format: FormatJSONItem,  # ..
+                   minwidth: int, limit: int) -> Tuple[List[Tuple[JSONDict, Dict[str, str]]], Dict[str, int]]:
+    cols: Dict[str, int] = {}
+    rows = list(_scanGFM(data, start, spec, format, minwidth, limit, cols))
+    return rows, cols
+
+def tabtoGFM_lines(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
+                   *, legend: LegendList = [], minwidth: int = 0, noheaders: bool = False, unique: bool = False,
+                   tab: str = "|", padding: str = " ",
+                   reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+                   limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, workers: int = 0,
+                   stats: Optional[TabStats] = None) -> Iterator[str]:
+    logg.debug("tabtoGFM:")
+    minwidth = minwidth or MINWIDTH
+    spec = tabspec(headers, selected) if spec is None else spec
+    renameheaders, formats = spec.renameheaders, spec.formats
+    filtered, selcols, freecols, colnames = spec.filtered, spec.selcols, spec.freecols, spec.colnames
+    sortcolumns = sorts if sorts else spec.sortcolumns
+    format: FormatJSONItem
+    if formatter and isinstance(formatter, FormatJSONItem):
+        format = formatter
+    else:
+        logg.debug("formats = %s | tab=%s", formats, tab)
+        format = FormatGFM(formats, tab=tab)
+    if stats is not None:
+        format = stats.formatter(format)
+    selcolumns = spec.selcolumns
+    selheaders = spec.selheaders
+    sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
+    sortrow = RowSortCallable(sortcolumns)
+    rows = RowSorter(lambda rowvalues: sortrow(rowvalues[0]), limit=limit, offset=offset)  # values with their formatted text
+    cols: Dict[str, int] = {}
+    if workers > 1:
+        for chunkrows, chunkcols in workerchunks(_scanGFM_chunk, data, workers, spec, format, minwidth, limit):
+            for rowvalues in chunkrows:
+                rows.append(rowvalues)
+            for colname, width in chunkcols.items():
+                cols[colname] = max(cols.get(colname, 0), width)
+    else:
+        scanned = _scanGFM(data, 0, spec, format, minwidth, limit, cols, stats)
+        if stats is not None:
+            scanned = stats.timed("scan", scanned)
+        for rowvalues in scanned:
+            rows.append(rowvalues)
+    sortedrows: Iterable[Tuple[JSONDict, Dict[str, str]]] = rows
+    if stats is not None:
+        sortedrows = stats.timed("sort", rows, "rows_out")
+    if limit:  # the column widths are taken from the rows being shown
+        sortedrows = list(sortedrows)
+        for row, values in sortedrows:
+            for name, value in row.items():
+                values[name] = format(name, value)
+                cols[name] = max(cols[name], len(values[name]))
+    ws = (""," ","  ","   ","    ","     ","      ","       ","        ") # " "*(0...8)
+    colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
+    colw = tuple((cols[col] for col in colo)) # widths of cols ordered
+    colr = tuple((format.right(col) for col in colo)) # rightalign of cols ordered
+    tab2 = tab[0] + padding if tab else ""
+    rtab = padding + tab[1] if len(tab) > 1 else ""
+    lines = 0
+    if not noheaders:
+        hpad = [(ws[w] if w < 9 else (" " * w)) for w in ((colw[m]-len(col)) for m, col in enumerate(colo))]
+        line = [tab2+(hpad[m]+col if colr[m] else col+hpad[m]) for m, col in enumerate(colo)]
+        if rtab:
+            yield (padding.join(line)) + rtab + "\n"
+        else:
+            yield (padding.join(line)).rstrip() + "\n"
+        lines += 1
+        if tab and padding:
+            seps = ["-" * colw[m] for m, col in enumerate(colo)]
+            seperators = [tab2+(seps[m][:-1]+":" if colr[m] else seps[m]) for m, col in enumerate(colo) ]
+            yield padding.join(seperators) + rtab + "\n"
+            lines += 1
+    old: Dict[str, str] = {}
+    same: List[str] = []
+    for row, values in sortedrows:
+        vals = [values.get(col, _None_String) for col in colo]
+        vpad = [(ws[w] if w < 9 else (" " * w)) for w in ((colw[m] - len(vals[m])) for m, col in enumerate(colo))]
+        line = [tab2+(vpad[m]+vals[m] if colr[m] else vals[m]+vpad[m]) for m, col in enumerate(colo)]
+        if unique:
+            same = [sel for sel in selcols if sel in values and sel in old and values[sel] == old[sel]]
+        if not selcols or same != selcols:
+            if rtab:
+                yield (padding.join(line)) + rtab + "\n"
+            else:
+                yield (padding.join(line)).rstrip() + "\n"
+            lines += 1
+        old = values
+    if not lines:
+        yield "\n"
+    legends = legendToGFM(legend, sorts, reorder)
+    if legends:
+        yield legends
+
+def legendToGFM(legend: LegendList, sorts: RowSortList = [], reorder: ColSortList = []) -> str:
+    sortkey = ColSortCallable(sorts, reorder)
+    if isinstance(legend, dict):
+        lines = []
+        for key in sorted(legend.keys(), key=sortkey):
+            line = "%s: %s" % (key, legend[key])
+            lines.append(line)
+        return listToGFM(lines)
+    elif isinstance(legend, str):
+        return listToGFM([legend])
+    else:
+        return listToGFM(legend)
+
+def listToGFM(lines: Sequence[str]) -> str:
+    if not lines: return ""
+    return "\n" + "".join(["- %s\n" % line.strip() for line in lines if line and line.strip()])
+
+def loadGFM(text: str, datedelim: str = '-', tab: str = '|') -> JSONList:
+    parser = DictParserGFM(datedelim=datedelim, tab=tab)
+    return list(parser.loads(text))
+def readFromGFM(filename: str, datedelim: str = '-', tab: str = '|', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> JSONList:
+    parser = DictParserGFM(datedelim=datedelim, tab=tab, schema=schema, raw=raw)
+    return list(parser.load(filename))
+def tabtextfileGFM(filename: str, datedelim: str = '-', tab: str = '|', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> TabText:
+    parser = DictParserGFM(datedelim=datedelim, tab=tab, schema=schema, raw=raw)
+    data = list(parser.load(filename))
+    return TabText(data, parser.headers)
+
+class DictParserGFM(DictParser):
+    """ The header line and its divider are detected once, after that each data line is
+        split into the precomputed number of columns with a single strip per field. Each
+        column gets a converter for its type after 'sniff' values (see SniffJSONItem) or
+        the one of its type in the 'schema'. With 'raw' the cells are kept as strings. """
+    def __init__(self, *, datedelim: str = '-', tab: str = '|', sniff: Optional[int] = None,
+                 schema: Optional[JSONSchema] = None, raw: bool = False) -> None:
+        self.convert = ParseJSONItem(datedelim)
+        self.tab = tab
+        self.sniff = sniff
+        self.schema = schema
+        self.raw = raw
+        self.headers = STRLIST
+    def load(self, filename: str, *, tab: Optional[str] = None) -> Iterator[JSONDict]:
+        return self.read(_readlines(filename), tab=tab)
+    def loads(self, text: str, *, tab: Optional[str] = None) -> Iterator[JSONDict]:
+        return self.read(text.splitlines(), tab=tab)
+    def read(self, rows: Iterable[str], *, tab: Optional[str] = None) -> Iterator[JSONDict]:
+        tab = tab if tab is not None else self.tab
+        lines = self.tablelines(rows, tab)
+        columns = self.convert.columns(self.sniff, self.schema, self.raw)
+        for line in lines:
+            cols = [name.strip() for name in line.split(tab)]
+            self.headers = cols
+            logg.debug("found cols %s", cols)
+            break
+        else:
+            return
+        for line in lines:
+            newcols = [name.strip() for name in line.split(tab)]
+            logg.debug("found newcols %s", newcols)
+            if len(newcols) != len(cols):
+                logg.error("header divider has not the same length")
+                break
+            divider = re.compile(r"^ *:*--*:* *$")
+            nodivider = [col for col in newcols if col and not divider.match(col)]
+            if nodivider:
+                logg.warning("no header divider: %s", nodivider[0])
+                yield self.record(cols, line, tab, columns)
+            break
+        keep = [num for num, name in enumerate(cols) if name]
+        names = [cols[num] for num in keep]
+        if len(names) < 2 or len(set(names)) != len(names):
+            for line in lines:
+                yield self.record(cols, line, tab, columns)
+            return
+        width = keep[-1] + 1
+        fields = itemgetter(*keep)
+        if self.raw:
+            strip = str.strip
+            for line in lines:
+                values = line.split(tab)
+                if len(values) < width:
+                    yield self.record(cols, line, tab, columns)
+                    continue
+                yield dict(zip(names, map(strip, fields(values))))
+            return
+        converts = [columns[name] for name in names]
+        for line in lines:
+            values = line.split(tab)
+            if len(values) < width:
+                yield self.record(cols, line, tab, columns)
+                continue
+            yield dict(zip(names, [column.convert(value.strip()) for column, value in zip(converts, fields(values))]))
+    def tablelines(self, rows: Iterable[str], tab: str) -> Iterator[str]:
+        """ the stripped lines of the table with comments and list items skipped """
+        tabs = tab in "\t"
+        for row in rows:
+            line = row.strip()
+            if not line or line[0] == "#" or line.startswith("- "):
+                continue
+            if tabs and row.startswith(tab):
+                line = tab + line  # was removed by strip()
+            if line.startswith(tab) or (tabs and tab in line):
+                yield line
+            else:
+                logg.warning("unrecognized line: %s", line.replace(tab, "|"))
+    def record(self, cols: List[str], line: str, tab: str, columns: Mapping[str, SniffJSONItem]) -> JSONDict:
+        """ the conversion of a data line with any number of fields """
+        newrow = dict(zip(cols, [columns[name].convert(field.strip()) for name, field in zip(cols, line.split(tab))]))
+        if "" in newrow:
+            del newrow[""]
+        return newrow
+
+# ================================= #### HTML
+class FormatHTML(NumFormatJSONItem):
+    def __init__(self, formats: Dict[str, str] = {}):
+        NumFormatJSONItem.__init__(self, formats)
+
+def tabToHTMLx(result: Union[JSONList, JSONDict, DataList, DataItem],  # ..
+               sorts: RowSortList = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
+               *, legend: LegendList = [], combine: Dict[str, str] = {}) -> str:
+    if isinstance(result, Dict):
+        results = [result]
+    elif _is_dataitem(result):
         results = [_dataitem_asdict(cast(DataItem, result))]
     elif hasattr(result, "__len__") and len(cast(List[Any], result)) and (_is_dataitem(cast(List[Any], result)[0])):
         results = list(_dataitem_asdict(cast(DataItem, item)) for item in cast(List[Any], result))
@@ -885,199 +2052,41 @@ def tabToHTML(result: Iterable[JSONDict],  # ..
 def tabtoHTML(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
               *, legend: LegendList = [], tab: str = "|", padding: str = " ", minwidth: int = 0, 
               noheaders: bool = False, xmlns: str = "",
-              reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {}) -> str:
+              reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+              limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, stats: Optional[TabStats] = None) -> str:
+    return "".join(tabtoHTML_lines(data, headers, selected, legend=legend, tab=tab, padding=padding,
+                                   minwidth=minwidth, noheaders=noheaders, xmlns=xmlns, reorder=reorder,
+                                   sorts=sorts, formatter=formatter, limit=limit, offset=offset, spec=spec, stats=stats))
+
+def tabtoHTML_lines(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
+                    *, legend: LegendList = [], tab: str = "|", padding: str = " ", minwidth: int = 0, 
+                    noheaders: bool = False, xmlns: str = "",
+                    reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+                    limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, stats: Optional[TabStats] = None) -> Iterator[str]:
     logg.debug("tabtoHTML")
     minwidth = minwidth or MINWIDTH
-    renameheaders: Dict[str, str] = {}
-    showheaders: List[str] = []
-    sortheaders: List[str] = []
-    formats: Dict[str, str] = {}
-    combine: Dict[str, List[str]] = {}
-    freehdrs: Dict[str, str] = {}
-    for header in headers:
-        combines = ""
-        for selheader in header.split("|"):
-            if "@" in selheader:
-                selcol, rename = selheader.split("@", 1)
-            else:
-                selcol, rename = selheader, ""
-            if "{" in selcol and "{:" not in selcol:
-                names3: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon3, brace3 = freepart.find(":"), freepart.find("}")
-                    if brace3 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end3 = brace3 if colon3 == -1 else min(colon3, brace3)
-                    name3 = freepart[:end3]
-                    names3.append(name3)
-                col = " ".join(names3)
-                freehdrs[col] = selcol
-            elif ":" in selcol:
-                col, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[col] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                col = selcol
-            showheaders += [col]  # headers make a default column order
-            if rename:
-                sortheaders += [col]  # headers does not sort anymore
-            if not combines:
-                combines = col
-            elif combines not in combine:
-                combine[combines] = [col]
-            elif col not in combine[combines]:
-                combine[combines] += [col]
-            if rename:
-                renameheaders[col] = rename
-    logg.debug("renameheaders = %s", renameheaders)
-    logg.debug("sortheaders = %s", sortheaders)
-    logg.debug("formats = %s", formats)
-    logg.debug("combine = %s", combine)
-    logg.debug("freehdrs = %s", freehdrs)
-    logg.debug("combine > %s", combine)
-    combined: Dict[str, List[str]] = {}
-    renaming: Dict[str, str] = {}
-    filtered: Dict[str, str] = {}
-    selcols: List[str] = []
-    freecols: Dict[str, str] = {}
-    for selecheader in selected:
-        combines = ""
-        for selec in selecheader.split("|"):
-            if "@" in selec:
-                selcol, rename = selec.split("@", 1)
-            else:
-                selcol, rename = selec, ""
-            if "{" in selcol and "{:" not in selcol:
-                names4: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon4, brace4 = freepart.find(":"), freepart.find("}")
-                    if brace4 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end4 = brace4 if colon4 == -1 else min(colon4, brace4)
-                    name4 = freepart[:end4]
-                    names4.append(name4)
-                col = " ".join(names4)
-                freecols[col] = selcol
-            elif ":" in selcol:
-                col, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[col] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                col = selcol
-            if "<" in col:
-                col, cond = col.split("<", 1)
-                filtered[col] = "<" + cond
-            elif ">" in col:
-                col, cond = col.split(">", 1)
-                filtered[col] = ">" + cond
-            elif "=" in col:
-                col, cond = col.split("=", 1)
-                filtered[col] = "=" + cond
-            selcols.append(col)
-            if rename:
-                renaming[col] = rename
-            if not combines:
-                combines = col
-            elif combines not in combined:
-                combined[combines] = [col]
-            elif combines not in combined[combines]:
-                combined[combines] += [col]
-    logg.debug("combined = %s", combined)
-    logg.debug("renaming = %s", renaming)
-    logg.debug("filtered = %s", filtered)
-    logg.debug("selcols = %s", selcols)
-    logg.debug("freecols = %s", freecols)
-    if not selected:
-        combined = combine  # argument
-        freecols = freehdrs
-        renaming = renameheaders
-        logg.debug("combined : %s", combined)
-        logg.debug("freecols : %s", freecols)
-        logg.debug("renaming : %s", renaming)
-    newsorts: Dict[str, str] = {}
-    colnames: Dict[str, str] = {}
-    for col, rename in renaming.items():
-        if "@" in rename:
-            newname, newsort = rename.split("@", 1)
-        elif rename and rename[0].isalpha():
-            newname, newsort = rename, ""
-        else:
-            newname, newsort = "", rename
-        if newname:
-            colnames[col] = newname
-            if col in formats:
-                formats[newname] = formats[col]
-        if newsort:
-            newsorts[col] = newsort
-    logg.debug("newsorts = %s", newsorts)
-    logg.debug("colnames = %s", colnames)
-    if sorts:
-        sortcolumns = sorts
-    else:
-        sortcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols or sortheaders)]
-        if newsorts:
-            for num, col in enumerate(sortcolumns):
-                if col not in newsorts:
-                    newsorts[col] = ("@" * len(str(num)) + str(num))
-            sortcolumns = sorted(newsorts, key=lambda x: newsorts[x])
-            logg.debug("sortcolumns : %s", sortcolumns)
+    spec = tabspec(headers, selected) if spec is None else spec
+    formats, combined = spec.formats, spec.combined
+    sortcolumns = sorts if sorts else spec.sortcolumns
     format: FormatJSONItem
     if formatter and isinstance(formatter, FormatJSONItem):
         format = formatter
     else:
         logg.debug("formats = %s |")
         format = FormatHTML(formats)
-    selcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols)]
-    selheaders = [(name if name not in colnames else colnames[name]) for name in (showheaders)]
+    if stats is not None:
+        format = stats.formatter(format)
+    selcolumns = spec.selcolumns
+    selheaders = spec.selheaders
     sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
     sortrow = RowSortCallable(sortcolumns)
-    rows: List[JSONDict] = []
+    rows = RowSorter(sortrow, limit=limit, offset=offset)
     cols: Dict[str, int] = {}
-    for num, item in enumerate(data):
-        row: JSONDict = {}
-        if "#" in selcols:
-            row["#"] = num + 1
-            cols["#"] = len(str(num + 1))
-        skip = False
-        for col, value in item.items():
-            selname = col
-            if col in renameheaders and renameheaders[col] in selcols:
-                selname = renameheaders[col]
-            if selcols and selname not in selcols and "*" not in selcols:
-                continue
-            try:
-                if col in filtered:
-                    skip = skip or unmatched(value, filtered[col])
-            except: pass
-            colname = selname if selname not in colnames else colnames[selname]
-            row[colname] = value
-            oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-            cols[colname] = max(oldlen, len(format(colname, value)))
-        for freecol, freeformat in freecols.items():
-            try:
-                freenames = freecol.split(" ")
-                freeitem: JSONDict = dict([(freename, _None_String) for freename in freenames])
-                for col, value in item.items():
-                    itemname = col
-                    if col in renameheaders and renameheaders[col] in freenames:
-                        itemname = renameheaders[col]
-                    if itemname in freenames:
-                        freeitem[itemname] = format(col, value)
-                value = freeformat.format(**freeitem)
-                colname = freecol if freecol not in colnames else colnames[freecol]
-                row[colname] = value
-                oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-                cols[colname] = max(oldlen, len(value))
-            except Exception as e:
-                logg.info("formatting '%s' at %s bad for:\n\t%s", freeformat, e, item)
-        if not skip:
-            rows.append(row)
+    scanned = _scanrows(data, spec, format, minwidth, cols, stats)
+    if stats is not None:
+        scanned = stats.timed("scan", scanned)
+    for row in scanned:
+        rows.append(row)
     combining = []
     for combines in combined:
         combining += combined[combines]
@@ -1087,7 +2096,21 @@ def tabtoHTML(data: Iterable[JSONDict], headers: List[str] = [], selected: List[
                 combining.remove(added)  # the shown combined column seperately
     colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
     colr = tuple(((' style="text-align: right"' if format.right(col) else "") for col in colo))
-    lines = []
+    table = "<table>"
+    end = ""
+    if tab:
+        table = table.replace(">", ' border="%x">' % len(tab))
+    if padding:
+        table = table.replace(">", ' cellpadding="%s">' % (8 * len(padding)))
+    if xmlns:
+        if "http://" not in xmlns:
+            xmlns = "http://www.w3.org/" + xmlns
+        table = '<html xmlns="%s">\n' % xmlns + table
+        end = '</html>'
+    yield table + "\n"
+    if stats is not None:
+        rows = stats.timed("sort", rows, "rows_out")
+    lines = 0
     if not noheaders:
         headers = []
         for m, col in enumerate(colo):
@@ -1099,8 +2122,9 @@ def tabtoHTML(data: Iterable[JSONDict], headers: List[str] = [], selected: List[
                     if adds in cols:
                         html = html.replace("</th>", "<br />%s</th>" % escape(adds))
             headers += [html]
-        lines.append("<tr>" + "".join(headers) + "</tr>")
-    for item in sorted(rows, key=sortrow):
+        yield "<tr>" + "".join(headers) + "</tr>\n"
+        lines += 1
+    for item in rows:
         values: Dict[str, str] = dict([(name, "") for name in cols.keys()])  # initialized with all columns to empty string
         for col, value in item.items():
             values[col] = format(col, value)
@@ -1114,19 +2138,11 @@ def tabtoHTML(data: Iterable[JSONDict], headers: List[str] = [], selected: List[
                     if adds in cols:
                         html = html.replace("</td>", "<br />%s</td>" % escape(values[adds]))
             cells += [html]
-        lines.append("<tr>" + "".join(cells) + "</tr>")
-    table = "<table>"
-    end = ""
-    if tab:
-        table = table.replace(">", ' border="%x">' % len(tab))
-    if padding:
-        table = table.replace(">", ' cellpadding="%s">' % (8 * len(padding)))
-    if xmlns:
-        if "http://" not in xmlns:
-            xmlns = "http://www.w3.org/" + xmlns
-        table = '<html xmlns="%s">\n' % xmlns + table
-        end = '</html>'
-    return table + "\n" + "\n".join(lines) + "\n</table>\n" + legendToHTML(legend, sorts, reorder) + end
+        yield "<tr>" + "".join(cells) + "</tr>\n"
+        lines += 1
+    if not lines:
+        yield "\n"
+    yield "</table>\n" + legendToHTML(legend, sorts, reorder) + end
 
 def legendToHTML(legend: LegendList, sorts: RowSortList = [], reorder: ColSortList = []) -> str:
     sortkey = ColSortCallable(sorts, reorder)
@@ -1148,18 +2164,22 @@ def listToHTML(lines: Sequence[str]) -> str:
 def loadHTML(text: str, datedelim: str = '-') -> JSONList:
     parser = DictParserHTML(datedelim)
     return list(parser.loads(text))
-def readFromHTML(filename: str, datedelim: str = '-') -> JSONList:
-    parser = DictParserHTML(datedelim)
+def readFromHTML(filename: str, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> JSONList:
+    parser = DictParserHTML(datedelim, schema=schema, raw=raw)
     return list(parser.load(filename))
-def tabtextfileHTML(filename: str, datedelim: str = '-') -> TabText:
-    parser = DictParserHTML(datedelim)
+def tabtextfileHTML(filename: str, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> TabText:
+    parser = DictParserHTML(datedelim, schema=schema, raw=raw)
     data = list(parser.load(filename))
     return TabText(data, parser.headers)
 
 class DictParserHTML(DictParser):
-    def __init__(self, datedelim: str = '-', convert_charrefs: bool = True) -> None:
+    def __init__(self, datedelim: str = '-', convert_charrefs: bool = True, *, sniff: Optional[int] = None,
+                 schema: Optional[JSONSchema] = None, raw: bool = False) -> None:
         self.convert = ParseJSONItem(datedelim)
         self.convert_charrefs = convert_charrefs
+        self.sniff = sniff
+        self.schema = schema
+        self.raw = raw
         self.headers = STRLIST
     def load(self, filename: str, *, tab: Optional[str] = None) -> Iterator[JSONDict]:
         return self.read(open(filename))
@@ -1217,12 +2237,14 @@ class DictParserHTML(DictParser):
                     self.td = []
                     self.td2 = []
         parser = MyHTMLParser(convert_charrefs=self.convert_charrefs)
+        columns = self.convert.columns(self.sniff, self.schema, self.raw)
         for row in rows:
             parser.feed(row)
             for record in parser.tr():
                 for key, val in record.items():
                     if isinstance(val, str):
-                        record[key] = self.convert.toJSONItem(val)
+                        record[key] = columns[key].convert(val)
+                self.headers = parser.th
                 yield record
         self.headers = parser.th
 
@@ -1233,7 +2255,9 @@ class FormatJSON(BaseFormatJSONItem):
         self.floatfmt = FLOATFMT
         self.datedelim = datedelim
         self.None_String = "null"
-    def __call__(self, col: str, val: JSONItem) -> str:
+    def compile(self, col: str) -> Callable[[JSONItem], str]:
+        return self.value
+    def value(self, val: JSONItem) -> str:
         if val is None:
             return self.None_String
         if isinstance(val, float):
@@ -1291,235 +2315,166 @@ def tabToJSON(result: Iterable[JSONDict],  # ..
 
 def tabtoJSON(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
               *, legend: LegendList = [], padding: str = " ", minwidth: int = 0, datedelim: str = '-',
-              reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {}) -> str:
+              reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+              limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, stats: Optional[TabStats] = None) -> str:
+    return "".join(tabtoJSON_lines(data, headers, selected, legend=legend, padding=padding,
+                                   minwidth=minwidth, datedelim=datedelim, reorder=reorder, sorts=sorts,
+                                   formatter=formatter, limit=limit, offset=offset, spec=spec, stats=stats))
+
+def tabtoJSON_lines(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
+                    *, legend: LegendList = [], padding: str = " ", minwidth: int = 0, datedelim: str = '-',
+                    reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+                    limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, stats: Optional[TabStats] = None) -> Iterator[str]:
     minwidth = minwidth or MINWIDTH
     logg.debug("tabtoJSON:")
-    renameheaders: Dict[str, str] = {}
-    showheaders: List[str] = []
-    sortheaders: List[str] = []
-    formats: Dict[str, str] = {}
-    freehdrs: Dict[str, str] = {}
-    for header in headers:
-        combines = ""
-        for selheader in header.split("|"):
-            if "@" in selheader:
-                selcol, rename = selheader.split("@", 1)
-            else:
-                selcol, rename = selheader, ""
-            if "{" in selcol and "{:" not in selcol:
-                names3: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon3, brace3 = freepart.find(":"), freepart.find("}")
-                    if brace3 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end3 = brace3 if colon3 == -1 else min(colon3, brace3)
-                    name3 = freepart[:end3]
-                    names3.append(name3)
-                name = " ".join(names3)
-                freehdrs[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            showheaders += [name]  # headers make a default column order
-            if rename:
-                sortheaders += [name]  # headers does not sort anymore
-            if rename:
-                renameheaders[name] = rename
-    logg.debug("renameheaders = %s", renameheaders)
-    logg.debug("sortheaders = %s", sortheaders)
-    logg.debug("formats = %s", formats)
-    logg.debug("freehdrs = %s", freehdrs)
-    renaming: Dict[str, str] = {}
-    filtered: Dict[str, str] = {}
-    selcols: List[str] = []
-    freecols: Dict[str, str] = {}
-    for selecheader in selected:
-        combines = ""
-        for selec in selecheader.split("|"):
-            if "@" in selec:
-                selcol, rename = selec.split("@", 1)
-            else:
-                selcol, rename = selec, ""
-            if "{" in selcol and "{:" not in selcol:
-                names4: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon4, brace4 = freepart.find(":"), freepart.find("}")
-                    if brace4 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end4 = brace4 if colon4 == -1 else min(colon4, brace4)
-                    name4 = freepart[:end4]
-                    names4.append(name4)
-                name = " ".join(names4)
-                freecols[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            if "<" in name:
-                name, cond = name.split("<", 1)
-                filtered[name] = "<" + cond
-            elif ">" in name:
-                name, cond = name.split(">", 1)
-                filtered[name] = ">" + cond
-            elif "=" in name:
-                name, cond = name.split("=", 1)
-                filtered[name] = "=" + cond
-            selcols.append(name)
-            if rename:
-                renaming[name] = rename
-    logg.debug("renaming = %s", renaming)
-    logg.debug("filtered = %s", filtered)
-    logg.debug("selcols = %s", selcols)
-    logg.debug("freecols = %s", freecols)
-    if not selected:
-        freecols = freehdrs
-        renaming = renameheaders
-        logg.debug("freecols : %s", freecols)
-        logg.debug("renaming : %s", renaming)
-    newsorts: Dict[str, str] = {}
-    colnames: Dict[str, str] = {}
-    for name, rename in renaming.items():
-        if "@" in rename:
-            newname, newsort = rename.split("@", 1)
-        elif rename and rename[0].isalpha():
-            newname, newsort = rename, ""
-        else:
-            newname, newsort = "", rename
-        if newname:
-            colnames[name] = newname
-            if name in formats:
-                formats[newname] = formats[name]
-        if newsort:
-            newsorts[name] = newsort
-    logg.debug("newsorts = %s", newsorts)
-    logg.debug("colnames = %s", colnames)
-    if sorts:
-        sortcolumns = sorts
-    else:
-        sortcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols or sortheaders)]
-        if newsorts:
-            for num, name in enumerate(sortcolumns):
-                if name not in newsorts:
-                    newsorts[name] = ("@" * len(str(num)) + str(num))
-            sortcolumns = sorted(newsorts, key=lambda x: newsorts[x])
-            logg.debug("sortcolumns : %s", sortcolumns)
+    spec = tabspec(headers, selected) if spec is None else spec
+    formats = spec.formats
+    sortcolumns = sorts if sorts else spec.sortcolumns
     format: FormatJSONItem
     if formatter and isinstance(formatter, FormatJSONItem):
         format = formatter
     else:
-        logg.debug("formats = %s | datedelim=%s", formats, datedelim)
-        format = FormatJSON(formats, datedelim=datedelim)
-    if legend:
-        logg.debug("legend is ignored for JSON output")
-    selcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols)]
-    selheaders = [(name if name not in colnames else colnames[name]) for name in (showheaders)]
-    sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
-    sortrow = RowSortCallable(sortcolumns)
-    rows: List[JSONDict] = []
-    cols: Dict[str, int] = {}
-    for num, item in enumerate(data):
-        row: JSONDict = {}
-        if "#" in selcols:
-            row["#"] = num + 1
-            cols["#"] = len(str(num + 1))
-        skip = False
-        for name, value in item.items():
-            selname = name
-            if name in renameheaders and renameheaders[name] in selcols:
-                selname = renameheaders[name]
-            if selcols and selname not in selcols and "*" not in selcols:
-                continue
-            try:
-                if name in filtered:
-                    skip = skip or unmatched(value, filtered[name])
-            except: pass
-            colname = selname if selname not in colnames else colnames[selname]
-            row[colname] = value
-            oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-            cols[colname] = max(oldlen, len(format(colname, value)))
-        for freecol, freeformat in freecols.items():
-            try:
-                freenames = freecol.split(" ")
-                freeitem: JSONDict = dict([(freename, _None_String) for freename in freenames])
-                for name, value in item.items():
-                    itemname = name
-                    if name in renameheaders and renameheaders[name] in freenames:
-                        itemname = renameheaders[name]
-                    if itemname in freenames:
-                        freeitem[itemname] = format(name, value)
-                value = freeformat.format(**freeitem)
-                colname = freecol if freecol not in colnames else colnames[freecol]
-                row[colname] = value
-                oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-                cols[colname] = max(oldlen, len(value))
-            except Exception as e:
-                logg.info("formatting '%s' at %s bad for:\n\t%s", freeformat, e, item)
-        if not skip:
+        logg.debug("formats = %s | datedelim=%s", formats, datedelim)
+        format = FormatJSON(formats, datedelim=datedelim)
+    if stats is not None:
+        format = stats.formatter(format)
+    if legend:
+        logg.debug("legend is ignored for JSON output")
+    selcolumns = spec.selcolumns
+    selheaders = spec.selheaders
+    sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
+    sortrow = RowSortCallable(sortcolumns)
+    cols: Dict[str, int] = {}
+    scanned = _scanrows(data, spec, format, minwidth, cols, stats)
+    if stats is not None:
+        scanned = stats.timed("scan", scanned)
+    rows: Iterable[JSONDict]
+    colo: Optional[Tuple[str, ...]] = None  # ordered column names, or ordered per row
+    if sortcolumns or limit or offset or reorder:
+        rows = RowSorter(sortrow, limit=limit, offset=offset)
+        for row in scanned:
             rows.append(row)
-    colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
+        colo = tuple(sorted(cols.keys(), key=sortkey))
+    else:
+        rows = scanned  # incremental output in the input order
+    roworder = _roworder(sortkey)
     pad = " " * len(padding)
     comma = "," + pad
-    lines = []
-    for item in sorted(rows, key=sortrow):
+    yield "[\n"
+    last = ""
+    if stats is not None:
+        rows = stats.timed("sort", rows, "rows_out")
+    for item in rows:
         values: JSONDict = {}
         for name, value in item.items():
             values[name] = format(name, value)
-        line = ['"%s":%s%s' % (name, pad, values[name]) for name in colo if name in values]
-        lines.append(" {" + comma.join(line) + "}")
-    return "[\n" + ",\n".join(lines) + "\n]"
+        line = ['"%s":%s%s' % (name, pad, values[name]) for name in (colo if colo is not None else roworder(values)) if name in values]
+        if last:
+            yield last + ",\n"
+        last = " {" + comma.join(line) + "}"
+    yield last + "\n]"
 
 def loadJSON(text: str, datedelim: str = '-') -> JSONList:
     parser = DictParserJSON(datedelim)
     return list(parser.loads(text))
-def readFromJSON(filename: str, datedelim: str = '-') -> JSONList:
-    parser = DictParserJSON(datedelim)
+def readFromJSON(filename: str, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> JSONList:
+    """ all the records as a list - a large file is decoded as a stream (see JSONSTREAM), so that
+        its text is not held in memory, but for bounded memory use DictParserJSON.load() or
+        tabrowsfile() as the command line does """
+    parser = DictParserJSON(datedelim, schema=schema, raw=raw)
     return list(parser.load(filename))
-def tabtextfileJSON(filename: str, datedelim: str = '-') -> TabText:
-    return TabText(readFromJSON(filename, datedelim), [])
+def tabtextfileJSON(filename: str, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> TabText:
+    return TabText(readFromJSON(filename, datedelim, schema=schema, raw=raw), [])
 
 class DictParserJSON(DictParser):
-    def __init__(self, datedelim: str = '-') -> None:
+    """ json has the data types except Date/Time which are detected in strings, unless
+        a 'schema' declares the type of the column (or "str" to keep it, as does 'raw'). """
+    def __init__(self, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> None:
         self.convert = ParseJSONItem(datedelim)
+        self.schema = schema
+        self.raw = raw
     def read(self, rows: Iterable[str], newline: str = '\n') -> Iterator[JSONDict]:
         return self.loads(newline.join(rows))
     def loads(self, text: str) -> Iterator[JSONDict]:
         jsondata = json.loads(text)
         data: List[JSONDict] = jsondata
-        for record in data:
-            for key, val in record.items():
-                if isinstance(val, str):
-                    record[key] = self.convert.toDate(val)
-            yield record
+        yield from self.records(data)
     def load(self, filename: str) -> Iterator[JSONDict]:
+        if os.path.getsize(filename) > JSONSTREAM:
+            yield from self.records(self.stream(filename))
+            return
         jsondata = json.load(open(filename))
         data: List[JSONDict] = jsondata
+        yield from self.records(data)
+    def stream(self, filename: str) -> Iterator[JSONDict]:
+        """ the elements of the top-level json array, each one decoded with raw_decode from
+            the text of READBUFFER blocks, so that only the current record is in memory """
+        decoder = json.JSONDecoder()
+        space = re.compile(r"[ \t\n\r]*")
+        with open(filename) as f:
+            text, pos, eof, first = "", 0, False, True
+            expect = "["  # then "{" for an element or "]" and after it "," or "]"
+            while True:
+                pos = space.match(text, pos).end()
+                if pos == len(text):
+                    if eof:
+                        raise json.JSONDecodeError("Expecting '%s'" % expect, text, pos)
+                    block = f.read(READBUFFER)
+                    text, pos, eof = text[pos:] + block, 0, not block
+                    continue
+                char = text[pos]
+                if expect == "[":
+                    if char != "[":  # not an array of records
+                        yield from json.loads(text[pos:] + f.read())
+                        return
+                    expect, pos = "{", pos + 1
+                    continue
+                if char == "]" and (first or expect == ","):
+                    return
+                if expect == ",":
+                    if char != ",":
+                        raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+                    expect, pos = "{", pos + 1
+                    continue
+                try:
+                    record, end = decoder.raw_decode(text, pos)
+                    done = end < len(text) or eof  # a number could go on in the next block
+                except json.JSONDecodeError as e:
+                    if eof or (e.pos < len(text) - 6 and not e.msg.startswith("Unterminated string")):
+                        raise  # a syntax error before the end of the text (an escape is up to 6 chars)
+                    done = False
+                if not done:  # the element is not complete in the text, read a bigger block
+                    block = f.read(max(READBUFFER, len(text) - pos))
+                    text, pos, eof = text[pos:] + block, 0, not block
+                    continue
+                yield record
+                expect, pos = ",", end
+                first = False
+    def records(self, data: Iterable[JSONDict]) -> Iterator[JSONDict]:
+        if self.raw:
+            yield from data
+            return
+        toDate = self.convert.toDate
+        declared = dict((name, self.convert.declared(kind)) for name, kind in (self.schema or {}).items())
         for record in data:
             for key, val in record.items():
                 if isinstance(val, str):
-                    record[key] = self.convert.toDate(val)
+                    if key in declared:
+                        record[key] = declared[key](val)
+                    else:
+                        record[key] = toDate(val)
             yield record
 
 # ================================= #### YAML
 class FormatYAML(FormatJSON):
     def __init__(self, formats: Dict[str, str] = {}, datedelim: str = '-'):
         FormatJSON.__init__(self, formats, datedelim)
-    def __call__(self, col: str, val: JSONItem) -> str:
+    def value(self, val: JSONItem) -> str:
         if val is None:
             return self.None_String
         if isinstance(val, (Date, Time)):
             return '%s' % self.item(val)
-        return FormatJSON.__call__(self, col, val)
+        return FormatJSON.value(self, val)
 
 def tabToYAMLx(result: Union[JSONList, JSONDict, DataList, DataItem],  # ..
                sorts: RowSortList = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
@@ -1570,212 +2525,87 @@ def tabToYAML(result: Iterable[JSONDict],  # ..
 
 def tabtoYAML(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
               *, legend: LegendList = [], padding: str = " ", minwidth: int = 0, datedelim: str = '-',  #
-              reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {}) -> str:
+              reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+              limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, stats: Optional[TabStats] = None) -> str:
+    return "".join(tabtoYAML_lines(data, headers, selected, legend=legend, padding=padding,
+                                   minwidth=minwidth, datedelim=datedelim, reorder=reorder, sorts=sorts,
+                                   formatter=formatter, limit=limit, offset=offset, spec=spec, stats=stats))
+
+def tabtoYAML_lines(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
+                    *, legend: LegendList = [], padding: str = " ", minwidth: int = 0, datedelim: str = '-',  #
+                    reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+                    limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, stats: Optional[TabStats] = None) -> Iterator[str]:
     minwidth = minwidth or MINWIDTH
     logg.debug("tabtoYAML:")
-    renameheaders: Dict[str, str] = {}
-    showheaders: List[str] = []
-    sortheaders: List[str] = []
-    formats: Dict[str, str] = {}
-    freehdrs: Dict[str, str] = {}
-    for header in headers:
-        combines = ""
-        for selheader in header.split("|"):
-            if "@" in selheader:
-                selcol, rename = selheader.split("@", 1)
-            else:
-                selcol, rename = selheader, ""
-            if "{" in selcol and "{:" not in selcol:
-                names3: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon3, brace3 = freepart.find(":"), freepart.find("}")
-                    if brace3 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end3 = brace3 if colon3 == -1 else min(colon3, brace3)
-                    name3 = freepart[:end3]
-                    names3.append(name3)
-                name = " ".join(names3)
-                freehdrs[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            showheaders += [name]  # headers make a default column order
-            if rename:
-                sortheaders += [name]  # headers does not sort anymore
-            if rename:
-                renameheaders[name] = rename
-    logg.debug("renameheaders = %s", renameheaders)
-    logg.debug("sortheaders = %s", sortheaders)
-    logg.debug("formats = %s", formats)
-    logg.debug("freehdrs = %s", freehdrs)
-    renaming: Dict[str, str] = {}
-    filtered: Dict[str, str] = {}
-    selcols: List[str] = []
-    freecols: Dict[str, str] = {}
-    for selecheader in selected:
-        combines = ""
-        for selec in selecheader.split("|"):
-            if "@" in selec:
-                selcol, rename = selec.split("@", 1)
-            else:
-                selcol, rename = selec, ""
-            if "{" in selcol and "{:" not in selcol:
-                names4: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon4, brace4 = freepart.find(":"), freepart.find("}")
-                    if brace4 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end4 = brace4 if colon4 == -1 else min(colon4, brace4)
-                    name4 = freepart[:end4]
-                    names4.append(name4)
-                name = " ".join(names4)
-                freecols[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            if "<" in name:
-                name, cond = name.split("<", 1)
-                filtered[name] = "<" + cond
-            elif ">" in name:
-                name, cond = name.split(">", 1)
-                filtered[name] = ">" + cond
-            elif "=" in name:
-                name, cond = name.split("=", 1)
-                filtered[name] = "=" + cond
-            selcols.append(name)
-            if rename:
-                renaming[name] = rename
-    logg.debug("renaming = %s", renaming)
-    logg.debug("filtered = %s", filtered)
-    logg.debug("selcols = %s", selcols)
-    logg.debug("freecols = %s", freecols)
-    if not selected:
-        freecols = freehdrs
-        renaming = renameheaders
-        logg.debug("freecols : %s", freecols)
-        logg.debug("renaming : %s", renaming)
-    newsorts: Dict[str, str] = {}
-    colnames: Dict[str, str] = {}
-    for name, rename in renaming.items():
-        if "@" in rename:
-            newname, newsort = rename.split("@", 1)
-        elif rename and rename[0].isalpha():
-            newname, newsort = rename, ""
-        else:
-            newname, newsort = "", rename
-        if newname:
-            colnames[name] = newname
-            if name in formats:
-                formats[newname] = formats[name]
-        if newsort:
-            newsorts[name] = newsort
-    logg.debug("newsorts = %s", newsorts)
-    logg.debug("colnames = %s", colnames)
-    if sorts:
-        sortcolumns = sorts
-    else:
-        sortcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols or sortheaders)]
-        if newsorts:
-            for num, name in enumerate(sortcolumns):
-                if name not in newsorts:
-                    newsorts[name] = ("@" * len(str(num)) + str(num))
-            sortcolumns = sorted(newsorts, key=lambda x: newsorts[x])
-            logg.debug("sortcolumns : %s", sortcolumns)
+    spec = tabspec(headers, selected) if spec is None else spec
+    formats = spec.formats
+    sortcolumns = sorts if sorts else spec.sortcolumns
     format: FormatJSONItem
     if formatter and isinstance(formatter, FormatJSONItem):
         format = formatter
     else:
         logg.debug("formats = %s | datedelim=%s", formats, datedelim)
         format = FormatYAML(formats, datedelim=datedelim)
+    if stats is not None:
+        format = stats.formatter(format)
     if legend:
         logg.debug("legend is ignored for YAML output")
-    selcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols)]
-    selheaders = [(name if name not in colnames else colnames[name]) for name in (showheaders)]
+    selcolumns = spec.selcolumns
+    selheaders = spec.selheaders
     sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
     sortrow = RowSortCallable(sortcolumns)
-    rows: List[JSONDict] = []
     cols: Dict[str, int] = {}
-    for num, item in enumerate(data):
-        row: JSONDict = {}
-        if "#" in selcols:
-            row["#"] = num + 1
-            cols["#"] = len(str(num + 1))
-        skip = False
-        for name, value in item.items():
-            selname = name
-            if name in renameheaders and renameheaders[name] in selcols:
-                selname = renameheaders[name]
-            if selcols and selname not in selcols and "*" not in selcols:
-                continue
-            try:
-                if name in filtered:
-                    skip = skip or unmatched(value, filtered[name])
-            except: pass
-            colname = selname if selname not in colnames else colnames[selname]
-            row[colname] = value
-            oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-            cols[colname] = max(oldlen, len(format(colname, value)))
-        for freecol, freeformat in freecols.items():
-            try:
-                freenames = freecol.split(" ")
-                freeitem: JSONDict = dict([(freename, _None_String) for freename in freenames])
-                for name, value in item.items():
-                    itemname = name
-                    if name in renameheaders and renameheaders[name] in freenames:
-                        itemname = renameheaders[name]
-                    if itemname in freenames:
-                        freeitem[itemname] = format(name, value)
-                value = freeformat.format(**freeitem)
-                colname = freecol if freecol not in colnames else colnames[freecol]
-                row[colname] = value
-                oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-                cols[colname] = max(oldlen, len(value))
-            except Exception as e:
-                logg.info("formatting '%s' at %s bad for:\n\t%s", freeformat, e, item)
-        if not skip:
+    scanned = _scanrows(data, spec, format, minwidth, cols, stats)
+    if stats is not None:
+        scanned = stats.timed("scan", scanned)
+    rows: Iterable[JSONDict]
+    colo: Optional[Tuple[str, ...]] = None  # ordered column names, or ordered per row
+    if sortcolumns or limit or offset or reorder:
+        rows = RowSorter(sortrow, limit=limit, offset=offset)
+        for row in scanned:
             rows.append(row)
-    colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
+        colo = tuple(sorted(cols.keys(), key=sortkey))
+    else:
+        rows = scanned  # incremental output in the input order
+    roworder = _roworder(sortkey)
     pad = " " * len(padding)
     is_simple = re.compile("^\\w[\\w_-]*$")
     def as_name(name: str) -> str:
         return (name if is_simple.match(name) else '"%s"' % name)
-    lines = []
-    for item in sorted(rows, key=sortrow):
+    yield "data:\n"
+    lines = 0
+    if stats is not None:
+        rows = stats.timed("sort", rows, "rows_out")
+    for item in rows:
         values: JSONDict = {}
         for name, value in item.items():
             values[name] = format(name, value)
-        line = ['%s:%s%s' % (as_name(name), pad, values[name]) for name in colo if name in values]
-        lines.append("- " + "\n  ".join(line))
-    return "data:\n" + "\n".join(lines) + "\n"
+        line = ['%s:%s%s' % (as_name(name), pad, values[name]) for name in (colo if colo is not None else roworder(values)) if name in values]
+        yield "- " + "\n  ".join(line) + "\n"
+        lines += 1
+    if not lines:
+        yield "\n"
 
 def loadYAML(text: str, datedelim: str = '-') -> JSONList:
     parser = DictParserYAML(datedelim=datedelim)
     return list(parser.loads(text))
-def readFromYAML(filename: str, datedelim: str = '-') -> JSONList:
-    parser = DictParserYAML(datedelim=datedelim)
+def readFromYAML(filename: str, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> JSONList:
+    parser = DictParserYAML(datedelim=datedelim, schema=schema, raw=raw)
     return list(parser.load(filename))
-def tabtextfileYAML(filename: str, datedelim: str = '-') -> TabText:
-    return TabText(readFromYAML(filename, datedelim), [])
+def tabtextfileYAML(filename: str, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> TabText:
+    return TabText(readFromYAML(filename, datedelim, schema=schema, raw=raw), [])
 
 def DictReaderYAML(rows: Iterable[str], *, datedelim: str = '-') -> Iterator[JSONDict]:
     parser = DictParserYAML(datedelim=datedelim)
     return parser.read(rows)
 
 class DictParserYAML(DictParser):
-    def __init__(self, *, datedelim: str = '-') -> None:
+    def __init__(self, *, datedelim: str = '-', sniff: Optional[int] = None, schema: Optional[JSONSchema] = None,
+                 raw: bool = False) -> None:
         self.convert = ParseJSONItem(datedelim)
+        self.sniff = sniff
+        self.schema = schema
+        self.raw = raw
         self.convert.None_String = "null"
         self.convert.True_String = "true"
         self.convert.False_String = "false"
@@ -1786,6 +2616,7 @@ class DictParserYAML(DictParser):
     def read(self, rows: Iterable[str]) -> Iterator[JSONDict]:
         at = "start"
         record: JSONDict = {}
+        columns = self.convert.columns(self.sniff, self.schema, self.raw)
         for row in rows:
             line = row.strip()
             if not line or line.startswith("#"):
@@ -1807,7 +2638,7 @@ class DictParserYAML(DictParser):
                 continue
             m = re.match(r" *(\w[\w\d.-]*) *: *(.*)", line)
             if m:
-                record[m.group(1)] = self.convert.toJSONItem(m.group(2).strip())
+                record[m.group(1)] = columns[m.group(1)].convert(m.group(2).strip())
                 continue
             m = re.match(r" *\"([^\"]+)\" *: *\"([^\"]*)\" *", line)
             if m:
@@ -1815,7 +2646,7 @@ class DictParserYAML(DictParser):
                 continue
             m = re.match(r" *\"([^\"]+)\" *: *(.*)", line)
             if m:
-                record[m.group(1)] = self.convert.toJSONItem(m.group(2).strip())
+                record[m.group(1)] = columns[m.group(1)].convert(m.group(2).strip())
                 continue
             logg.error("can not parse: %s", line)
         # end for
@@ -1826,12 +2657,12 @@ class DictParserYAML(DictParser):
 class FormatTOML(FormatJSON):
     def __init__(self, formats: Dict[str, str] = {}, datedelim: str = '-'):
         FormatJSON.__init__(self, formats, datedelim)
-    def __call__(self, col: str, val: JSONItem) -> str:
+    def value(self, val: JSONItem) -> str:
         if val is None:
             return self.None_String
         if isinstance(val, (Date, Time)):
             return '%s' % self.item(val)
-        return FormatJSON.__call__(self, col, val)
+        return FormatJSON.value(self, val)
 
 def tabToTOMLx(result: Union[JSONList, JSONDict, DataList, DataItem],  # ..
                sorts: RowSortList = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
@@ -1881,211 +2712,84 @@ def tabToTOML(result: Iterable[JSONDict],  # ..
 
 def tabtoTOML(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
               *, legend: LegendList = [], padding: str = " ", minwidth: int = 0, datedelim: str = '-',
-              reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {}) -> str:
-    minwidth = minwidth or MINWIDTH
-    logg.debug("tabtoGFM:")
-    renameheaders: Dict[str, str] = {}
-    showheaders: List[str] = []
-    sortheaders: List[str] = []
-    formats: Dict[str, str] = {}
-    freehdrs: Dict[str, str] = {}
-    for header in headers:
-        combines = ""
-        for selheader in header.split("|"):
-            if "@" in selheader:
-                selcol, rename = selheader.split("@", 1)
-            else:
-                selcol, rename = selheader, ""
-            if "{" in selcol and "{:" not in selcol:
-                names3: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon3, brace3 = freepart.find(":"), freepart.find("}")
-                    if brace3 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end3 = brace3 if colon3 == -1 else min(colon3, brace3)
-                    name3 = freepart[:end3]
-                    names3.append(name3)
-                name = " ".join(names3)
-                freehdrs[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            showheaders += [name]  # headers make a default column order
-            if rename:
-                sortheaders += [name]  # headers does not sort anymore
-            if rename:
-                renameheaders[name] = rename
-    logg.debug("renameheaders = %s", renameheaders)
-    logg.debug("sortheaders = %s", sortheaders)
-    logg.debug("formats = %s", formats)
-    logg.debug("freehdrs = %s", freehdrs)
-    renaming: Dict[str, str] = {}
-    filtered: Dict[str, str] = {}
-    selcols: List[str] = []
-    freecols: Dict[str, str] = {}
-    for selecheader in selected:
-        combines = ""
-        for selec in selecheader.split("|"):
-            if "@" in selec:
-                selcol, rename = selec.split("@", 1)
-            else:
-                selcol, rename = selec, ""
-            if "{" in selcol and "{:" not in selcol:
-                names4: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon4, brace4 = freepart.find(":"), freepart.find("}")
-                    if brace4 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end4 = brace4 if colon4 == -1 else min(colon4, brace4)
-                    name4 = freepart[:end4]
-                    names4.append(name4)
-                name = " ".join(names4)
-                freecols[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            if "<" in name:
-                name, cond = name.split("<", 1)
-                filtered[name] = "<" + cond
-            elif ">" in name:
-                name, cond = name.split(">", 1)
-                filtered[name] = ">" + cond
-            elif "=" in name:
-                name, cond = name.split("=", 1)
-                filtered[name] = "=" + cond
-            selcols.append(name)
-            if rename:
-                renaming[name] = rename
-    logg.debug("renaming = %s", renaming)
-    logg.debug("filtered = %s", filtered)
-    logg.debug("selcols = %s", selcols)
-    logg.debug("freecols = %s", freecols)
-    if not selected:
-        freecols = freehdrs
-        renaming = renameheaders
-        logg.debug("freecols : %s", freecols)
-        logg.debug("renaming : %s", renaming)
-        reorders: Dict[str, str] = {}
-    newsorts: Dict[str, str] = {}
-    colnames: Dict[str, str] = {}
-    for name, rename in renaming.items():
-        if "@" in rename:
-            newname, newsort = rename.split("@", 1)
-        elif rename and rename[0].isalpha():
-            newname, newsort = rename, ""
-        else:
-            newname, newsort = "", rename
-        if newname:
-            colnames[name] = newname
-            if name in formats:
-                formats[newname] = formats[name]
-        if newsort:
-            newsorts[name] = newsort
-    logg.debug("newsorts = %s", newsorts)
-    logg.debug("colnames = %s", colnames)
-    if sorts:
-        sortcolumns = sorts
-    else:
-        sortcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols or sortheaders)]
-        if newsorts:
-            for num, name in enumerate(sortcolumns):
-                if name not in newsorts:
-                    newsorts[name] = ("@" * len(str(num)) + str(num))
-            sortcolumns = sorted(newsorts, key=lambda x: newsorts[x])
-            logg.debug("sortcolumns : %s", sortcolumns)
+              reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+              limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, stats: Optional[TabStats] = None) -> str:
+    return "".join(tabtoTOML_lines(data, headers, selected, legend=legend, padding=padding,
+                                   minwidth=minwidth, datedelim=datedelim, reorder=reorder, sorts=sorts,
+                                   formatter=formatter, limit=limit, offset=offset, spec=spec, stats=stats))
+
+def tabtoTOML_lines(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
+                    *, legend: LegendList = [], padding: str = " ", minwidth: int = 0, datedelim: str = '-',
+                    reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+                    limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, stats: Optional[TabStats] = None) -> Iterator[str]:
+    minwidth = minwidth or MINWIDTH
+    logg.debug("tabtoGFM:")
+    spec = tabspec(headers, selected) if spec is None else spec
+    formats = spec.formats
+    sortcolumns = sorts if sorts else spec.sortcolumns
     format: FormatJSONItem
     if formatter and isinstance(formatter, FormatJSONItem):
         format = formatter
     else:
         logg.debug("formats = %s | datedelim=%s", formats, datedelim)
         format = FormatTOML(formats, datedelim=datedelim)
+    if stats is not None:
+        format = stats.formatter(format)
     if legend:
         logg.debug("legend is ignored for TOML output")
-    selcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols)]
-    selheaders = [(name if name not in colnames else colnames[name]) for name in (showheaders)]
+    selcolumns = spec.selcolumns
+    selheaders = spec.selheaders
     sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
     sortrow = RowSortCallable(sortcolumns)
-    rows: List[JSONDict] = []
     cols: Dict[str, int] = {}
-    for num, item in enumerate(data):
-        row: JSONDict = {}
-        if "#" in selcols:
-            row["#"] = num + 1
-            cols["#"] = len(str(num + 1))
-        skip = False
-        for name, value in item.items():
-            selname = name
-            if name in renameheaders and renameheaders[name] in selcols:
-                selname = renameheaders[name]
-            if selcols and selname not in selcols and "*" not in selcols:
-                continue
-            try:
-                if name in filtered:
-                    skip = skip or unmatched(value, filtered[name])
-            except: pass
-            colname = selname if selname not in colnames else colnames[selname]
-            row[colname] = value
-            oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-            cols[colname] = max(oldlen, len(format(colname, value)))
-        for freecol, freeformat in freecols.items():
-            try:
-                freenames = freecol.split(" ")
-                freeitem: JSONDict = dict([(freename, _None_String) for freename in freenames])
-                for name, value in item.items():
-                    itemname = name
-                    if name in renameheaders and renameheaders[name] in freenames:
-                        itemname = renameheaders[name]
-                    if itemname in freenames:
-                        freeitem[itemname] = format(name, value)
-                value = freeformat.format(**freeitem)
-                colname = freecol if freecol not in colnames else colnames[freecol]
-                row[colname] = value
-                oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-                cols[colname] = max(oldlen, len(value))
-            except Exception as e:
-                logg.info("formatting '%s' at %s bad for:\n\t%s", freeformat, e, item)
-        if not skip:
+    scanned = _scanrows(data, spec, format, minwidth, cols, stats)
+    if stats is not None:
+        scanned = stats.timed("scan", scanned)
+    rows: Iterable[JSONDict]
+    colo: Optional[Tuple[str, ...]] = None  # ordered column names, or ordered per row
+    if sortcolumns or limit or offset or reorder:
+        rows = RowSorter(sortrow, limit=limit, offset=offset)
+        for row in scanned:
             rows.append(row)
-    colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
+        colo = tuple(sorted(cols.keys(), key=sortkey))
+    else:
+        rows = scanned  # incremental output in the input order
+    roworder = _roworder(sortkey)
     pad = " " * len(padding)
     is_simple = re.compile("^\\w[\\w_-]*$")
     def as_name(name: str) -> str:
         return (name if is_simple.match(name) else '"%s"' % name)
-    lines = []
-    for item in sorted(rows, key=sortrow):
+    lines = 0
+    if stats is not None:
+        rows = stats.timed("sort", rows, "rows_out")
+    for item in rows:
         values: JSONDict = {}
         for name, value in item.items():
             if value is not None:
                 values[name] = format(name, value)
         line = ['%s%s=%s%s' % (as_name(name), pad, pad, values[name])
-                for name in colo if name in values]
-        lines.append("[[data]]\n" + "\n".join(line))
-    return "\n".join(lines) + "\n"
+                for name in (colo if colo is not None else roworder(values)) if name in values]
+        yield "[[data]]\n" + "\n".join(line) + "\n"
+        lines += 1
+    if not lines:
+        yield "\n"
 
 def loadTOML(text: str, datedelim: str = '-') -> JSONList:
     parser = DictParserTOML(datedelim=datedelim)
     return list(parser.loads(text))
-def readFromTOML(filename: str, datedelim: str = '-') -> JSONList:
-    parser = DictParserTOML(datedelim=datedelim)
+def readFromTOML(filename: str, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> JSONList:
+    parser = DictParserTOML(datedelim=datedelim, schema=schema, raw=raw)
     return list(parser.load(filename))
-def tabtextfileTOML(filename: str, datedelim: str = '-') -> TabText:
-    return TabText(readFromTOML(filename, datedelim), [])
+def tabtextfileTOML(filename: str, datedelim: str = '-', *, schema: Optional[JSONSchema] = None, raw: bool = False) -> TabText:
+    return TabText(readFromTOML(filename, datedelim, schema=schema, raw=raw), [])
 
 class DictParserTOML(DictParser):
-    def __init__(self, *, datedelim: str = '-') -> None:
+    def __init__(self, *, datedelim: str = '-', sniff: Optional[int] = None, schema: Optional[JSONSchema] = None,
+                 raw: bool = False) -> None:
         self.convert = ParseJSONItem(datedelim)
+        self.sniff = sniff
+        self.schema = schema
+        self.raw = raw
         self.convert.None_String = "null"
         self.convert.True_String = "true"
         self.convert.False_String = "false"
@@ -2096,6 +2800,7 @@ class DictParserTOML(DictParser):
     def read(self, rows: Iterable[str]) -> Iterator[JSONDict]:
         at = "start"
         record: JSONDict = {}
+        columns = self.convert.columns(self.sniff, self.schema, self.raw)
         for row in rows:
             line = row.strip()
             if not line or line.startswith("#"):
@@ -2115,7 +2820,7 @@ class DictParserTOML(DictParser):
                 continue
             m = re.match(r" *(\w[\w\d.-]*) *= *(.*)", line)
             if m:
-                record[m.group(1)] = self.convert.toJSONItem(m.group(2).strip())
+                record[m.group(1)] = columns[m.group(1)].convert(m.group(2).strip())
                 continue
             m = re.match(r" *\"([^\"]+)\" *= *\"([^\"]*)\" *", line)
             if m:
@@ -2123,7 +2828,7 @@ class DictParserTOML(DictParser):
                 continue
             m = re.match(r" *\"([^\"]+)\" *= *(.*)", line)
             if m:
-                record[m.group(1)] = self.convert.toJSONItem(m.group(2).strip())
+                record[m.group(1)] = columns[m.group(1)].convert(m.group(2).strip())
                 continue
             logg.error("can not parse: %s", line)
         # end for
@@ -2210,265 +2915,170 @@ def tabToCSV(result: Iterable[JSONDict],  # ..
 
 def tabtoCSV(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
              *, legend: LegendList = [], minwidth: int = 0, datedelim: str = '-', noheaders: bool = False, unique: bool = False, tab: str = ";",
-             reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {}) -> str:
+             reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+             limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, workers: int = 0,
+             stats: Optional[TabStats] = None) -> str:
+    return "".join(tabtoCSV_lines(data, headers, selected, legend=legend, minwidth=minwidth,
+                                  datedelim=datedelim, noheaders=noheaders, unique=unique, tab=tab,
+                                  reorder=reorder, sorts=sorts, formatter=formatter, limit=limit, offset=offset, spec=spec,
+                                  workers=workers, stats=stats))
+
+def _formatCSV(data: Iterable[JSONDict], colo: Sequence[str], format: FormatJSONItem) -> Iterator[Dict[str, str]]:
+    for item in data:
+        values: Dict[str, str] = dict([(name, _None_String) for name in colo])
+        for name, value in item.items():
+            values[name] = format(name, value)
+        yield values
+
+def _formatCSV_chunk(data: List[JSONDict], start: int, colo: Sequence[str], format: FormatJSONItem) -> List[List[str]]:
+    return [[values[name] for name in colo] for values in _formatCSV(data, colo, format)]
+
+def tabtoCSV_lines(data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
+                   *, legend: LegendList = [], minwidth: int = 0, datedelim: str = '-', noheaders: bool = False, unique: bool = False, tab: str = ";",
+                   reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+                   limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, workers: int = 0, stats: Optional[TabStats] = None) -> Iterator[str]:
     minwidth = minwidth or MINWIDTH
     logg.debug("tabtoCSV:")
-    renameheaders: Dict[str, str] = {}
-    showheaders: List[str] = []
-    sortheaders: List[str] = []
-    formats: Dict[str, str] = {}
-    combine: Dict[str, List[str]] = {}
-    freehdrs: Dict[str, str] = {}
-    for header in headers:
-        combines = ""
-        for selheader in header.split("|"):
-            if "@" in selheader:
-                selcol, rename = selheader.split("@", 1)
-            else:
-                selcol, rename = selheader, ""
-            if "{" in selcol and "{:" not in selcol:
-                names3: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon3, brace3 = freepart.find(":"), freepart.find("}")
-                    if brace3 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end3 = brace3 if colon3 == -1 else min(colon3, brace3)
-                    name3 = freepart[:end3]
-                    names3.append(name3)
-                name = " ".join(names3)
-                freehdrs[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            showheaders += [name]
-            if rename:
-                sortheaders += [name]  # default sort by named headers (rows)
-            if not combines:
-                combines = name
-            elif combines not in combine:
-                combine[combines] = [name]
-            elif name not in combine[combines]:
-                combine[combines] += [name]
-            if rename:
-                renameheaders[name] = rename
-    logg.debug("showheaders = %s", showheaders)
-    logg.debug("renameheaders = %s", renameheaders)
-    logg.debug("sortheaders = %s", sortheaders)
-    logg.debug("formats = %s", formats)
-    logg.debug("combine = %s", combine)
-    logg.debug("freehdrs = %s", freehdrs)
-    combined: Dict[str, List[str]] = {}
-    renaming: Dict[str, str] = {}
-    filtered: Dict[str, str] = {}
-    selcols: List[str] = []
-    freecols: Dict[str, str] = {}
-    for selecheader in selected:
-        combines = ""
-        for selec in selecheader.split("|"):
-            if "@" in selec:
-                selcol, rename = selec.split("@", 1)
-            else:
-                selcol, rename = selec, ""
-            if "{" in selcol and "{:" not in selcol:
-                names4: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon4, brace4 = freepart.find(":"), freepart.find("}")
-                    if brace4 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end4 = brace4 if colon4 == -1 else min(colon4, brace4)
-                    name4 = freepart[:end4]
-                    names4.append(name4)
-                name = " ".join(names4)
-                freecols[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmts = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmts.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            if "<" in name:
-                name, cond = name.split("<", 1)
-                filtered[name] = "<" + cond
-            elif ">" in name:
-                name, cond = name.split(">", 1)
-                filtered[name] = ">" + cond
-            elif "=" in name:
-                name, cond = name.split("=", 1)
-                filtered[name] = "=" + cond
-            selcols.append(name)
-            if rename:
-                renaming[name] = rename
-            if not combines:
-                combines = name
-            elif combines not in combined:
-                combined[combines] = [name]
-            elif combines not in combined[combines]:
-                combined[combines] += [name]
-    logg.debug("combined = %s", combined)
-    logg.debug("renaming = %s", renaming)
-    logg.debug("filtered = %s", filtered)
-    logg.debug("selcols = %s", selcols)
-    logg.debug("freecols = %s", freecols)
-    if not selected:
-        combined = combine  # argument
-        freecols = freehdrs
-        renaming = renameheaders
-        logg.debug("combined : %s", combined)
-        logg.debug("freecols : %s", freecols)
-        logg.debug("renaming : %s", renaming)
-    newsorts: Dict[str, str] = {}
-    colnames: Dict[str, str] = {}
-    for name, rename in renaming.items():
-        if "@" in rename:
-            newname, newsort = rename.split("@", 1)
-        elif rename and rename[0].isalpha():
-            newname, newsort = rename, ""
-        else:
-            newname, newsort = "", rename
-        if newname:
-            colnames[name] = newname
-            if name in formats:
-                formats[newname] = formats[name]
-        if newsort:
-            newsorts[name] = newsort
-    logg.debug("newsorts = %s", newsorts)
-    logg.debug("colnames = %s", colnames)
-    if sorts:
-        sortcolumns = sorts
-    else:
-        sortcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols or sortheaders)]
-        if newsorts:
-            for num, name in enumerate(sortcolumns):
-                if name not in newsorts:
-                    newsorts[name] = ("@" * len(str(num)) + str(num))
-            sortcolumns = sorted(newsorts, key=lambda x: newsorts[x])
-            logg.debug("sortcolumns : %s", sortcolumns)
+    spec = tabspec(headers, selected) if spec is None else spec
+    formats, selcols = spec.formats, spec.selcols
+    sortcolumns = sorts if sorts else spec.sortcolumns
     format: FormatJSONItem
     if formatter and isinstance(formatter, FormatJSONItem):
         format = formatter
     else:
         logg.debug("formats = %s | datedelim=%s", formats, datedelim)
         format = FormatCSV(formats, datedelim=datedelim)
+    if stats is not None:
+        format = stats.formatter(format)
     if legend:
         logg.debug("legend is ignored for CSV output")
-    selcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols)]
-    selheaders = [(name if name not in colnames else colnames[name]) for name in (showheaders)]
+    selcolumns = spec.selcolumns
+    selheaders = spec.selheaders
     sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
     sortrow = RowSortCallable(sortcolumns)
-    rows: List[JSONDict] = []
     cols: Dict[str, int] = {}
-    for num, item in enumerate(data):
-        row: JSONDict = {}
-        if "#" in selcols:
-            row["#"] = num + 1
-            cols["#"] = len(str(num + 1))
-        skip = False
-        for name, value in item.items():
-            selname = name
-            if name in renameheaders and renameheaders[name] in selcols:
-                selname = renameheaders[name]
-            if selcols and selname not in selcols and "*" not in selcols:
-                continue
-            try:
-                if name in filtered:
-                    skip = skip or unmatched(value, filtered[name])
-            except: pass
-            colname = selname if selname not in colnames else colnames[selname]
-            row[colname] = value
-            oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-            cols[colname] = max(oldlen, len(format(colname, value)))
-        for freecol, freeformat in freecols.items():
-            try:
-                freenames = freecol.split(" ")
-                freeitem: JSONDict = dict([(freename, _None_String) for freename in freenames])
-                for name, value in item.items():
-                    itemname = name
-                    if name in renameheaders and renameheaders[name] in freenames:
-                        itemname = renameheaders[name]
-                    if itemname in freenames:
-                        freeitem[itemname] = format(name, value)
-                value = freeformat.format(**freeitem)
-                colname = freecol if freecol not in colnames else colnames[freecol]
-                row[colname] = value
-                oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
-                cols[colname] = max(oldlen, len(value))
-            except Exception as e:
-                logg.info("formatting '%s' at %s bad for:\n\t%s", freeformat, e, item)
-        if not skip:
+    scanned = _scanrows(data, spec, format, minwidth, cols, stats)
+    if stats is not None:
+        scanned = stats.timed("scan", scanned)
+    rows: Iterable[JSONDict]
+    if sortcolumns or limit or offset or reorder or workers > 1 or not selcols or "*" in selcols:
+        rows = RowSorter(sortrow, limit=limit, offset=offset)
+        for row in scanned:
             rows.append(row)
-    old: Dict[str, str] = {}
-    same: List[str] = []
-    lines = []
-    for item in sorted(rows, key=sortrow):
-        values: Dict[str, str] = dict([(name, _None_String) for name in cols.keys()])
-        for name, value in item.items():
-            values[name] = format(name, value)
-        if unique:
-            same = [sel for sel in selcols if sel in values and sel in old and values[sel] == old[sel]]
-        if not selcols or same != selcols:
-            lines.append(values)
-        old = values
-    colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
+        colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
+    else:
+        known = set(selcolumns)  # incremental output in the input order, once all selected columns were seen
+        ahead: List[JSONDict] = []
+        for row in scanned:
+            ahead.append(row)
+            if len(cols) >= len(known) and known.issubset(cols):
+                break
+        rows = chain(ahead, scanned)
+        colo = tuple(sorted(cols.keys(), key=sortkey))  # ordered column names
     import csv
-    # csvfile = open(csv_filename, "w")
     csvfile = StringIO()
     writer = csv.DictWriter(csvfile, fieldnames=colo, restval='ignore',
                             quoting=csv.QUOTE_MINIMAL, delimiter=tab)
     if not noheaders:
         writer.writeheader()
-    for line in lines:
-        writer.writerow(line)
-    return csvfile.getvalue()
+    old: Dict[str, str] = {}
+    same: List[str] = []
+    valuerows: Iterable[Dict[str, str]]
+    if stats is not None:
+        rows = stats.timed("sort", rows, "rows_out")
+    if workers > 1:
+        valuerows = (dict(zip(colo, vals)) for chunk in workerchunks(_formatCSV_chunk, rows, workers, colo, format)
+                     for vals in chunk)
+    else:
+        valuerows = _formatCSV(rows, colo, format)
+    for values in valuerows:
+        if unique:
+            same = [sel for sel in selcols if sel in values and sel in old and values[sel] == old[sel]]
+        if not selcols or same != selcols:
+            writer.writerow(values)
+            if csvfile.tell() >= 0x10000:
+                yield csvfile.getvalue()
+                csvfile.seek(0)
+                csvfile.truncate()
+        old = values
+    yield csvfile.getvalue()
 
 def loadCSV(text: str, datedelim: str = '-', tab: str = ";") -> JSONList:
     parser = DictParserCSV(datedelim=datedelim, tab=tab)
     return list(parser.loads(text))
-def readFromCSV(filename: str, datedelim: str = '-', tab: str = ";") -> JSONList:
-    parser = DictParserCSV(datedelim=datedelim, tab=tab)
+def readFromCSV(filename: str, datedelim: str = '-', tab: str = ";", *, schema: Optional[JSONSchema] = None, raw: bool = False) -> JSONList:
+    parser = DictParserCSV(datedelim=datedelim, tab=tab, schema=schema, raw=raw)
     return list(parser.load(filename))
-def tabtextfileCSV(filename: str, datedelim: str = '-', tab: str = ";") -> TabText:
-    parser = DictParserCSV(datedelim=datedelim, tab=tab)
+def tabtextfileCSV(filename: str, datedelim: str = '-', tab: str = ";", *, schema: Optional[JSONSchema] = None, raw: bool = False) -> TabText:
+    parser = DictParserCSV(datedelim=datedelim, tab=tab, schema=schema, raw=raw)
     data = list(parser.load(filename))
     return TabText(data, parser.headers)
 
 class DictParserCSV(DictParser):
-    def __init__(self, *, datedelim: str = '-', tab: str = ";") -> None:
+    """ The header row is taken once, after that each row of the csv.reader is made into
+        a dict by its position in the header with a converter per column (see SniffJSONItem).
+        As with csv.DictReader empty rows are skipped, a short row gets "ignore" for the
+        missing columns and the extra cells of a long row are put as a list under None. """
+    def __init__(self, *, datedelim: str = '-', tab: str = ";", sniff: Optional[int] = None,
+                 schema: Optional[JSONSchema] = None, raw: bool = False) -> None:
         self.convert = ParseJSONItem(datedelim)
         self.tab = tab
+        self.sniff = sniff
+        self.schema = schema
+        self.raw = raw
         self.headers = STRLIST
     def load(self, filename: str, *, tab: Optional[str] = None) -> Iterator[JSONDict]:
-        return self.reads(open(filename), tab=tab)
+        return self.reads(open(filename, buffering=READBUFFER), tab=tab)  # type: ignore[arg-type]
     def loads(self, text: str, *, tab: Optional[str] = None) -> Iterator[JSONDict]:
         return self.reads(StringIO(text), tab=tab)
     def reads(self, csvfile: TextIOWrapper, *, tab: Optional[str] = None) -> Iterator[JSONDict]:
         tab = tab if tab is not None else self.tab
         import csv
-        reader = csv.DictReader(csvfile, restval='ignore',
-                                quoting=csv.QUOTE_MINIMAL, delimiter=tab)
+        reader = csv.reader(csvfile, quoting=csv.QUOTE_MINIMAL, delimiter=tab)
+        names = next(reader, None)
+        if names is None:
+            return
+        self.headers = list(names)
+        width = len(names)  # an empty row must be skipped even for an empty header
+        columns = self.convert.columns(self.sniff, self.schema, self.raw)
+        if self.raw:
+            for row in reader:
+                if len(row) != width or not width:
+                    if not row:
+                        continue
+                    yield self.record(names, row, columns)
+                    continue
+                yield dict(zip(names, row))
+            return
+        converts = [columns[name] for name in names]
         for row in reader:
-            newrow: JSONDict = dict(row)
-            for key, val in newrow.items():
-                if isinstance(val, str):
-                    newrow[key] = self.convert.toJSONItem(val)
-            yield newrow
-        if reader.fieldnames is not None:
-            self.headers = list(reader.fieldnames)
+            if len(row) != width or not width:
+                if not row:
+                    continue
+                yield self.record(names, row, columns)
+                continue
+            yield dict(zip(names, [column.convert(value) for column, value in zip(converts, row)]))
+    def record(self, names: List[str], row: List[str], columns: Mapping[str, SniffJSONItem]) -> JSONDict:
+        """ the conversion of a row that has not the width of the header """
+        newrow: JSONDict = dict(zip(names, row))
+        width = len(names)
+        if len(row) < width:
+            for name in names[len(row):]:
+                newrow[name] = "ignore"
+        for key, val in newrow.items():
+            newrow[key] = columns[key].convert(val)
+        if len(row) > width:
+            newrow[None] = row[width:]  # type: ignore[index]
+        return newrow
 
 # .......................................................................................
 
 def print_tabtotext(output: Union[TextIO, str], data: Iterable[JSONDict],  # ..
                     headers: List[str] = [], selected: List[str] = [], legend: List[str] = [],  # ..
                     *, datedelim: Optional[str] = None, tab: Optional[str] = None, padding: Optional[str] = None, xmlns: Optional[str] = None, minwidth: int = 0,
-                    noheaders: bool = False, unique: bool = False, defaultformat: str = "") -> str:
+                    noheaders: bool = False, unique: bool = False, defaultformat: str = "",
+                    limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, workers: int = 0,
+                    distinct: bool = False, stats: Optional[TabStats] = None) -> str:
     if isinstance(output, TextIO) or isinstance(output, StringIO):
         out = output
         fmt = defaultformat
@@ -2476,17 +3086,30 @@ def print_tabtotext(output: Union[TextIO, str], data: Iterable[JSONDict],  # ..
     elif "." in output:
         fmt = extension(output) or defaultformat
         if fmt in ["xls", "xlsx", "XLS", "XLSX"]:
+            if distinct or "@distinct" in selected:
+                data = tabdistinct(data, headers, [x for x in selected if not x.startswith("@")], spec=spec)
+            if stats is not None:
+                data = stats.timed("read", data, "rows_in")
+            options: Dict[str, str] = dict(cast(Tuple[str, str], (x, "") if "=" not in x else x.split("=", 1))
+                                           for x in selected if x.startswith("@"))
+            if "@limit" in options:
+                limit = int(options["@limit"] or 0)
+            if "@offset" in options:
+                offset = int(options["@offset"] or 0)
             try:
                 if TABXLSX:
                     import tabxlsx
-                    return tabxlsx.tabtoXLSX(output, data, headers, selected)  # type: ignore[arg-type]
+                    return _statsXLSX(stats, output, tabxlsx.tabtoXLSX, output,
+                                      _limitXLSX(data, headers, selected, limit, offset, spec), headers, selected)
                 else:
                     import tabtoxlsx
-                    return tabtoxlsx.tabtoXLSX(output, data, headers, selected, legend=legend)
+                    return tabtoxlsx.tabtoXLSX(output, data, headers, selected, legend=legend, limit=limit, offset=offset, spec=spec,
+                                               stats=stats)
             except Exception as e:
                 if not TABXLSX:
                     import tabxlsx
-                    return tabxlsx.tabtoXLSX(output, data, headers, selected)  # type: ignore[arg-type]
+                    return _statsXLSX(stats, output, tabxlsx.tabtoXLSX, output,
+                                      _limitXLSX(data, headers, selected, limit, offset, spec), headers, selected)
                 else:
                     logg.error("could not write %s: %s", output, e)
         out = open(output, "wt", encoding="utf-8")
@@ -2495,23 +3118,334 @@ def print_tabtotext(output: Union[TextIO, str], data: Iterable[JSONDict],  # ..
         fmt = output
         out = sys.stdout
         done = output
-    lines = tabtotext(data, headers, selected, legend=legend, fmt=fmt,
-                      datedelim=datedelim, tab=tab, padding=padding, xmlns=xmlns, minwidth=minwidth,
-                      noheaders=noheaders, unique=unique, defaultformat=defaultformat)
-    results: List[str] = []
+    results = 0
+    def counted(rows: Iterable[JSONDict]) -> Iterator[JSONDict]:
+        nonlocal results
+        for row in rows:
+            results += 1
+            yield row
+    lines = tabtotext_lines(counted(data), headers, selected, legend=legend, fmt=fmt,
+                            datedelim=datedelim, tab=tab, padding=padding, xmlns=xmlns, minwidth=minwidth,
+                            noheaders=noheaders, unique=unique, defaultformat=defaultformat,
+                            limit=limit, offset=offset, spec=spec, workers=workers, distinct=distinct, stats=stats)
+    if stats is not None:
+        _statswrite(stats, out, lines)
+    else:
+        batch: List[str] = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= WRITEBATCH:
+                out.write("".join(batch))
+                batch = []
+        out.write("".join(batch))
+        out.flush()
+    if noheaders or "@noheaders" in selected or "@dat" in selected:
+        return ""
+    return ": %s results %s" % (results, done)
+
+def _statswrite(stats: TabStats, out: TextIO, lines: Iterable[str]) -> None:
+    """ the batched write of print_tabtotext with the "write" phase and bytes_written """
+    batch: List[str] = []
     for line in lines:
-        results.append(line)
-        out.write(line)
+        batch.append(line)
+        if len(batch) >= WRITEBATCH:
+            text = "".join(batch)
+            previous = stats.enter("write")
+            out.write(text)
+            stats.enter(previous)
+            stats.count("bytes_written", len(text.encode("utf-8")))
+            batch = []
+    text = "".join(batch)
+    previous = stats.enter("write")
+    out.write(text)
+    out.flush()
+    stats.enter(previous)
+    stats.count("bytes_written", len(text.encode("utf-8")))
+
+def _limitXLSX(data: Iterable[JSONDict], headers: List[str], selected: List[str],
+               limit: int, offset: int, spec: Optional[TabSpec]) -> Iterable[JSONDict]:
+    """ the tabxlsx writer has no limit/offset, so the rows are filtered and sorted before
+        to be cut down (the writer does it again which does not change them anymore) """
+    if not limit and not offset:
+        return data
+    spec = tabspec(headers, [x for x in selected if not x.startswith("@")]) if spec is None else spec
+    rows, spec = tabshared(data, spec)
+    if spec.filtered:
+        accept = RowFilterCallable(spec.filtered)
+        rows = [row for row in rows if accept(row)]
+    sorter = RowSorter(RowSortCallable(spec.sortcolumns), limit=limit, offset=offset)
+    for row in rows:
+        sorter.append(row)
+    return list(sorter)
+
+def _statsXLSX(stats: Optional[TabStats], filename: str, func: Callable[..., str], *args: Any) -> str:
+    """ the tabxlsx writer has no stats hooks, so all of it counts as the "write" phase """
+    if stats is None:
+        return func(*args)
+    previous = stats.enter("write")
+    try:
+        return func(*args)  # type: ignore[no-any-return]
+    finally:
+        stats.enter(previous)
+        if os.path.exists(filename):
+            stats.count("bytes_written", os.path.getsize(filename))
+
+def tabshared(data: Iterable[JSONDict], spec: TabSpec) -> Tuple[JSONList, TabSpec]:
+    """ the rows filtered and sorted once to be shared by several renderers, with the spec
+        to use for them (that has no filters and sorts left to do). The rows are only filtered
+        here when the rejected rows have no other columns (that would be shown), and they are
+        not sorted on "#" row numbers or free format columns which are made by the renderer. """
+    rows = list(data)
+    if "#" in spec.selcols:
+        return rows, spec  # the row numbers count the input rows
+    if spec.filtered:
+        accept = RowFilterCallable(spec.filtered)
+        accepted: JSONList = []
+        seen: Set[str] = set()
+        rejected: Set[str] = set()
+        for item in rows:
+            if accept(item):
+                accepted.append(item)
+                seen.update(item.keys())
+            else:
+                rejected.update(item.keys())
+        if rejected <= seen:
+            rows = accepted
+            spec = spec._replace(filtered={})
+    renameheaders, selcols, freecols, colnames = spec.renameheaders, spec.selcols, spec.freecols, spec.colnames
+    sortcols = RowSortCallable(spec.sortcolumns).cols
+    freenames = [(freecol if freecol not in colnames else colnames[freecol]) for freecol in freecols]
+    if not sortcols or any(col in freenames for col in sortcols):
+        return rows, spec
+    def selected(selname: str) -> bool:
+        return not selcols or selname in selcols or "*" in selcols
+    sortnames: List[str] = []  # the item name having the value of each sort column
+    for col in sortcols:
+        selnames = ([col] if col not in colnames else []) + [name for name, newname in colnames.items() if newname == col]
+        names: List[str] = []
+        for selname in selnames:
+            if selected(selname):
+                if not (selname in renameheaders and renameheaders[selname] in selcols):
+                    names.append(selname)
+                names += [name for name, rename in renameheaders.items() if rename == selname and rename in selcols]
+        if len(names) != 1 or "@" in names[0]:
+            return rows, spec  # the renderer has to sort on its renamed rows
+        sortnames += names
+    rows.sort(key=RowSortCallable(sortnames))
+    return rows, spec._replace(sortcolumns=[])
+
+def print_tabtotexts(outputs: Sequence[Union[TextIO, str]], data: Iterable[JSONDict],  # ..
+                     headers: List[str] = [], selected: List[str] = [], legend: List[str] = [],  # ..
+                     *, datedelim: Optional[str] = None, tab: Optional[str] = None, padding: Optional[str] = None, xmlns: Optional[str] = None, minwidth: int = 0,
+                     noheaders: bool = False, unique: bool = False, defaultformat: str = "",
+                     limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, workers: int = 0,
+                     distinct: bool = False, stats: Optional[TabStats] = None) -> List[str]:
+    """ print_tabtotext for each of the outputs where the rows are made distinct, filtered
+        and sorted only once, so that each format writer has just to serialize them.
+        (with TabStats the row counters of the writers add up over all outputs) """
+    if len(outputs) == 1:
+        return [print_tabtotext(outputs[0], data, headers, selected, legend, datedelim=datedelim, tab=tab,
+                                padding=padding, xmlns=xmlns, minwidth=minwidth, noheaders=noheaders,
+                                unique=unique, defaultformat=defaultformat, limit=limit, offset=offset, spec=spec,
+                                workers=workers, distinct=distinct, stats=stats)]
+    spec = tabspec(headers, [x for x in selected if not x.startswith("@")]) if spec is None else spec
+    if stats is not None:
+        data = stats.timed("read", data)
+    if distinct or "@distinct" in selected:
+        data = tabdistinct(data, spec=spec)
+        selected = [x for x in selected if x != "@distinct"]
+        if stats is not None:
+            data = stats.timed("distinct", data)
+    if stats is not None:
+        previous = stats.enter("sort")
+    rows, spec = tabshared(data, spec)
+    if stats is not None:
+        stats.enter(previous)
+    return [print_tabtotext(output, rows, headers, selected, legend, datedelim=datedelim, tab=tab,
+                            padding=padding, xmlns=xmlns, minwidth=minwidth, noheaders=noheaders,
+                            unique=unique, defaultformat=defaultformat, limit=limit, offset=offset, spec=spec,
+                            workers=workers, stats=stats) for output in outputs]
+
+async def print_tabtotext_async(output: Any, data: AsyncIterable[JSONDict],  # ..
+                                headers: List[str] = [], selected: List[str] = [], legend: List[str] = [],  # ..
+                                *, fmt: str = "", datedelim: Optional[str] = None, tab: Optional[str] = None, padding: Optional[str] = None, xmlns: Optional[str] = None, minwidth: int = 0,
+                                noheaders: bool = False, unique: bool = False, defaultformat: str = "",
+                                limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None,
+                                distinct: bool = False, unsorted: bool = False) -> str:
+    """ writes the utf-8 text to an asyncio.StreamWriter (or anything with write and drain) """
+    results = 0
+    async def counted(rows: AsyncIterable[JSONDict]) -> AsyncIterator[JSONDict]:
+        nonlocal results
+        async for row in rows:
+            results += 1
+            yield row
+    chunks = tabtotext_lines_async(counted(data), headers, selected, legend, fmt=fmt,
+                                   datedelim=datedelim, tab=tab, padding=padding, xmlns=xmlns, minwidth=minwidth,
+                                   noheaders=noheaders, unique=unique, defaultformat=defaultformat,
+                                   limit=limit, offset=offset, spec=spec, distinct=distinct, unsorted=unsorted)
+    async for chunk in chunks:
+        output.write(chunk.encode("utf-8"))
+        await output.drain()
     if noheaders or "@noheaders" in selected or "@dat" in selected:
         return ""
-    return ": %s results %s" % (len(results), done)
+    return ": %s results %s" % (results, "stream")
+
+async def tabtotext_async(data: AsyncIterable[JSONDict],  # ..
+                          headers: List[str] = [], selected: List[str] = [], legend: List[str] = [],  # ..
+                          *, fmt: str = "", datedelim: Optional[str] = None, tab: Optional[str] = None, padding: Optional[str] = None, xmlns: Optional[str] = None, minwidth: int = 0,
+                          noheaders: bool = False, unique: bool = False, defaultformat: str = "",
+                          limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None,
+                          distinct: bool = False, unsorted: bool = False) -> str:
+    chunks = tabtotext_lines_async(data, headers, selected, legend, fmt=fmt, datedelim=datedelim, tab=tab,
+                                   padding=padding, xmlns=xmlns, minwidth=minwidth, noheaders=noheaders,
+                                   unique=unique, defaultformat=defaultformat, limit=limit, offset=offset, spec=spec,
+                                   distinct=distinct, unsorted=unsorted)
+    return "".join([chunk async for chunk in chunks])
+
+async def tabtotext_lines_async(data: AsyncIterable[JSONDict],  # ..
+                                headers: List[str] = [], selected: List[str] = [], legend: List[str] = [],  # ..
+                                *, fmt: str = "", datedelim: Optional[str] = None, tab: Optional[str] = None, padding: Optional[str] = None, xmlns: Optional[str] = None, minwidth: int = 0,
+                                noheaders: bool = False, unique: bool = False, defaultformat: str = "",
+                                limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None,
+                                distinct: bool = False, unsorted: bool = False) -> AsyncIterator[str]:
+    """ tabtotext_lines over the rows of an async source, run in its own thread that gets up to
+        ASYNCROWS rows queued. It yields chunks of up to WRITEBATCH lines with up to ASYNCROWS
+        chunks queued. The formats that do not need all rows (see tabtotext_lines) yield their
+        lines whenever the source has no row ready. """
+    import asyncio
+    import queue
+    import threading
+    loop = asyncio.get_running_loop()
+    rows: "queue.Queue[Any]" = queue.Queue(ASYNCROWS)
+    chunks: "asyncio.Queue[Optional[List[str]]]" = asyncio.Queue(ASYNCROWS)
+    space = asyncio.Event()  # set by the thread when it took a row while the source was waiting
+    done = object()
+    stopped = False  # the thread takes no more rows
+    closed = False  # the caller takes no more chunks
+    waiting = False
+    errors: List[BaseException] = []
+    lines: List[str] = []
+    def send(chunk: Optional[List[str]]) -> None:
+        if not closed:
+            try:
+                asyncio.run_coroutine_threadsafe(chunks.put(chunk), loop).result()
+            except Exception as e:  # the loop has gone
+                logg.debug("async chunk not sent: %s", e)
+    def flush() -> None:
+        nonlocal lines
+        if lines:
+            send(lines)
+            lines = []
+    def signal() -> None:
+        nonlocal waiting
+        if waiting:
+            waiting = False
+            loop.call_soon_threadsafe(space.set)
+    def drain() -> None:
+        nonlocal stopped
+        stopped = True
+        while True:
+            try:
+                rows.get_nowait()
+            except queue.Empty:
+                break
+        loop.call_soon_threadsafe(space.set)
+    def feed() -> Iterator[JSONDict]:
+        while True:
+            try:
+                item = rows.get_nowait()
+            except queue.Empty:
+                flush()  # the lines so far can be written while waiting for the next row
+                item = rows.get()
+            signal()
+            if item is done:
+                return
+            yield item
+    def render() -> None:
+        try:
+            for line in tabtotext_lines(feed(), headers, selected, legend, fmt=fmt, datedelim=datedelim, tab=tab,
+                                        padding=padding, xmlns=xmlns, minwidth=minwidth, noheaders=noheaders,
+                                        unique=unique, defaultformat=defaultformat, limit=limit, offset=offset, spec=spec,
+                                        distinct=distinct, unsorted=unsorted):
+                lines.append(line)
+                if len(lines) >= WRITEBATCH:
+                    flush()
+            flush()
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            drain()
+            send(None)
+    async def put(item: Any) -> None:
+        nonlocal waiting
+        while not stopped:
+            try:
+                rows.put_nowait(item)
+                return
+            except queue.Full:
+                if waiting:
+                    await space.wait()
+                else:
+                    space.clear()
+                    waiting = True  # and try once more before waiting for the signal()
+    async def produce() -> None:
+        try:
+            async for item in data:
+                if stopped:
+                    break
+                await put(item)
+        finally:
+            await put(done)
+    thread = threading.Thread(target=render, name="tabtotext_lines_async", daemon=True)
+    thread.start()
+    producing = asyncio.ensure_future(produce())
+    finished = False
+    try:
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            yield "".join(chunk)
+        finished = True
+        await producing
+        if errors:
+            raise errors[0]
+    finally:
+        if not finished:
+            closed = True
+            producing.cancel()
+            drain()
+            try:
+                rows.put_nowait(done)
+            except queue.Full:
+                pass
+            while not chunks.empty():  # lets a pending send() of the thread go through
+                chunks.get_nowait()
 
 def tabtotext(data: Iterable[JSONDict],  # ..
               headers: List[str] = [], selected: List[str] = [], legend: List[str] = [],  # ..
               *, fmt: str = "", datedelim: Optional[str] = None, tab: Optional[str] = None, padding: Optional[str] = None, xmlns: Optional[str] = None, minwidth: int = 0,
-              noheaders: bool = False, unique: bool = False, defaultformat: str = "") -> str:
-    spec: Dict[str, str] = dict(cast(Tuple[str, str], (x, "") if "=" not in x else x.split("=", 1))
-                                for x in selected if x.startswith("@"))
+              noheaders: bool = False, unique: bool = False, defaultformat: str = "",
+              limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, workers: int = 0,
+              distinct: bool = False, unsorted: bool = False, stats: Optional[TabStats] = None) -> str:
+    return "".join(tabtotext_lines(data, headers, selected, legend, fmt=fmt, datedelim=datedelim, tab=tab,
+                                   padding=padding, xmlns=xmlns, minwidth=minwidth, noheaders=noheaders,
+                                   unique=unique, defaultformat=defaultformat, limit=limit, offset=offset, spec=spec,
+                                   workers=workers, distinct=distinct, unsorted=unsorted, stats=stats))
+
+def tabtotext_lines(data: Iterable[JSONDict],  # ..
+                    headers: List[str] = [], selected: List[str] = [], legend: List[str] = [],  # ..
+                    *, fmt: str = "", datedelim: Optional[str] = None, tab: Optional[str] = None, padding: Optional[str] = None, xmlns: Optional[str] = None, minwidth: int = 0,
+                    noheaders: bool = False, unique: bool = False, defaultformat: str = "",
+                    limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, workers: int = 0,
+                    distinct: bool = False, unsorted: bool = False, stats: Optional[TabStats] = None) -> Iterator[str]:
+    """ with workers > 1 the cells of GFM and CSV output are formatted in a process pool,
+        and with distinct (or @distinct) the rows with the same selected values are shown once.
+        With unsorted (or @unsorted) the rows are shown in the input order, and then JSON, YAML,
+        TOML and CSV (of the selected columns) are rendered while the rows come in.
+        With a TabStats the time of each phase is recorded along with some counters. """
+    options: Dict[str, str] = dict(cast(Tuple[str, str], (x, "") if "=" not in x else x.split("=", 1))
+                                   for x in selected if x.startswith("@"))
     selected = [x for x in selected if not x.startswith("@")]
     fmt = fmt if fmt not in ["", "-"] else defaultformat
     xmlns = "" if xmlns is None else xmlns
@@ -2519,131 +3453,163 @@ def tabtotext(data: Iterable[JSONDict],  # ..
     padding = " " if padding is None else padding
     tab = "|" if tab is None else tab
     # formats
-    if fmt in ["html"] or "@html" in spec:
+    if fmt in ["html"] or "@html" in options:
         fmt = "HTML"
-    if fmt in ["htm"] or "@htm" in spec:
+    if fmt in ["htm"] or "@htm" in options:
         fmt = "HTML"
         tab = ""
         padding = ""
-    if fmt in ["xhtm"] or "@xhtm" in spec:
+    if fmt in ["xhtm"] or "@xhtm" in options:
         fmt = "HTML"
         tab = ""
         padding = ""
         xmlns = "1999/xhtml"
-    if fmt in ["xhtml"] or "@xhtml" in spec:
+    if fmt in ["xhtml"] or "@xhtml" in options:
         fmt = "HTML"
         xmlns = "1999/xhtml"
-    if fmt in ["json"] or "@json" in spec:
+    if fmt in ["json"] or "@json" in options:
         fmt = "JSON"
-    if fmt in ["jsn"] or "@jsn" in spec:
+    if fmt in ["jsn"] or "@jsn" in options:
         fmt = "JSON"
         padding = ""
-    if fmt in ["yaml"] or "@yaml" in spec:
+    if fmt in ["yaml"] or "@yaml" in options:
         fmt = "YAML"
-    if fmt in ["yml"] or "@yml" in spec:
+    if fmt in ["yml"] or "@yml" in options:
         fmt = "YAML"
         padding = ""
-    if fmt in ["toml"] or "@toml" in spec:
+    if fmt in ["toml"] or "@toml" in options:
         fmt = "TOML"
-    if fmt in ["tml"] or "@tml" in spec:
+    if fmt in ["tml"] or "@tml" in options:
         fmt = "TOML"
         padding = ""
-    if fmt in ["md"] or "@md" in spec:
+    if fmt in ["md"] or "@md" in options:
         fmt = "GFM"  # nopep8
-    if fmt in ["markdown"] or "@markdown" in spec:
+    if fmt in ["markdown"] or "@markdown" in options:
         fmt = "GFM"
         tab = "||"  # nopep8
-    if fmt in ["md2"] or "@md2" in spec:
+    if fmt in ["md2"] or "@md2" in options:
         fmt = "GFM"
         minwidth = 2  # nopep8
-    if fmt in ["md3"] or "@md3" in spec:
+    if fmt in ["md3"] or "@md3" in options:
         fmt = "GFM"
         minwidth = 3  # nopep8
-    if fmt in ["md4"] or "@md4" in spec:
+    if fmt in ["md4"] or "@md4" in options:
         fmt = "GFM"
         minwidth = 4  # nopep8
-    if fmt in ["md5"] or "@md5" in spec:
+    if fmt in ["md5"] or "@md5" in options:
         fmt = "GFM"
         minwidth = 5  # nopep8
-    if fmt in ["md6"] or "@md6" in spec:
+    if fmt in ["md6"] or "@md6" in options:
         fmt = "GFM"
         minwidth = 6  # nopep8
-    if fmt in ["wide"] or "@wide" in spec:
+    if fmt in ["wide"] or "@wide" in options:
         fmt = "GFM"
         tab = ""  # nopep8
-    if fmt in ["txt"] or "@txt" in spec:
+    if fmt in ["txt"] or "@txt" in options:
         fmt = "GFM"
         padding = ""  # nopep8
-    if fmt in ["text"] or "@text" in spec:
+    if fmt in ["text"] or "@text" in options:
         fmt = "GFM"
         padding = ""
         noheaders = True  # nopep8
-    if fmt in ["tabs"] or "@tabs" in spec:
+    if fmt in ["tabs"] or "@tabs" in options:
         fmt = "GFM"
         tab = "\t"
         padding = ""  # nopep8
-    if fmt in ["tab"] or "@tab" in spec:
+    if fmt in ["tab"] or "@tab" in options:
         fmt = "CSV"
         tab = "\t"  # nopep8
-    if fmt in ["data"] or "@data" in spec:
+    if fmt in ["data"] or "@data" in options:
         fmt = "CSV"
         tab = "\t"
         noheaders = True  # nopep8
-    if fmt in ["ifs"] or "@ifs" in spec:
+    if fmt in ["ifs"] or "@ifs" in options:
         fmt = "CSV"
         tab = os.environ.get("IFS", "\t")  # nopep8
-    if fmt in ["dat"] or "@dat" in spec:
+    if fmt in ["dat"] or "@dat" in options:
         fmt = "CSV"
         tab = os.environ.get("IFS", "\t")
         noheaders = True  # nopep8
-    if fmt in ["csv", "scsv"] or "@csv" in spec or "@scsv" in spec:
+    if fmt in ["csv", "scsv"] or "@csv" in options or "@scsv" in options:
         fmt = "CSV"
         tab = ";"  # nopep8
-    if fmt in ["list"] or "@list" in spec:
+    if fmt in ["list"] or "@list" in options:
         fmt = "CSV"
         tab = ";"
         noheaders = True  # nopep8
-    if fmt in ["xlsx", "xls"] or "@xlsx" in spec or "@xls" in spec:
+    if fmt in ["xlsx", "xls"] or "@xlsx" in options or "@xls" in options:
         fmt = "XLS"
         tab = ","  # nopep8
     # override
-    if "@delimiter" in spec:
-        tab = spec["@delimiter"]
-    elif "@delim" in spec:
-        tab = spec["@delim"]
-    elif "@semicolon" in spec:
+    if "@delimiter" in options:
+        tab = options["@delimiter"]
+    elif "@delim" in options:
+        tab = options["@delim"]
+    elif "@semicolon" in options:
         tab = ";"
-    elif "@colon" in spec:
+    elif "@colon" in options:
         tab = ":"
-    elif "@cut" in spec:
+    elif "@cut" in options:
         tab = "\t"
-    elif "@notab" in spec:
+    elif "@notab" in options:
         tab = ""
-    if "@datedelim" in spec:
-        datedelim = spec["@datedelim"] or "-"
-    if "@nopadding" in spec:
+    if "@datedelim" in options:
+        datedelim = options["@datedelim"] or "-"
+    if "@nopadding" in options:
         padding = ""
-    if "@noheaders" in spec:
+    if "@noheaders" in options:
         noheaders = True
-    if "@unique" in spec:
+    if "@unique" in options:
         unique = True
-    if "@nolegend" in spec:
+    if "@distinct" in options:
+        distinct = True
+    if "@unsorted" in options:
+        unsorted = True
+    if "@limit" in options:
+        limit = int(options["@limit"] or 0)
+    if "@offset" in options:
+        offset = int(options["@offset"] or 0)
+    if "@nolegend" in options:
         legend = []
     assert isinstance(tab, str)  # mypy 0.9
+    if stats is not None:
+        previous = stats.enter("spec")
+    spec = tabspec(headers, selected) if spec is None else spec
+    if unsorted:
+        spec = spec._replace(sortcolumns=[])
+    if stats is not None:
+        stats.enter(previous)
+        data = stats.timed("read", data, "rows_in")
+    if distinct:
+        data = tabdistinct(data, spec=spec)
+        if stats is not None:
+            data = stats.timed("distinct", data)
     # render
+    lines: Iterator[str]
     if fmt == "HTML":
-        return tabtoHTML(data, headers, selected, legend=legend, tab=tab, padding=padding, xmlns=xmlns, minwidth=minwidth)
-    if fmt == "JSON":
-        return tabtoJSON(data, headers, selected, datedelim=datedelim, padding=padding, minwidth=minwidth)
-    if fmt == "YAML":
-        return tabtoYAML(data, headers, selected, datedelim=datedelim, padding=padding, minwidth=minwidth)
-    if fmt == "TOML":
-        return tabtoTOML(data, headers, selected, datedelim=datedelim, padding=padding, minwidth=minwidth)
-    if fmt == "CSV":
-        return tabtoCSV(data, headers, selected, datedelim=datedelim, tab=tab, noheaders=noheaders, unique=unique, minwidth=minwidth)
-    if fmt == "XLS":
-        return tabtoCSV(data, headers, selected, datedelim=datedelim, tab=tab, noheaders=noheaders, unique=unique, minwidth=minwidth)
-    return tabtoGFM(data, headers, selected, legend=legend, tab=tab, padding=padding, noheaders=noheaders, unique=unique, minwidth=minwidth)
+        lines = tabtoHTML_lines(data, headers, selected, legend=legend, tab=tab, padding=padding, xmlns=xmlns, minwidth=minwidth,
+                                limit=limit, offset=offset, spec=spec, stats=stats)
+    elif fmt == "JSON":
+        lines = tabtoJSON_lines(data, headers, selected, datedelim=datedelim, padding=padding, minwidth=minwidth,
+                                limit=limit, offset=offset, spec=spec, stats=stats)
+    elif fmt == "YAML":
+        lines = tabtoYAML_lines(data, headers, selected, datedelim=datedelim, padding=padding, minwidth=minwidth,
+                                limit=limit, offset=offset, spec=spec, stats=stats)
+    elif fmt == "TOML":
+        lines = tabtoTOML_lines(data, headers, selected, datedelim=datedelim, padding=padding, minwidth=minwidth,
+                                limit=limit, offset=offset, spec=spec, stats=stats)
+    elif fmt == "CSV":
+        lines = tabtoCSV_lines(data, headers, selected, datedelim=datedelim, tab=tab, noheaders=noheaders, unique=unique, minwidth=minwidth,
+                               limit=limit, offset=offset, spec=spec, workers=workers, stats=stats)
+    elif fmt == "XLS":
+        lines = tabtoCSV_lines(data, headers, selected, datedelim=datedelim, tab=tab, noheaders=noheaders, unique=unique, minwidth=minwidth,
+                               limit=limit, offset=offset, spec=spec, workers=workers, stats=stats)
+    else:
+        lines = tabtoGFM_lines(data, headers, selected, legend=legend, tab=tab, padding=padding, noheaders=noheaders, unique=unique, minwidth=minwidth,
+                               limit=limit, offset=offset, spec=spec, workers=workers, stats=stats)
+    if stats is not None:
+        return stats.timed("render", lines)
+    return lines
 
 def tabToFMTx(output: str, result: Union[JSONList, JSONDict, DataList, DataItem],  # ..
               sorts: RowSortList = [], formats: FormatsDict = {}, selected: List[str] = [],  # ..
@@ -2789,35 +3755,58 @@ def readFromFile(filename: str, fmt: str = NIX, defaultfileformat: str = NIX) ->
 def readFromFMT(fmt: str, filename: str, defaultformat: str = NIX) -> JSONList:
     tabtext = tabtextfileFMT(fmt, filename, defaultformat=defaultformat)
     return tabtext.data
-def tabtextfile(filename: str, fmt: str = NIX, *, tab: Optional[str] = None, defaultfileformat: str = NIX) -> TabText:
+def tabtextfile(filename: str, fmt: str = NIX, *, tab: Optional[str] = None, defaultfileformat: str = NIX,
+                where: Union[str, Sequence[str], Dict[str, str]] = [], stats: Optional[TabStats] = None,
+                schema: Union[None, str, JSONSchema] = None, raw: bool = False) -> TabText:
+    """ reads the file with a DictParser of the format - 'where' has "name<cond" filters on the rows
+        and the 'schema' (or a sidecar "name.schema.json") has the types of the columns, while
+        'raw' keeps the cells as the strings of the file (being lossless on text formats) """
     if not fmt:
         fmt = extension(filename) or defaultfileformat
         if not fmt:
             logg.warning("could not detect format of '%s'", filename)
             return TabText([], [])
     # assert fmt
-    return tabtextfileFMT(fmt, filename, tab=tab, defaultformat=defaultfileformat)
-def tabtextfileFMT(fmt: str, filename: str, *, tab: Optional[str] = None, defaultformat: str = NIX) -> TabText:
+    if stats is not None:
+        previous = stats.enter("read")
+        try:
+            tabtext = tabtextfileFMT(fmt, filename, tab=tab, defaultformat=defaultfileformat, schema=schema, raw=raw)
+        finally:
+            stats.enter(previous)
+        stats.count("rows_read", len(tabtext.data))
+        if os.path.isfile(filename):
+            stats.count("bytes_read", os.path.getsize(filename))
+    else:
+        tabtext = tabtextfileFMT(fmt, filename, tab=tab, defaultformat=defaultfileformat, schema=schema, raw=raw)
+    if where:
+        accept = RowFilterCallable(where)
+        if stats is not None:
+            accept = stats.filtering(accept)
+        return TabText([item for item in tabtext.data if accept(item)], tabtext.headers)
+    return tabtext
+def tabtextfileFMT(fmt: str, filename: str, *, tab: Optional[str] = None, defaultformat: str = NIX,
+                   schema: Union[None, str, JSONSchema] = None, raw: bool = False) -> TabText:
     if not fmt:
         fmt = extension(filename) or NIX
         if not fmt:
             fmt = defaultformat
         if not fmt:
             return TabText([], [])
+    schema = tabschema(schema, filename)
     if fmt.lower() in ["md", "markdown"]:
-        return tabtextfileGFM(filename, tab='|' if tab is None else tab)
+        return tabtextfileGFM(filename, tab='|' if tab is None else tab, schema=schema, raw=raw)
     if fmt.lower() in ["html", "htm", "xhtml"]:
-        return tabtextfileHTML(filename)
+        return tabtextfileHTML(filename, schema=schema, raw=raw)
     if fmt.lower() in ["json", "jsn"]:
-        return tabtextfileJSON(filename)
+        return tabtextfileJSON(filename, schema=schema, raw=raw)
     if fmt.lower() in ["yaml", "yml"]:
-        return tabtextfileYAML(filename)
+        return tabtextfileYAML(filename, schema=schema, raw=raw)
     if fmt.lower() in ["toml", "tml"]:
-        return tabtextfileTOML(filename)
+        return tabtextfileTOML(filename, schema=schema, raw=raw)
     if fmt.lower() in ["tab"]:
-        return tabtextfileCSV(filename, tab='\t' if tab is None else tab)
+        return tabtextfileCSV(filename, tab='\t' if tab is None else tab, schema=schema, raw=raw)
     if fmt.lower() in ["csv", "scsv"]:
-        return tabtextfileCSV(filename, tab=';' if tab is None else tab)
+        return tabtextfileCSV(filename, tab=';' if tab is None else tab, schema=schema, raw=raw)
     if fmt.lower() in ["xlsx", "xls"]:
         try:
             if TABXLSX:
@@ -2835,6 +3824,75 @@ def tabtextfileFMT(fmt: str, filename: str, *, tab: Optional[str] = None, defaul
     logg.debug(" tabtextfileFMT  - unrecognized input format %s: %s", fmt, filename)
     return TabText([], [])
 
+def dictparserFMT(fmt: str, *, tab: Optional[str] = None, schema: Optional[JSONSchema] = None, raw: bool = False) -> Optional[DictParser]:
+    if fmt.lower() in ["md", "markdown"]:
+        return DictParserGFM(tab='|' if tab is None else tab, schema=schema, raw=raw)
+    if fmt.lower() in ["html", "htm", "xhtml"]:
+        return DictParserHTML(schema=schema, raw=raw)
+    if fmt.lower() in ["json", "jsn"]:
+        return DictParserJSON(schema=schema, raw=raw)
+    if fmt.lower() in ["yaml", "yml"]:
+        return DictParserYAML(schema=schema, raw=raw)
+    if fmt.lower() in ["toml", "tml"]:
+        return DictParserTOML(schema=schema, raw=raw)
+    if fmt.lower() in ["tab"]:
+        return DictParserCSV(tab='\t' if tab is None else tab, schema=schema, raw=raw)
+    if fmt.lower() in ["csv", "scsv"]:
+        return DictParserCSV(tab=';' if tab is None else tab, schema=schema, raw=raw)
+    return None
+
+def tabcolumnsfile(filename: str, fmt: str = NIX, *, tab: Optional[str] = None, defaultfileformat: str = NIX,
+                   compact: bool = False, where: Union[str, Sequence[str], Dict[str, str]] = [],
+                   schema: Union[None, str, JSONSchema] = None, raw: bool = False) -> TabColumns:
+    """ like tabtextfile() but the rows are stored into a TabColumns while being parsed """
+    if not fmt:
+        fmt = extension(filename) or defaultfileformat
+        if not fmt:
+            logg.warning("could not detect format of '%s'", filename)
+            return TabColumns()
+    parser = dictparserFMT(fmt, tab=tab, schema=tabschema(schema, filename), raw=raw)
+    if parser is None:  # xlsx
+        tabtext = tabtextfile(filename, fmt, tab=tab, defaultfileformat=defaultfileformat, where=where)
+        return tabcolumns(tabtext.data, tabtext.headers, compact=compact)
+    rows = parser.load(filename)
+    if where:
+        rows = filter(RowFilterCallable(where), rows)
+    table = tabcolumns(rows, compact=compact)
+    table.headers = list(getattr(parser, "headers", STRLIST))
+    return table
+
+def tabrowsfile(filename: str, fmt: str = NIX, *, tab: Optional[str] = None, defaultfileformat: str = NIX,
+                where: Union[str, Sequence[str], Dict[str, str]] = [], stats: Optional[TabStats] = None,
+                schema: Union[None, str, JSONSchema] = None, raw: bool = False) -> Tuple[Iterable[JSONDict], List[str]]:
+    """ like tabtextfile() but the rows are parsed while they are taken, so that a large file
+        is not held in memory (when sorting the RowSorter can spill it). The first row is read
+        here already, so that the headers of the parser are known. """
+    if not fmt:
+        fmt = extension(filename) or defaultfileformat
+        if not fmt:
+            logg.warning("could not detect format of '%s'", filename)
+            return [], []
+    parser = dictparserFMT(fmt, tab=tab, schema=tabschema(schema, filename), raw=raw)
+    if parser is None:  # xlsx
+        tabtext = tabtextfile(filename, fmt, tab=tab, defaultfileformat=defaultfileformat, where=where,
+                              stats=stats, schema=schema, raw=raw)
+        return tabtext.data, tabtext.headers
+    rows: Iterator[JSONDict] = iter(parser.load(filename))
+    if stats is not None:
+        rows = stats.timed("read", rows, "rows_read")
+        if os.path.isfile(filename):
+            stats.count("bytes_read", os.path.getsize(filename))
+    if where:
+        accept = RowFilterCallable(where)
+        if stats is not None:
+            accept = stats.filtering(accept)
+        rows = filter(accept, rows)
+    first = next(rows, None)
+    headers = list(getattr(parser, "headers", STRLIST))
+    if first is None:
+        return [], headers
+    return chain([first], rows), headers
+
 # ----------------------------------------------------------------------
 def tab_formats_from(columns: str) -> Dict[str, str]:
     styles = {}
@@ -3008,11 +4066,49 @@ if __name__ == "__main__":
                        help="add columns to show (a|b:.2f)")
     cmdline.add_option("-i", "--inputformat", metavar="FMT", default="",
                        help="fix input format (instead of autodetection)")
-    cmdline.add_option("-o", "--output", "--format", metavar="FMT", default="",
-                       help="(file.)json|yaml|html|wide|md|htm|tab|csv")
+    cmdline.add_option("-o", "--output", "--format", metavar="FMT", action="append", default=[],
+                       help="(file.)json|yaml|html|wide|md|htm|tab|csv (can be repeated)")
+    cmdline.add_option("--limit", metavar="N", type="int", default=0,
+                       help="show only the first N rows of the sorted list")
+    cmdline.add_option("--offset", metavar="M", type="int", default=0,
+                       help="skip the first M rows of the sorted list")
+    cmdline.add_option("--sortrows", metavar="N", type="int", default=SORTROWS,
+                       help="sort in runs of N rows spilled to temp files")
+    cmdline.add_option("--sortmemory", metavar="MB", type="int", default=SORTMEMORY,
+                       help="sort in runs of MB size spilled to temp files")
+    cmdline.add_option("--formatmemo", metavar="N", type="int", default=FORMATMEMO,
+                       help="cache up to N formatted values per column")
+    cmdline.add_option("--distinct", action="store_true", default=False,
+                       help="show rows with the same selected values once (unsorted)")
+    cmdline.add_option("--distinctmemory", metavar="MB", type="int", default=DISTINCTMEMORY,
+                       help="move seen distinct rows beyond MB size to a temp file")
+    cmdline.add_option("--jsonstream", metavar="MB", type="int", default=JSONSTREAM // (1024 * 1024),
+                       help="decode json input beyond MB size one record at a time")
+    cmdline.add_option("-W", "--where", metavar="COND", action="append", default=[],
+                       help="only rows matching 'name<cond' (or > = <= >= == =~ <>)")
+    cmdline.add_option("--workers", metavar="N", type="int", default=0,
+                       help="format md/csv cells in N processes")
+    cmdline.add_option("--raw", action="store_true", default=False,
+                       help="keep the input cells as strings (lossless on text formats)")
+    cmdline.add_option("--schema", metavar="FILE", default=None,
+                       help="json object with the types of the input columns (default: name.schema.json)")
+    cmdline.add_option("--sniffrows", metavar="N", type="int", default=SNIFFROWS,
+                       help="convert input columns by the type of the first N values (0 = off)")
+    cmdline.add_option("--stats", action="store_true", default=False,
+                       help="show time per phase and row counts as json on stderr")
+    cmdline.add_option("--memprofile", action="store_true", default=False,
+                       help="show peak memory and top allocations per phase on stderr")
+    cmdline.add_option("--memtop", metavar="N", type="int", default=MEMTOP,
+                       help="allocation sites per phase in --memprofile")
     opt, args = cmdline.parse_args()
     logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
     TABXLSX = opt.tabxlsx
+    SORTROWS = opt.sortrows
+    SORTMEMORY = opt.sortmemory * 1024 * 1024
+    FORMATMEMO = opt.formatmemo
+    DISTINCTMEMORY = opt.distinctmemory * 1024 * 1024
+    JSONSTREAM = opt.jsonstream * 1024 * 1024
+    SNIFFROWS = opt.sniffrows
     if not args:
         cmdline.print_help()
     else:
@@ -3025,9 +4121,20 @@ if __name__ == "__main__":
         minwidth = int(opt.minwidth)
         padding = opt.padding if not opt.nopadding else ""
         tab = "\t" if opt.asciitab else opt.tabulator if not opt.notab else ""
-        tabtext = tabtextfile(filename, opt.inputformat)
-        done = print_tabtotext(opt.output, tabtext.data, tabtext.headers, selected,
-                               datedelim=opt.datedelim, tab=tab, padding=padding,
-                               noheaders=opt.noheaders, unique=opt.unique, minwidth=minwidth)
-        if done:
-            logg.log(DONE, " %s", done)
+        stats = TabMemProfile(opt.memtop) if opt.memprofile else TabStats() if opt.stats else None
+        rows, headers = tabrowsfile(filename, opt.inputformat, where=opt.where, stats=stats, schema=opt.schema,
+                                    raw=opt.raw)
+        dones = print_tabtotexts(opt.output or [""], rows, headers, selected,
+                                 datedelim=opt.datedelim, tab=tab, padding=padding,
+                                 noheaders=opt.noheaders, unique=opt.unique, minwidth=minwidth,
+                                 limit=opt.limit, offset=opt.offset, workers=opt.workers, distinct=opt.distinct,
+                                 stats=stats)
+        if isinstance(stats, TabMemProfile):
+            stats.stop()
+            for line in stats.report():
+                print(line, file=sys.stderr)
+        if stats is not None and opt.stats:
+            print(json.dumps(stats.asdict()), file=sys.stderr)
+        for done in dones:
+            if done:
+                logg.log(DONE, " %s", done)
@@ -3,7 +3,7 @@
 __copyright__ = "(C) 2017-2024 Guido Draheim, licensed under the Apache License 2.0"""
 __version__ = "1.6.3321"
 
-from typing import Optional, Union, Dict, List, Any, Sequence, Callable, Iterable
+from typing import Optional, Union, Dict, List, Any, Sequence, Callable, Iterable, AsyncIterator
 from tabtotext import JSONList, JSONDict, JSONItem, DataList, DataItem
 from tabtotext import loadCSV, loadGFM
 import tabtotext
@@ -16,7 +16,9 @@ import os
 import os.path as path
 import shutil
 import json
+import tracemalloc
 import inspect
+import asyncio
 from subprocess import getoutput
 from zipfile import ZipFile
 from dataclasses import dataclass
@@ -249,6 +251,720 @@ class TabToTextTest(unittest.TestCase):
         self.assertEqual(cond, text)
         self.assertEqual(len(text), 40)
     #
+    def test_2001(self) -> None:
+        spec1 = tabtotext.tabspec(["a|b:.2f@x"], ["b|c>2021-12-31|#"])
+        spec2 = tabtotext.tabspec(("a|b:.2f@x",), ("b|c>2021-12-31|#",))
+        self.assertIs(spec1, spec2)
+        self.assertEqual(spec1.showheaders, ["a", "b"])
+        self.assertEqual(spec1.formats, {"b": "{:.2f}"})
+        self.assertEqual(spec1.filtered, {"c": ">2021-12-31"})
+        self.assertEqual(spec1.selcols, ["b", "c", "#"])
+        self.assertEqual(spec1.sortcolumns, ["b", "c", "#"])
+        self.assertEqual(spec1.combined, {"b": ["c", "#"]})
+    def test_2002(self) -> None:
+        spec = tabtotext.tabspec(["a@x|b:.2f@y"])
+        self.assertEqual(spec.renameheaders, {"a": "x", "b": "y"})
+        self.assertEqual(spec.colnames, {"a": "x", "b": "y"})
+        self.assertEqual(spec.formats, {"b": "{:.2f}", "y": "{:.2f}"})
+        self.assertEqual(spec.selheaders, ["x", "y"])
+        self.assertEqual(spec.sortcolumns, ["x", "y"])
+        spec = tabtotext.tabspec(["a|b"], ["{a}-{b}@ab"])
+        self.assertEqual(spec.freecols, {"a b": "{a}-{b}"})
+        self.assertEqual(spec.colnames, {"a b": "ab"})
+    def test_2003(self) -> None:
+        spec = tabtotext.tabspec(["a|b:.2f"], ["a|b|c"])
+        for render in [tabtotext.tabtoGFM, tabtotext.tabtoHTML, tabtotext.tabtoJSON,
+                       tabtotext.tabtoYAML, tabtotext.tabtoTOML, tabtotext.tabtoCSV]:
+            want = render(table33, ["a|b:.2f"], ["a|b|c"])
+            text = render(table33, spec=spec)
+            logg.debug("%s => %s", table33, text.splitlines())
+            self.assertEqual(want, text)
+    def test_2004(self) -> None:
+        spec = tabtotext.tabspec(["a|b"], ["b|c>2021-12-30|#"])
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv"]:
+            want = tabtotext.tabtotext(table33, ["a|b"], ["b|c>2021-12-30|#", "@" + fmt])
+            text = tabtotext.tabtotext(table33, ["a|b"], ["@" + fmt], spec=spec)
+            logg.debug("%s => %s", table33, text.splitlines())
+            self.assertEqual(want, text)
+    def test_2011(self) -> None:
+        class CountFormatGFM(tabtotext.FormatGFM):
+            calls = 0
+            def __call__(self, col: str, val: JSONItem) -> str:
+                self.calls += 1
+                return tabtotext.FormatGFM.__call__(self, col, val)
+        counter = CountFormatGFM()
+        text = tabtotext.tabtoGFM(table33, ["a|b|c"], formatter=counter)
+        logg.debug("%s => %s", table33, text.splitlines())
+        self.assertEqual(counter.calls, 8)  # cells in table33
+        self.assertEqual(text, tabtotext.tabtoGFM(table33, ["a|b|c"]))
+        counter = CountFormatGFM()
+        text = tabtotext.tabtoGFM(table33, ["a|b|c"], ["a|b|#"], formatter=counter)
+        logg.debug("%s => %s", table33, text.splitlines())
+        self.assertEqual(counter.calls, 5 + 3)  # cells plus row numbers
+    def test_2012(self) -> None:
+        class CountFormatJSON(tabtotext.FormatJSON):
+            calls = 0
+            def __call__(self, col: str, val: JSONItem) -> str:
+                self.calls += 1
+                return tabtotext.FormatJSON.__call__(self, col, val)
+        for render in [tabtotext.tabtoHTML, tabtotext.tabtoJSON, tabtotext.tabtoYAML, tabtotext.tabtoCSV]:
+            counter = CountFormatJSON()
+            text = render(table33, ["a|b|c"], formatter=counter)
+            logg.debug("%s => %s", table33, text.splitlines())
+            self.assertEqual(counter.calls, 8)
+            counter = CountFormatJSON()
+            text = render(table33, ["a|b|c"], ["a|b|c>2021-12-30"], formatter=counter)
+            logg.debug("%s => %s", table33, text.splitlines())
+            self.assertEqual(counter.calls, 5)  # rejected row is not formatted
+    def test_2021(self) -> None:
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv", "text", "data"]:
+            want = tabtotext.tabtotext(table33, ["a|b|c"], ["a|b|c"], fmt=fmt)
+            lines = tabtotext.tabtotext_lines(table33, ["a|b|c"], ["a|b|c"], fmt=fmt)
+            self.assertEqual(want, "".join(lines))
+            want = tabtotext.tabtotext([], ["a|b|c"], ["a|b|c"], fmt=fmt)
+            lines = tabtotext.tabtotext_lines([], ["a|b|c"], ["a|b|c"], fmt=fmt)
+            self.assertEqual(want, "".join(lines))
+    def test_2022(self) -> None:
+        data = [{"a": "x%i" % num, "b": num} for num in range(3000)]
+        lines = list(tabtotext.tabtoGFM_lines(data, ["a|b"]))
+        self.assertEqual(len(lines), 3000 + 2)
+        self.assertEqual(lines[0], "| a     | b\n")
+        self.assertEqual(lines[2], "| x0    | 0\n")
+        lines = list(tabtotext.tabtoYAML_lines(data, ["a|b"]))
+        self.assertEqual(len(lines), 3000 + 1)
+        self.assertEqual(lines[1], "- a: \"x0\"\n  b: 0\n")
+    def test_2023(self) -> None:
+        data = [{"a": "x%i" % num, "b": num} for num in range(3000)]
+        out = StringIO()
+        res = tabtotext.print_tabtotext(out, data, ["a|b"], defaultformat="md")
+        logg.info("print_tabtotext %s", res)
+        self.assertEqual(res, ": 3000 results stream")
+        self.assertEqual(out.getvalue(), tabtotext.tabtoGFM(data, ["a|b"]))
+        out = StringIO()
+        res = tabtotext.print_tabtotext(out, data, ["a|b"], ["a|b>2"], defaultformat="csv")
+        self.assertEqual(res, ": 3000 results stream")
+        self.assertEqual(len(out.getvalue().splitlines()), 2997 + 1)
+    def test_2031(self) -> None:
+        data: JSONList = [{"a": "x"}, {"a": None}, {"a": False}, {"a": True}, {"a": 3}, {"a": 12},
+                          {"a": 2.5}, {"a": 11.25}, {"a": Date(2021, 12, 31)}, {"a": Time(2021, 12, 31, 23, 34)},
+                          {"a": Date(2021, 12, 30)}, {"a": "y"}, {"b": 1}, {"a": ""}]
+        sortstring = tabtotext.RowSortCallable(["a"], tuples=False)
+        sorttuples = tabtotext.RowSortCallable(["a"], tuples=True)
+        want = sorted(data, key=sortstring)
+        have = sorted(data, key=sorttuples)
+        logg.debug("%s => %s", want, have)
+        self.assertEqual(want, have)
+        self.assertIsInstance(sorttuples({"a": 1}), tuple)
+        self.assertIsInstance(sortstring({"a": 1}), str)
+    def test_2032(self) -> None:
+        data: JSONList = [{"a": "x", "b": 2}, {"a": "x", "b": 1}, {"a": None, "b": 0}, {"a": 1, "b": 3},
+                          {"b": 4}, {"a": "x"}]
+        sortstring = tabtotext.RowSortCallable(["a", "b@x"], tuples=False)
+        sorttuples = tabtotext.RowSortCallable(["a", "b@x"], tuples=True)
+        want = sorted(data, key=sortstring)
+        have = sorted(data, key=sorttuples)
+        logg.debug("%s => %s", want, have)
+        self.assertEqual(want, have)
+    def test_2033(self) -> None:
+        column: List[JSONItem] = ["", "10", "1abc", 2, 5, None, "x", " b", "!a", ":x", "?q", "~", True, False,
+                                  "20211231", "2022", Date(2021, 12, 31), Time(2021, 12, 31, 23, 34), 12, 2.5]
+        data: JSONList = [{"a": value} for value in column] + [{"b": 1}]
+        sortstring = tabtotext.RowSortCallable(["a"], tuples=False)
+        sorttuples = tabtotext.RowSortCallable(["a"], tuples=True)
+        want = sorted(data, key=sortstring)
+        have = sorted(data, key=sorttuples)
+        logg.debug("%s => %s", want, have)
+        self.assertEqual(want, have)
+        self.assertEqual(["", "10", "1abc", 2, 5, None, "x"],
+                         [row["a"] for row in sorted([{"a": value} for value in column[:7]], key=sorttuples)])
+        # only negative numbers differ, the sort-string had them after the positive ones
+        data = [{"a": value} for value in ["", "10", "1abc", 2, 5, -3, None, "x"]]
+        self.assertEqual(["", "10", "1abc", 2, 5, -3, None, "x"], [row["a"] for row in sorted(data, key=sortstring)])
+        self.assertEqual(["", "10", "1abc", -3, 2, 5, None, "x"], [row["a"] for row in sorted(data, key=sorttuples)])
+    def test_2041(self) -> None:
+        data: JSONList = [{"a": num % 7, "b": "x%i" % num} for num in range(100)]
+        sortrow = tabtotext.RowSortCallable(["a"])
+        want = sorted(data, key=sortrow)
+        rows = tabtotext.RowSorter(sortrow, maxrows=9)
+        for item in data:
+            rows.append(item)
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(len(rows.runs), 11)
+        have = list(rows)
+        self.assertEqual(want, have)  # stable like sorted()
+    def test_2042(self) -> None:
+        data: JSONList = [{"a": num % 7, "b": "x%i" % num} for num in range(100)]
+        sortrow = tabtotext.RowSortCallable(["a"])
+        want = sorted(data, key=sortrow)
+        rows = tabtotext.RowSorter(sortrow, maxmemory=2000)
+        for item in data:
+            rows.append(item)
+        self.assertGreater(len(rows.runs), 2)
+        have = list(rows)
+        self.assertEqual(want, have)
+    def test_2043(self) -> None:
+        data: JSONList = [{"a": num % 7, "b": "x%i" % num, "c": Date(2021, 12, 1 + num % 30)} for num in range(100)]
+        want = [tabtotext.tabtotext(data, ["a|b|c"], fmt=fmt) for fmt in ["md", "html", "json", "csv"]]
+        sortrows = tabtotext.SORTROWS
+        try:
+            tabtotext.SORTROWS = 7
+            have = [tabtotext.tabtotext(data, ["a|b|c"], fmt=fmt) for fmt in ["md", "html", "json", "csv"]]
+        finally:
+            tabtotext.SORTROWS = sortrows
+        self.assertEqual(want, have)
+    def test_2051(self) -> None:
+        data: JSONList = [{"a": num % 7, "b": "x%i" % num} for num in range(100)]
+        sortrow = tabtotext.RowSortCallable(["a"])
+        want = sorted(data, key=sortrow)
+        for limit, offset in [(1, 0), (5, 0), (5, 3), (20, 90), (200, 0)]:
+            rows = tabtotext.RowSorter(sortrow, limit=limit, offset=offset)
+            for item in data:
+                rows.append(item)
+            self.assertLessEqual(len(rows.rows), 2 * (limit + offset))
+            have = list(rows)
+            self.assertEqual(want[offset:offset + limit], have)
+        rows = tabtotext.RowSorter(sortrow, offset=95)
+        for item in data:
+            rows.append(item)
+        self.assertEqual(want[95:], list(rows))
+    def test_2052(self) -> None:
+        text = tabtotext.tabtoGFM(table44, ["a|b|c|d"], limit=2)
+        logg.debug("%s => %s", table44, text.splitlines())
+        cond = ['| a     | b     | c     | d',
+                '| ----- | ----- | ----- | -----',
+                '| x     | 3     | (yes) | 0.40',
+                '| y     | 2     | (no)  | 0.30']
+        self.assertEqual(cond, text.splitlines())
+        text = tabtotext.tabtoGFM(table44, ["a|b|c|d"], limit=1, offset=2)
+        logg.debug("%s => %s", table44, text.splitlines())
+        cond = ['| a     | b     | c     | d',
+                '| ----- | ----- | ----- | -----',
+                '| ~     | ~     | (yes) | 0.20']
+        self.assertEqual(cond, text.splitlines())
+    def test_2053(self) -> None:
+        data: JSONList = [{"a": "x" * num, "b": num} for num in range(20)]
+        text = tabtotext.tabtoGFM(data, ["b|a"], limit=3)
+        logg.debug("%s => %s", data, text.splitlines())
+        cond = ['| b     | a', '| ----- | -----', '| 0     |', '| 1     | x', '| 2     | xx']
+        self.assertEqual(cond, text.splitlines())  # widths of the shown rows
+        text = tabtotext.tabtoGFM(data, ["b|a"], offset=18)
+        logg.debug("%s => %s", data, text.splitlines())
+        cond = ['| b     | a', '| ----- | -------------------',
+                '| 18    | xxxxxxxxxxxxxxxxxx', '| 19    | xxxxxxxxxxxxxxxxxxx']
+        self.assertEqual(cond, text.splitlines())
+    def test_2054(self) -> None:
+        data: JSONList = [{"a": num % 7, "b": "x%i" % num} for num in range(100)]
+        sortrow = tabtotext.RowSortCallable(["a", "b"])
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv"]:
+            want = tabtotext.tabtotext(sorted(data, key=sortrow)[3:5], ["a|b"], fmt=fmt)
+            text = tabtotext.tabtotext(data, ["b|a"], ["a|b", "@limit=2", "@offset=3"], fmt=fmt)
+            logg.debug("%s => %s", fmt, text.splitlines())
+            self.assertEqual(want, text)
+            text = tabtotext.tabtotext(data, ["b|a"], ["a|b"], fmt=fmt, limit=2, offset=3)
+            self.assertEqual(want, text)
+    def test_2055(self) -> None:
+        data: JSONList = [{"a": num % 7, "b": "x%i" % num} for num in range(100)]
+        sortrow = tabtotext.RowSortCallable(["a", "b"])
+        want = [{"a": item["a"], "b": item["b"]} for item in sorted(data, key=sortrow)[3:5]]
+        tmp = self.testdir()
+        filename = path.join(tmp, "output.xlsx")
+        tabxlsx = tabtotext.TABXLSX
+        try:
+            for usetabxlsx in [True, False]:
+                tabtotext.TABXLSX = usetabxlsx
+                tabtotext.print_tabtotext(filename, data, ["b|a"], ["a|b", "@limit=2", "@offset=3"])
+                self.assertEqual(want, tabtotext.readFromFile(filename))
+                tabtotext.print_tabtotext(filename, data, ["b|a"], ["a|b"], limit=2, offset=3)
+                self.assertEqual(want, tabtotext.readFromFile(filename))
+                tabtotext.print_tabtotext(filename, data, ["b|a"], ["a|b", "a>5", "@limit=1"])
+                self.assertEqual([{"a": 6, "b": "x13"}], tabtotext.readFromFile(filename))
+        finally:
+            tabtotext.TABXLSX = tabxlsx
+        self.rm_testdir()
+    def test_2061(self) -> None:
+        table = tabtotext.tabcolumns(table44, ["a", "b", "c", "d"], compact=True)
+        logg.debug("columns = %s", table.columns)
+        self.assertEqual(4, len(table))
+        self.assertEqual(["x", "y", None, "y"], list(table.column("a")))
+        self.assertEqual("array", type(table.column("d")).__name__)
+        self.assertEqual("list", type(table.column("c")).__name__)  # bool is not int
+        self.assertNotIn("c", table[3])
+        self.assertEqual({"a": "y", "b": 1, "d": 0.1}, dict(table[3]))
+        self.assertEqual(table44, table.totabtext().data)
+        table.append({"a": "z", "d": 1})
+        self.assertEqual("list", type(table.column("d")).__name__)  # int is not float
+        self.assertEqual({"a": "z", "d": 1}, table[-1].asdict())
+    def test_2062(self) -> None:
+        table = tabtotext.tabcolumns(table44, compact=True)
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv"]:
+            want = tabtotext.tabtotext(table44, ["a", "b", "c", "d:.2f"], fmt=fmt)
+            text = tabtotext.tabtotext(table, ["a", "b", "c", "d:.2f"], fmt=fmt)
+            logg.debug("%s => %s", fmt, text.splitlines())
+            self.assertEqual(want, text)
+            want = tabtotext.tabtotext(table44, ["a", "b", "c"], ["b", "a"], fmt=fmt, limit=2)
+            text = tabtotext.tabtotext(table, ["a", "b", "c"], ["b", "a"], fmt=fmt, limit=2)
+            self.assertEqual(want, text)
+    def test_2063(self) -> None:
+        tmp = self.testdir()
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv", "tab"]:
+            filename = path.join(tmp, "output." + fmt)
+            with open(filename, "w") as f:
+                f.write(tabtotext.tabtotext(table44, ["a", "b", "c", "d"], fmt=fmt))
+            want = tabtotext.tabtextfile(filename)
+            table = tabtotext.tabcolumnsfile(filename)
+            logg.debug("%s => %s", fmt, table.columns)
+            self.assertEqual(want.data, table.totabtext().data)
+            self.assertEqual(want.data, [dict(row) for row in table.data])
+        self.rm_testdir()
+    def test_2071(self) -> None:
+        format = tabtotext.FormatGFM({"a": "{:5d}|{:s}", "b": "{:4h}", "c": "%4.1f", "d": "{:%s}", "e": "{:.2f}"})
+        cells = [("a", 3), ("a", "x|y"), ("b", 2.5), ("c", 2.25), ("c", "x"),
+                 ("d", "y"), ("e", None), ("e", 1.5), ("z", 0.5), ("z", True)]
+        text = [format(col, val) for col, val in cells]
+        logg.debug("text = %s", text)
+        cond = ["    3", "x!y", "   2½", " 2.2", "x", "y", "~", "1.50", "0.50", "(yes)"]
+        self.assertEqual(cond, text)
+        self.assertEqual(["a", "b", "c", "d", "e", "z"], sorted(format.formatters))
+    def test_2072(self) -> None:
+        for name in ["FormatGFM", "FormatHTML", "FormatCSV", "FormatJSON", "FormatYAML", "FormatTOML"]:
+            plain = getattr(tabtotext, name)({"a": "{:.3f}"})
+            memo = getattr(tabtotext, name)({"a": "{:.3f}"})
+            memo.memosize = 20
+            values: List[JSONItem] = [1, True, 1.0, 0.0, -0.0, None, "x", Date(2021, 12, 31), [1]] * 3
+            for col in ["a", "b"]:
+                want = [plain(col, value) for value in values]
+                text = [memo(col, value) for value in values]
+                logg.debug("%s %s => %s", name, col, text)
+                self.assertEqual(want, text)
+            memo("c", "x")
+            formatter = memo.formatters["c"]
+            for num in range(100):
+                self.assertEqual(formatter, memo.formatters["c"])
+                memo("c", "x")
+            for num in range(100):
+                memo("c", num)
+            self.assertNotEqual(formatter, memo.formatters["c"])  # high-cardinality
+            self.assertEqual(plain("c", 1000), memo("c", 1000))
+    def test_2081(self) -> None:
+        data: JSONList = [{"a": num % 7, "b": "x%i" % num, "c": num * 0.25} for num in range(100)]
+        workchunk = tabtotext.WORKCHUNK
+        try:
+            tabtotext.WORKCHUNK = 30
+            for fmt in ["md", "csv", "text", "html"]:
+                for selected in [["a|b|c:4h"], ["c|a|#|b>x5"], ["a|b", "@unique"], ["a|b", "@limit=5"]]:
+                    want = tabtotext.tabtotext(data, ["a|b|c"], selected, fmt=fmt)
+                    text = tabtotext.tabtotext(data, ["a|b|c"], selected, fmt=fmt, workers=2)
+                    logg.debug("%s %s => %s", fmt, selected, text.splitlines()[:5])
+                    self.assertEqual(want, text)
+        finally:
+            tabtotext.WORKCHUNK = workchunk
+    def test_2091(self) -> None:
+        values: List[JSONItem] = [None, True, False, 0, 2, 2.999, "", "x", "3",
+                                  Date(2021, 12, 30), Date(2021, 12, 31), Time(2021, 12, 30, 23, 59)]
+        for op in ["=~", "<>", "==", "<=", "<", ">=", ">", "="]:
+            for arg in ["", "0", "3", "x", "yes", "~", "2021-12-30", "2021-12"]:
+                unmatched = tabtotext.FilterCallable(op + arg)
+                want = [tabtotext.unmatched(value, op + arg) for value in values]
+                have = [unmatched(value) for value in values]
+                self.assertEqual(want, have)
+    def test_2092(self) -> None:
+        accept = tabtotext.RowFilterCallable(["a", "b>1", "c<2021-12-31@x"])
+        self.assertEqual({"b": ">1", "c": "<2021-12-31"}, accept.filtered)
+        rows = [item for item in table33 if accept(item)]
+        self.assertEqual([table33[1]], rows)
+        tmp = self.testdir()
+        filename = path.join(tmp, "table33.json")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoJSON(table33))
+        data = tabtotext.tabtextfile(filename).data
+        tabtext = tabtotext.tabtextfile(filename, where=["b>2"])
+        self.assertEqual([data[0], data[2]], tabtext.data)  # no "b" in the last row
+        table = tabtotext.tabcolumnsfile(filename, where="b<3,c=~2021-12-30")
+        self.assertEqual([data[1]], table.totabtext().data)
+        rows = list(tabtotext.tabfilter(table33, "b<3"))
+        self.assertEqual([table33[1], table33[2]], rows)
+        self.rm_testdir()
+    def test_2093(self) -> None:
+        data: JSONList = [{"a": "x" * num, "b": num} for num in range(20)]
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv"]:
+            want = tabtotext.tabtotext(data[:4], ["a", "b"], ["a", "b"], fmt=fmt)
+            text = tabtotext.tabtotext(data, ["a", "b"], ["a", "b<4"], fmt=fmt)
+            logg.debug("%s => %s", fmt, text.splitlines())
+            self.assertEqual(want, text)  # widths of the rejected rows are not taken
+            text = tabtotext.tabtotext(tabtotext.tabfilter(data, ["b<4"]), ["a", "b"], ["a", "b"], fmt=fmt)
+            self.assertEqual(want, text)
+    def test_2101(self) -> None:
+        data: JSONList = [{"a": num % 3, "b": "x%i" % (num % 2), "c": num} for num in range(30)]
+        data += [{"a": True, "b": "x1"}, {"b": "x1", "a": 1.0}, {"b": "x1", "a": 1}]
+        rows = list(tabtotext.tabdistinct(data, ["a|b"], ["b|a"]))
+        logg.debug("rows = %s", rows)
+        self.assertEqual(data[:6] + data[30:32], rows)
+        rows = list(tabtotext.tabdistinct(data, ["a|b"], ["b|a"], maxmemory=100))
+        self.assertEqual(data[:6] + data[30:32], rows)
+        self.assertEqual(data, list(tabtotext.tabdistinct(data)))
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv"]:
+            want = tabtotext.tabtotext(data[:6] + data[30:32], ["a|b"], ["b|a"], fmt=fmt)
+            text = tabtotext.tabtotext(data, ["a|b"], ["b|a", "@distinct"], fmt=fmt)
+            logg.debug("%s => %s", fmt, text.splitlines())
+            self.assertEqual(want, text)
+            text = tabtotext.tabtotext(data, ["a|b"], ["b|a"], fmt=fmt, distinct=True)
+            self.assertEqual(want, text)
+    def test_2102(self) -> None:
+        data: JSONList = [{"a": num % 3, "b": "x%i" % (num % 2), "c": num} for num in range(30)]
+        tmp = self.testdir()
+        filename = path.join(tmp, "output.xlsx")
+        tabtotext.print_tabtotext(filename, data, ["a|b"], ["b|a", "@distinct"])
+        back = tabtotext.readFromFile(filename)
+        logg.debug("back = %s", back)
+        self.assertEqual(6, len(back))
+        self.rm_testdir()
+    def test_2111(self) -> None:
+        spec = tabtotext.tabspec(["a|b"], ["{a}-{b:>5}@ab"])
+        format = tabtotext.FormatGFM({"b": "{:.1f}"})
+        frees = tabtotext.tabfreeformats(spec, format)
+        free = frees["a b"]
+        self.assertEqual(["a", "b"], free.sources)
+        self.assertEqual("x-  3.0", free({"a": "x", "b": 3}))
+        self.assertEqual("x-    ~", free({"a": "x"}))
+        self.assertEqual("~-  2.5", free({"b": 2.5, "c": 1}))
+        for item in table44:
+            self.assertEqual(free.scan(item), free(item))
+        free = tabtotext.FreeFormatCallable("a b", "{a}-{b}", {"x": "a"}, format)
+        self.assertEqual(None, free.sources)
+        self.assertEqual("y-~", free({"a": "z", "x": "y"}))
+        free = tabtotext.FreeFormatCallable("a", "{a!r}", {}, format)
+        self.assertEqual(None, free.sources)
+        free = tabtotext.FreeFormatCallable("a a", "{{{a}}}+{a}", {}, format, none="")
+        self.assertEqual(["a", "a"], free.sources)
+        self.assertEqual("{x}+x", free({"a": "x"}))
+        self.assertEqual("{}+", free({}))
+    def test_2121(self) -> None:
+        data: JSONList = [{"a": num % 3, "b": "x%i" % (num % 5), "c": num} for num in range(30)]
+        data += [{"a": 9, "c": 9, "d": 1}]
+        selected = ["b", "a@x", "c>4"]
+        rows, spec = tabtotext.tabshared(data, tabtotext.tabspec([], selected))
+        self.assertEqual({}, spec.filtered)
+        self.assertEqual([], spec.sortcolumns)
+        self.assertEqual(26, len(rows))
+        self.assertEqual([0, 1, 1, 2, 2], [row["a"] for row in rows[1:6] if row["b"] == "x0"])
+        self.assertEqual({"a": 9, "c": 9, "d": 1}, rows[0])
+        rows, spec = tabtotext.tabshared(data, tabtotext.tabspec([], ["b", "d", "c<4"]))
+        self.assertEqual({"c": "<4"}, spec.filtered)
+        self.assertEqual(31, len(rows))
+        tmp = self.testdir()
+        outputs = [path.join(tmp, "output." + ext) for ext in ["md", "html", "json", "csv", "xlsx"]]
+        dones = tabtotext.print_tabtotexts(outputs, data, [], selected)
+        logg.debug("dones = %s", dones)
+        self.assertEqual(5, len(dones))
+        texts = [open(output).read() for output in outputs[:-1]]
+        back = tabtotext.readFromFile(outputs[-1])
+        for output, text in zip(outputs, texts):
+            tabtotext.print_tabtotext(output, data, [], selected)
+            self.assertEqual(open(output).read(), text)
+        self.assertEqual(tabtotext.readFromFile(outputs[-1]), back)
+        self.assertEqual(26, len(back))
+        self.rm_testdir()
+    def test_2122(self) -> None:
+        data: JSONList = [{"a": "x", "b": 1}, {"a": "y", "b": 2}]
+        tmp = self.testdir()
+        outputs = [path.join(tmp, "output." + ext) for ext in ["md", "csv", "tab"]]
+        for rows in [data, []]:
+            for selected in [["a", "b", "zz"], ["a", "b", "zz", "@unsorted"]]:
+                tabtotext.print_tabtotexts(outputs, rows, [], selected)
+                texts = [open(output).read() for output in outputs]
+                for output, text in zip(outputs, texts):
+                    tabtotext.print_tabtotext(output, rows, [], selected)
+                    self.assertEqual(open(output).read(), text)
+                text = tabtotext.tabtotext(rows, [], selected, fmt="csv")
+                self.assertEqual(tabtotext.tabtotext(rows, [], ["a", "b", "zz"], fmt="csv"), text)
+                self.assertNotIn("zz", text)
+        self.rm_testdir()
+    def test_2131(self) -> None:
+        data: JSONList = [{"a": num % 3, "b": "x%i" % num, "c": num * 0.5} for num in range(20)]
+        data += [{"b": "y", "d": 1}]
+        async def source() -> AsyncIterator[JSONDict]:
+            for item in data:
+                yield item
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv"]:
+            for selected in [[], ["b", "a"], ["b", "a", "@unsorted"], ["a<2", "c", "#", "@unsorted"]]:
+                want = tabtotext.tabtotext(data, [], selected, fmt=fmt)
+                text = asyncio.run(tabtotext.tabtotext_async(source(), [], selected, fmt=fmt))
+                logg.debug("%s %s => %s", fmt, selected, text.splitlines())
+                self.assertEqual(want, text)
+    def test_2132(self) -> None:
+        data: JSONList = [{"a": "x", "b": 1}, {"a": "z", "b": 3}, {"a": "y", "b": 2}]
+        text = tabtotext.tabtotext(data, [], ["b", "a"], fmt="csv")
+        self.assertEqual(['b;a', '1;x', '2;y', '3;z'], text.splitlines())
+        text = tabtotext.tabtotext(data, [], ["b", "a", "@unsorted"], fmt="csv")
+        self.assertEqual(['b;a', '1;x', '3;z', '2;y'], text.splitlines())
+        text = tabtotext.tabtotext(data, [], ["b", "a"], fmt="json", unsorted=True)
+        self.assertEqual(['[', ' {"b": 1, "a": "x"},', ' {"b": 3, "a": "z"},', ' {"b": 2, "a": "y"}', ']'], text.splitlines())
+    def test_2133(self) -> None:
+        class Writer:
+            def __init__(self) -> None:
+                self.chunks: List[bytes] = []
+            def write(self, chunk: bytes) -> None:
+                self.chunks.append(chunk)
+            async def drain(self) -> None:
+                pass
+        writer = Writer()
+        waited: List[int] = []
+        async def source() -> AsyncIterator[JSONDict]:
+            for num in range(5):
+                waited.append(len(writer.chunks))
+                await asyncio.sleep(0.02)
+                yield {"a": num}
+        done = asyncio.run(tabtotext.print_tabtotext_async(writer, source(), [], ["a", "@unsorted"], fmt="jsn"))
+        logg.debug("chunks = %s", writer.chunks)
+        self.assertEqual(": 5 results stream", done)
+        text = b"".join(writer.chunks).decode("utf-8")
+        self.assertEqual(['[', ' {"a":0},', ' {"a":1},', ' {"a":2},', ' {"a":3},', ' {"a":4}', ']'], text.splitlines())
+        self.assertLess(waited[1], waited[-1])  # incremental
+        writer = Writer()
+        waited = []
+        done = asyncio.run(tabtotext.print_tabtotext_async(writer, source(), [], ["a"], fmt="md"))
+        self.assertEqual([0, 0, 0, 0, 0], waited)
+        self.assertEqual(['| a', '| -----', '| 0', '| 1', '| 2', '| 3', '| 4'], b"".join(writer.chunks).decode("utf-8").splitlines())
+    def test_2134(self) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+        data: JSONList = [{"a": num % 7, "b": num} for num in range(50)]
+        async def source() -> AsyncIterator[JSONDict]:
+            for item in data:
+                await asyncio.sleep(0)
+                yield item
+        async def calls(count: int) -> List[str]:
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(2))
+            texts = [tabtotext.tabtotext_async(source(), [], ["a", "b"], fmt=fmt) for fmt in ["md", "csv"] * count]
+            return await asyncio.wait_for(asyncio.gather(*texts), 10)
+        asyncrows = tabtotext.ASYNCROWS
+        try:
+            tabtotext.ASYNCROWS = 3
+            texts = asyncio.run(calls(3))
+        finally:
+            tabtotext.ASYNCROWS = asyncrows
+        self.assertEqual(6, len(texts))
+        for fmt, text in zip(["md", "csv"] * 3, texts):
+            self.assertEqual(tabtotext.tabtotext(data, [], ["a", "b"], fmt=fmt), text)
+    def test_2135(self) -> None:
+        produced: List[int] = []
+        async def source() -> AsyncIterator[JSONDict]:
+            for num in range(200):
+                produced.append(num)
+                yield {"a": num}
+        async def slow() -> List[int]:
+            seen = []
+            async for chunk in tabtotext.tabtotext_lines_async(source(), [], ["a", "@unsorted"], fmt="jsn"):
+                await asyncio.sleep(0.01)
+                seen.append(len(produced))
+            return seen
+        asyncrows, writebatch = tabtotext.ASYNCROWS, tabtotext.WRITEBATCH
+        try:
+            tabtotext.ASYNCROWS, tabtotext.WRITEBATCH = 2, 1
+            seen = asyncio.run(slow())
+        finally:
+            tabtotext.ASYNCROWS, tabtotext.WRITEBATCH = asyncrows, writebatch
+        logg.debug("seen = %s", seen)
+        self.assertEqual(200, len(produced))
+        self.assertLess(seen[0], 20)  # the source is held back by the slow reader
+    def test_2141(self) -> None:
+        data = [{"a": 1, "b": 2.5}, {"a": 2, "b": 1.5}, {"a": 3, "b": 0.5}]
+        for fmt in ["md", "html", "json", "yaml", "toml", "csv"]:
+            stats = tabtotext.TabStats()
+            text = tabtotext.tabtotext(data, [], ["a", "b:.2f", "a<3"], fmt=fmt, stats=stats)
+            logg.debug("%s => %s", fmt, text)
+            want = tabtotext.tabtotext(data, [], ["a", "b:.2f", "a<3"], fmt=fmt)
+            self.assertEqual(want, text)
+            info = stats.asdict()
+            logg.debug("%s stats = %s", fmt, info)
+            self.assertEqual(3, info["counts"]["rows_in"])
+            self.assertEqual(1, info["counts"]["rows_filtered"])
+            self.assertEqual(2, info["counts"]["rows_out"])
+            self.assertLessEqual(4, info["counts"]["format_calls"])
+            for phase in ["spec", "read", "filter", "scan", "format", "render", "total"]:
+                self.assertIn(phase, info["seconds"])
+            self.assertAlmostEqual(info["seconds"]["total"], sum(took for phase, took in info["seconds"].items() if phase != "total"), 3)
+    def test_2142(self) -> None:
+        stats = tabtotext.TabStats()
+        out = StringIO()
+        done = tabtotext.print_tabtotext(out, [{"a": "x"}, {"a": "y"}], ["a"], stats=stats)
+        self.assertEqual(": 2 results stream", done)
+        info = stats.asdict()
+        self.assertEqual(len(out.getvalue().encode("utf-8")), info["counts"]["bytes_written"])
+        self.assertIn("write", info["seconds"])
+    def test_2143(self) -> None:
+        data = [{"a": num, "b": "x%i" % num} for num in range(1000)]
+        stats = tabtotext.TabMemProfile(top=3)
+        text = tabtotext.tabtotext(data, [], ["a", "b"], fmt="md", stats=stats)
+        self.assertEqual(1002, len(text.splitlines()))
+        stats.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+        info = stats.asdict()
+        logg.debug("memory = %s", info["memory"])
+        self.assertEqual(1000, info["counts"]["rows_out"])
+        for phase in ["read", "scan", "render"]:
+            self.assertLess(0, info["memory"][phase]["peak"])
+        for phase, memory in info["memory"].items():
+            self.assertLessEqual(len(memory["sites"]), 3)
+            for site, size, blocks in memory["sites"]:
+                self.assertIn(site.split(":")[0], ["tabtotext.py", "tabtoxlsx.py", "tabxlsx.py"])
+        lines = stats.report()
+        self.assertTrue(lines[0].split()[1] == "peak")
+    def test_2144(self) -> None:
+        data: JSONList = [{"a": num % 7, "b": "x%i" % num} for num in range(300)]
+        workchunk = tabtotext.WORKCHUNK
+        try:
+            tabtotext.WORKCHUNK = 70
+            for fmt in ["md", "csv"]:
+                serial = tabtotext.TabStats()
+                want = tabtotext.tabtotext(data, [], ["a", "b"], fmt=fmt, stats=serial)
+                stats = tabtotext.TabStats()
+                text = tabtotext.tabtotext(data, [], ["a", "b"], fmt=fmt, stats=stats, workers=2)
+                self.assertEqual(want, text)
+                logg.debug("%s counts = %s", fmt, stats.counts)
+                self.assertEqual(serial.counts, stats.counts)
+                self.assertEqual(600, stats.counts["format_calls"])
+        finally:
+            tabtotext.WORKCHUNK = workchunk
+    def test_2151(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "input.md")
+        with open(filename, "wb") as f:
+            f.write("| a | b |\r\n| -- | -- |\r\n| 1 | \u00e4x |\r\n# note\r\n| 2 |\r\n|3|y|z|\r\n".encode("utf-8"))
+        want = [{"a": 1, "b": "\u00e4x"}, {"a": 2, "b": ""}, {"a": 3, "b": "y"}]
+        parser = tabtotext.DictParserGFM()
+        self.assertEqual(want, list(parser.load(filename)))
+        self.assertEqual(["", "a", "b", ""], parser.headers)
+        readbuffer = tabtotext.READBUFFER
+        try:
+            tabtotext.READBUFFER = 3
+            self.assertEqual(want, list(tabtotext.DictParserGFM().load(filename)))
+        finally:
+            tabtotext.READBUFFER = readbuffer
+        text = "| a | b\n| 1 | 2\n| 3 | 4\n"  # no divider
+        self.assertEqual([{"a": 1, "b": 2}, {"a": 3, "b": 4}], list(tabtotext.DictParserGFM().loads(text)))
+        self.rm_testdir()
+    def test_2161(self) -> None:
+        parse = tabtotext.ParseJSONItem()
+        samples = [(["1", "-2", ""], "intvalue", ["12", "-3", "+4", "1.5", "x", "~", "1_0"]),
+                   (["1.5", "2"], "floatvalue", ["12", "1.25", "1e3", "x", "(yes)", ""]),
+                   (["(yes)", "(no)"], "boolvalue", ["(no)", "1", "~"]),
+                   (["a", "b c"], "strvalue", ["zz", "12", "~", "Hx", "2024-01-02", "\u00bd"]),
+                   (["2024-01-02"], "datevalue", ["2024-12-31", "2024-01-02 10:30", "x", "1"]),
+                   (["2024-01-02 10:30"], "timevalue", ["2024-01-02Z10:30", "2024-01-02", "x", "2"]),
+                   (["1", "x"], "toJSONItem", ["2", "y"])]
+        for sample, name, values in samples:
+            column = parse.column(len(sample))
+            for value in sample:
+                self.assertEqual(parse.toJSONItem(value), column.convert(value))
+            self.assertEqual(name, column.convert.__name__)
+            for value in values:
+                want = parse.toJSONItem(value)
+                have = column.convert(value)
+                self.assertEqual((want, type(want)), (have, type(have)))
+        text = "a;b\n1;x\n2;y\n3;4\n"
+        self.assertEqual([{"a": 1, "b": "x"}, {"a": 2, "b": "y"}, {"a": 3, "b": 4}], list(tabtotext.DictParserCSV(sniff=2).loads(text)))
+    def test_2171(self) -> None:
+        text = "a;b;c;d;e\n1;12;2024-01-02;3;(yes)\n;007;;x;(no)\n"
+        schema = {"a": int, "b": "str", "c": "date", "d": "float", "e": "bool"}
+        want = [{"a": 1, "b": "12", "c": Date(2024, 1, 2), "d": 3.0, "e": True},
+                {"a": "", "b": "007", "c": "", "d": "x", "e": False}]
+        have = list(tabtotext.DictParserCSV(schema=schema).loads(text))
+        self.assertEqual(want, have)
+        self.assertEqual(float, type(have[0]["d"]))
+        text = tabtotext.tabtoGFM(want)
+        have = list(tabtotext.DictParserGFM(schema=schema).loads(text))
+        self.assertEqual(want, have)
+        text = '[{"a": 1, "b": "2024-01-02", "c": "2024-01-02"}]'
+        have = list(tabtotext.DictParserJSON(schema={"b": "string"}).loads(text))
+        self.assertEqual([{"a": 1, "b": "2024-01-02", "c": Date(2024, 1, 2)}], have)
+    def test_2172(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "input.csv")
+        with open(filename, "w") as f:
+            f.write("a;b\n1;12\n2;13\n")
+        self.assertEqual([{"a": 1, "b": 12}, {"a": 2, "b": 13}], tabtotext.tabtextfile(filename).data)
+        with open(path.join(tmp, "input.schema.json"), "w") as f:
+            json.dump({"b": "str"}, f)
+        self.assertEqual([{"a": 1, "b": "12"}, {"a": 2, "b": "13"}], tabtotext.tabtextfile(filename).data)
+        self.assertEqual([{"a": 1, "b": 12}, {"a": 2, "b": 13}], tabtotext.tabtextfile(filename, schema={}).data)
+        self.assertEqual([{"a": "1", "b": 12}, {"a": "2", "b": 13}], tabtotext.tabtextfile(filename, schema={"a": str}).data)
+        self.rm_testdir()
+    def test_2181(self) -> None:
+        text = "a;b;c;d\n007;1.50;~;12:30\nx;;(yes);2024-01-02\n"
+        want = [{"a": "007", "b": "1.50", "c": "~", "d": "12:30"},
+                {"a": "x", "b": "", "c": "(yes)", "d": "2024-01-02"}]
+        parser = tabtotext.DictParserCSV(raw=True)
+        have = list(parser.loads(text))
+        self.assertEqual(want, have)
+        self.assertEqual(["a", "b", "c", "d"], parser.headers)
+        self.assertEqual(want, list(tabtotext.DictParserCSV(raw=True, schema={"a": int}).loads(text)))
+        text = "| a | b | c | d\n| - | - | - | -\n| 007 | 1.50 | ~ | 12:30\n| x | | (yes) | 2024-01-02\n| 1 | 2\n"
+        have = list(tabtotext.DictParserGFM(raw=True).loads(text))
+        self.assertEqual(want, have[:2])
+        self.assertEqual("1", have[2]["a"])
+        text = '[{"a": 1, "b": "2024-01-02"}]'
+        have = list(tabtotext.DictParserJSON(raw=True).loads(text))
+        self.assertEqual([{"a": 1, "b": "2024-01-02"}], have)
+        text = "data:\n- a: 007\n  b: 2024-01-02\n"
+        have = list(tabtotext.DictParserYAML(raw=True).loads(text))
+        self.assertEqual([{"a": "007", "b": "2024-01-02"}], have)
+    def test_2191(self) -> None:
+        text = "a;b;c\n1;x;2024-01-02\n\n2;y\n3;z;;4;5\n"
+        want = [{"a": 1, "b": "x", "c": Date(2024, 1, 2)},
+                {"a": 2, "b": "y", "c": "ignore"},
+                {"a": 3, "b": "z", "c": "", None: ["4", "5"]}]
+        parser = tabtotext.DictParserCSV()
+        have = list(parser.loads(text))
+        self.assertEqual(want, have)
+        self.assertEqual(["a", "b", "c"], parser.headers)
+        have = list(tabtotext.DictParserCSV(raw=True).loads(text))
+        self.assertEqual({"a": "3", "b": "z", "c": "", None: ["4", "5"]}, have[2])
+        self.assertEqual([], list(tabtotext.DictParserCSV().loads("")))
+        self.assertEqual([], list(tabtotext.DictParserCSV().loads("\n\n")))
+    def test_2201(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "input.json")
+        data = [{"a": 1, "b": "2024-01-02", "c": "x,]}"}, {"a": 2.5, "b": None, "c": [1, 2]}, {}, {"a": 12345678}]
+        with open(filename, "w") as f:
+            f.write(" " + json.dumps(data, indent=1) + "\n")
+        want = tabtotext.tabtextfileJSON(filename).data
+        self.assertEqual(Date(2024, 1, 2), want[0]["b"])
+        readbuffer, jsonstream = tabtotext.READBUFFER, tabtotext.JSONSTREAM
+        try:
+            tabtotext.READBUFFER, tabtotext.JSONSTREAM = 3, 0
+            self.assertEqual(want, tabtotext.tabtextfileJSON(filename).data)
+            self.assertEqual(data, list(tabtotext.DictParserJSON(raw=True).load(filename)))
+            with open(filename, "w") as f:
+                f.write("[]")
+            self.assertEqual([], tabtotext.tabtextfileJSON(filename).data)
+            with open(filename, "w") as f:
+                f.write('[{"a": 1} {"a": 2}]')
+            with self.assertRaises(ValueError):
+                tabtotext.tabtextfileJSON(filename)
+            tabtotext.READBUFFER = 100
+            with open(filename, "w") as f:
+                f.write('[{"a": 1 "b": 2},\n' + ",\n".join(['{"a": %i, "b": "%s"}' % (num, "x" * 50) for num in range(10000)]) + "]")
+            with self.assertRaises(json.JSONDecodeError) as error:
+                tabtotext.tabtextfileJSON(filename)
+            self.assertLess(len(error.exception.doc), 1000)  # not the rest of the file
+        finally:
+            tabtotext.READBUFFER, tabtotext.JSONSTREAM = readbuffer, jsonstream
+        self.rm_testdir()
+    def test_2211(self) -> None:
+        tmp = self.testdir()
+        for ext in ["md", "csv", "json", "html"]:
+            filename = path.join(tmp, "input." + ext)
+            with open(filename, "w") as f:
+                f.write(tabtotext.tabtotext(table44, [], ["b", "a", "d"], fmt=ext))
+            tabtext = tabtotext.tabtextfile(filename, where=["b>1"])
+            rows, headers = tabtotext.tabrowsfile(filename, where=["b>1"])
+            self.assertNotIsInstance(rows, list)
+            self.assertEqual(tabtext.headers, headers)
+            self.assertEqual(tabtext.data, list(rows))
+            rows, headers = tabtotext.tabrowsfile(filename, where=["b>9"])
+            self.assertEqual([], list(rows))
+        self.rm_testdir()
+    #
     def test_4003(self) -> None:
         text = tabtotext.tabToCSV(test003)
         logg.debug("%s => %s", test003, text)
@@ -6708,7 +7424,7 @@ class TabToTextTest(unittest.TestCase):
     def test_6664(self) -> None:
         text = tabtotext.tabtoGFM(table33, ["a|b"], ["b|c>2021-12-31|#"])
         logg.debug("%s => %s", table33, text.splitlines())
-        cond = ['| b     | c          | #', '| ----- | ---------- | -']
+        cond = ['| b     | c     | #', '| ----- | ----- | -']  # rejected rows have no widths
         self.assertEqual(cond, text.splitlines())
     def test_6665(self) -> None:
         text = tabtotext.tabtoGFM(table33, ["a|b"], ["b|c<=2021-12-31|#"])
@@ -11337,6 +12053,138 @@ class TabToTextTest(unittest.TestCase):
         cond = ['a;wide', ';', 'x;3.0in', 'y;1.0in', 'y;2.0in']
         self.assertEqual(cond, text.splitlines())
         self.rm_testdir()
+    def test_9101(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "table44.csv")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoCSV(table44))
+        want = sh(F"{TABTO} -^ {filename} @csv b a")
+        text = sh(F"{TABTO} -^ --sortrows=2 {filename} @csv b a")
+        logg.info("text = %s", text)
+        cond = ['b;a', '1;y', '2;y', '3;x', '~;~']
+        self.assertEqual(cond, text.splitlines())
+        self.assertEqual(want, text)
+        self.rm_testdir()
+    def test_9102(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "table44.csv")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoCSV(table44))
+        text = sh(F"{TABTO} -^ --limit=2 {filename} @csv b a")
+        logg.info("text = %s", text)
+        cond = ['b;a', '1;y', '2;y']
+        self.assertEqual(cond, text.splitlines())
+        text = sh(F"{TABTO} -^ {filename} @csv b a @limit=2 @offset=1")
+        logg.info("text = %s", text)
+        cond = ['b;a', '2;y', '3;x']
+        self.assertEqual(cond, text.splitlines())
+        self.rm_testdir()
+    def test_9103(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "table44.csv")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoCSV(table44))
+        for fmt in ["csv", "md"]:
+            want = sh(F"{TABTO} -^ {filename} @{fmt} b a")
+            text = sh(F"{TABTO} -^ --workers=2 {filename} @{fmt} b a")
+            logg.info("text = %s", text)
+            self.assertEqual(want, text)
+        self.rm_testdir()
+    def test_9104(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "table44.csv")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoCSV(table44))
+        text = sh(F"{TABTO} -^ --where 'b>1' {filename} @csv b a")
+        logg.info("text = %s", text)
+        cond = ['b;a', '2;y', '3;x']
+        self.assertEqual(cond, text.splitlines())
+        text = sh(F"{TABTO} -^ -W 'b>1' -W 'a=~x' {filename} @csv b a")
+        cond = ['b;a', '3;x']
+        self.assertEqual(cond, text.splitlines())
+        self.rm_testdir()
+    def test_9105(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "table44.csv")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoCSV(table44 + table44))
+        text = sh(F"{TABTO} -^ {filename} @csv a")
+        logg.info("text = %s", text)
+        self.assertEqual(9, len(text.splitlines()))
+        text = sh(F"{TABTO} -^ --distinct {filename} @csv a")
+        logg.info("text = %s", text)
+        cond = ['a', '~', 'x', 'y']
+        self.assertEqual(cond, text.splitlines())
+        text = sh(F"{TABTO} -^ {filename} @csv a @distinct")
+        self.assertEqual(cond, text.splitlines())
+        self.rm_testdir()
+    def test_9106(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "table44.csv")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoCSV(table44))
+        output1 = path.join(tmp, "output.md")
+        output2 = path.join(tmp, "output.json")
+        output3 = path.join(tmp, "output.xlsx")
+        sh(F"{TABTO} -^ -o {output1} -o {output2} -o {output3} {filename} b a 'b>1'")
+        text = open(output1).read()
+        logg.info("text = %s", text)
+        cond = ['| b     | a', '| ----- | -----', '| 2     | y', '| 3     | x']
+        self.assertEqual(cond, text.splitlines())
+        text = open(output2).read()
+        cond = ['[', ' {"b": 2, "a": "y"},', ' {"b": 3, "a": "x"}', ']']
+        self.assertEqual(cond, text.splitlines())
+        back = tabtotext.readFromFile(output3)
+        self.assertEqual([{"b": 2, "a": "y"}, {"b": 3, "a": "x"}], back)
+        self.rm_testdir()
+    def test_9107(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "table44.csv")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoCSV(table44))
+        output = path.join(tmp, "output.md")
+        sh(F"{TABTO} -^ -o {output} --stats {filename} b a 'b>1' 2> {tmp}/stats.json")
+        text = open(output).read()
+        cond = ['| b     | a', '| ----- | -----', '| 2     | y', '| 3     | x']
+        self.assertEqual(cond, text.splitlines())
+        info = json.loads(open(F"{tmp}/stats.json").read())
+        logg.debug("stats = %s", info)
+        self.assertEqual(4, info["counts"]["rows_read"])
+        self.assertEqual(2, info["counts"]["rows_filtered"])
+        self.assertEqual(2, info["counts"]["rows_out"])
+        self.assertEqual(os.path.getsize(filename), info["counts"]["bytes_read"])
+        self.assertEqual(len(text.encode("utf-8")), info["counts"]["bytes_written"])
+        self.rm_testdir()
+    def test_9108(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "table44.csv")
+        with open(filename, "w") as f:
+            f.write(tabtotext.tabtoCSV(table44))
+        output = path.join(tmp, "output.md")
+        sh(F"{TABTO} -^ -o {output} --memprofile --memtop 2 {filename} b a 'b>1' 2> {tmp}/memory.txt")
+        text = open(output).read()
+        cond = ['| b     | a', '| ----- | -----', '| 2     | y', '| 3     | x']
+        self.assertEqual(cond, text.splitlines())
+        report = open(F"{tmp}/memory.txt").read()
+        logg.debug("report = %s", report)
+        phases = [line.split()[0] for line in report.splitlines() if not line.startswith(" ")]
+        self.assertIn("read", phases)
+        self.assertIn("render", phases)
+        self.rm_testdir()
+    def test_9109(self) -> None:
+        tmp = self.testdir()
+        filename = path.join(tmp, "input.csv")
+        text = "a;b;c;d\n007;1.50;~;12:30\nx;;(yes);2024-01-02\n"
+        with open(filename, "w") as f:
+            f.write(text)
+        output = path.join(tmp, "output.csv")
+        sh(F"{TABTO} -^ -o {output} --raw {filename}")
+        self.assertEqual(text, open(output).read())
+        output = path.join(tmp, "output.md")
+        sh(F"{TABTO} -^ -o {output} --raw {filename}")
+        have = list(tabtotext.DictParserGFM(raw=True).load(output))
+        self.assertEqual(list(tabtotext.DictParserCSV(raw=True).loads(text)), have)
+        self.rm_testdir()
 
 if __name__ == "__main__":
     # unittest.main()
@@ -10,10 +10,11 @@ __copyright__ = "(C) 2017-2024 Guido Draheim, licensed under the Apache License
 __version__ = "1.6.3321"
 
 import logging
-from typing import Union, Dict, List, Any, Sequence, Iterable
+import os
+from typing import Optional, Union, Dict, List, Any, Sequence, Iterable
 from tabtotext import JSONList, JSONDict, TabText, strNone
-from tabtotext import ColSortList, RowSortList, LegendList, RowSortCallable, ColSortCallable, unmatched
-from tabtotext import FormatCSV, FormatJSONItem, FormatsDict
+from tabtotext import ColSortList, RowSortList, LegendList, RowSortCallable, ColSortCallable, RowSorter, RowFilterCallable, tabrejected, tabdistinct
+from tabtotext import FormatCSV, FormatJSONItem, FormatsDict, TabSpec, tabspec, tabfreeformats, TabStats
 from tabtools import currency_default
 
 try:
@@ -100,217 +101,98 @@ def saveToXLSX(filename: str, result: JSONList,
                    reorder=reorder, sorts=sorting, formatter=formatter)
 
 def tabtoXLSX(filename: str, data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
-              *, legend: List[str] = [], minwidth: int = 0) -> str:
-    return save_tabtoXLSX(filename, data, headers, selected, legend=legend)
+              *, legend: List[str] = [], minwidth: int = 0,
+              limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, distinct: bool = False,
+              stats: Optional[TabStats] = None) -> str:
+    return save_tabtoXLSX(filename, data, headers, selected, legend=legend, limit=limit, offset=offset, spec=spec,
+                          distinct=distinct, stats=stats)
 
 def save_tabtoXLSX(filename: str, data: Iterable[JSONDict], headers: List[str] = [], selected: List[str] = [],  # ..
                    *, legend: LegendList = [], minwidth: int = 0,
-                   reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {}) -> str:
+                   reorder: ColSortList = [], sorts: RowSortList = [], formatter: FormatsDict = {},
+                   limit: int = 0, offset: int = 0, spec: Optional[TabSpec] = None, distinct: bool = False,
+                   stats: Optional[TabStats] = None) -> str:
     minwidth = minwidth or MINWIDTH
     logg.debug("tabtoXLSX:")
-    renameheaders: Dict[str, str] = {}
-    showheaders: List[str] = []
-    sortheaders: List[str] = []
-    formats: Dict[str, str] = {}
-    combine: Dict[str, List[str]] = {}
-    freehdrs: Dict[str, str] = {}
-    for header in headers:
-        combines = ""
-        for selheader in header.split("|"):
-            if "@" in selheader:
-                selcol, rename = selheader.split("@", 1)
-            else:
-                selcol, rename = selheader, ""
-            if "{" in selcol and "{:" not in selcol:
-                names3: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon3, brace3 = freepart.find(":"), freepart.find("}")
-                    if brace3 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end3 = brace3 if colon3 == -1 else min(colon3, brace3)
-                    name3 = freepart[:end3]
-                    names3.append(name3)
-                name = " ".join(names3)
-                freehdrs[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmt = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmt.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            showheaders += [name]  # headers make a default column order
-            if rename:
-                sortheaders += [name]  # headers does not sort anymore
-            if not combines:
-                combines = name
-            elif combines not in combine:
-                combine[combines] = [name]
-            elif name not in combine[combines]:
-                combine[combines] += [name]
-            if rename:
-                renameheaders[name] = rename
-    logg.debug("renameheaders = %s", renameheaders)
-    logg.debug("sortheaders = %s", sortheaders)
-    logg.debug("formats = %s", formats)
-    logg.debug("combine = %s", combine)
-    logg.debug("freehdrs = %s", freehdrs)
-    combined: Dict[str, List[str]] = {}
-    renaming: Dict[str, str] = {}
-    filtered: Dict[str, str] = {}
-    selcols: List[str] = []
-    freecols: Dict[str, str] = {}
-    for selecheader in selected:
-        combines = ""
-        for selec in selecheader.split("|"):
-            if "@" in selec:
-                selcol, rename = selec.split("@", 1)
-            else:
-                selcol, rename = selec, ""
-            if "{" in selcol and "{:" not in selcol:
-                names4: List[str] = []
-                freeparts = selcol.split("{")
-                for freepart in freeparts[1:]:
-                    colon4, brace4 = freepart.find(":"), freepart.find("}")
-                    if brace4 == -1:
-                        logg.error("no closing '}' for '{%s' in %s", freepart, selcol)
-                        continue
-                    end4 = brace4 if colon4 == -1 else min(colon4, brace4)
-                    name4 = freepart[:end4]
-                    names4.append(name4)
-                name = " ".join(names4)
-                freecols[name] = selcol
-            elif ":" in selcol:
-                name, form = selcol.split(":", 1)
-                if isinstance(formats, dict):
-                    fmt = form if "{" in form else ("{:" + form + "}")
-                    formats[name] = fmt.replace("i}", "n}").replace("u}", "n}").replace("r}", "s}").replace("a}", "s}")
-            else:
-                name = selcol
-            if "<" in name:
-                name, cond = name.split("<", 1)
-                filtered[name] = "<" + cond
-            elif ">" in name:
-                name, cond = name.split(">", 1)
-                filtered[name] = ">" + cond
-            elif "=" in name:
-                name, cond = name.split("=", 1)
-                filtered[name] = "=" + cond
-            selcols.append(name)
-            if rename:
-                renaming[name] = rename
-            if not combines:
-                combines = name
-            elif combines not in combined:
-                combined[combines] = [name]
-            elif combines not in combined[combines]:
-                combined[combines] += [name]
-    logg.debug("combined = %s", combined)
-    logg.debug("renaming = %s", renaming)
-    logg.debug("filtered = %s", filtered)
-    logg.debug("selcols = %s", selcols)
-    logg.debug("freecols = %s", freecols)
-    if not selected:
-        combined = combine  # argument
-        freecols = freehdrs
-        renaming = renameheaders
-        logg.debug("combined : %s", combined)
-        logg.debug("freecols : %s", freecols)
-        logg.debug("renaming : %s", renaming)
-    newsorts: Dict[str, str] = {}
-    colnames: Dict[str, str] = {}
-    for name, rename in renaming.items():
-        if "@" in rename:
-            newname, newsort = rename.split("@", 1)
-        elif rename and rename[0].isalpha():
-            newname, newsort = rename, ""
-        else:
-            newname, newsort = "", rename
-        if newname:
-            colnames[name] = newname
-            if name in formats:
-                formats[newname] = formats[name]
-        if newsort:
-            newsorts[name] = newsort
-    logg.debug("newsorts = %s", newsorts)
-    logg.debug("colnames = %s", colnames)
-    if sorts:
-        sortcolumns = sorts
-    else:
-        sortcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols or sortheaders)]
-        if newsorts:
-            for num, name in enumerate(sortcolumns):
-                if name not in newsorts:
-                    newsorts[name] = ("@" * len(str(num)) + str(num))
-            sortcolumns = sorted(newsorts, key=lambda x: newsorts[x])
-            logg.debug("sortcolumns : %s", sortcolumns)
+    spec = tabspec(headers, selected) if spec is None else spec
+    if distinct:
+        data = tabdistinct(data, spec=spec)
+        if stats is not None:
+            data = stats.timed("distinct", data)
+    renameheaders, formats = spec.renameheaders, spec.formats
+    filtered, selcols, freecols, colnames = spec.filtered, spec.selcols, spec.freecols, spec.colnames
+    accept = RowFilterCallable(filtered) if filtered else None
+    sortcolumns = sorts if sorts else spec.sortcolumns
     format: FormatJSONItem
     if formatter and isinstance(formatter, FormatJSONItem):
         format = formatter
     else:
         logg.debug("formats = %s", formats)
         format = FormatCSV(formats)
+    if stats is not None:
+        format = stats.formatter(format)
+        if accept is not None:
+            accept = stats.filtering(accept)
+        previous = stats.enter("scan")
     if legend:
         logg.debug("legend is ignored for CSV output")
-    selcolumns = [(name if name not in colnames else colnames[name]) for name in (selcols)]
-    selheaders = [(name if name not in colnames else colnames[name]) for name in (showheaders)]
+    selcolumns = spec.selcolumns
+    selheaders = spec.selheaders
     sortkey = ColSortCallable(selcolumns or sorts or selheaders, reorder)
     sortrow = RowSortCallable(sortcolumns)
-    rows: List[JSONDict] = []
+    rows = RowSorter(sortrow, limit=limit, offset=offset)
     cols: Dict[str, int] = {}
+    freeformatted = tabfreeformats(spec, format, none="")
     for num, item in enumerate(data):
+        if accept is not None and not accept(item):
+            tabrejected(item, spec, cols, minwidth)
+            continue
         row: JSONDict = {}
         if "#" in selcols:
             row["#"] = num + 1
             cols["#"] = len(str(num + 1))
         logg.error("[%s]==> %s", num, item)
-        skip = False
         for name, value in item.items():
             selname = name
             if name in renameheaders and renameheaders[name] in selcols:
                 selname = renameheaders[name]
             if selcols and selname not in selcols and "*" not in selcols:
                 continue
-            try:
-                if name in filtered:
-                    skip = skip or unmatched(value, filtered[name])
-            except: pass
             colname = selname if selname not in colnames else colnames[selname]
             row[colname] = value  # do not format the value here!
             oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
             cols[colname] = max(oldlen, len(format(colname, value)))
         for freecol, freeformat in freecols.items():
             try:
-                freenames = freecol.split(" ")
-                freeitem: JSONDict = dict([(freename, "") for freename in freenames])
-                for name, value in item.items():
-                    itemname = name
-                    if name in renameheaders and renameheaders[name] in freenames:
-                        itemname = renameheaders[name]
-                    if itemname in freenames:
-                        freeitem[itemname] = format(name, value)
-                value = freeformat.format(**freeitem)
+                value = freeformatted[freecol](item)
                 colname = freecol if freecol not in colnames else colnames[freecol]
                 row[colname] = value
                 oldlen = cols[colname] if colname in cols else max(minwidth, len(colname))
                 cols[colname] = max(oldlen, len(value))
             except Exception as e:
                 logg.info("formatting '%s' at %s bad for:\n\t%s", freeformat, e, item)
-        if not skip:
-            rows.append(row)
+        rows.append(row)
     if isinstance(legend, dict):
         newlegend = OrderedDict()
         for name in sorted(legend.keys(), key=sortkey):
             newlegend[name] = legend[name]
         legend = newlegend
     #
-    sortedrows = list(sorted(rows, key=sortrow))
+    if stats is not None:
+        stats.enter("sort")
+    sortedrows = list(rows)
     sortedcols = list(sorted(cols.keys(), key=sortkey))
     workbook: Workbook  # type: ignore[no-any-unimported]
+    if stats is not None:
+        stats.count("rows_out", len(sortedrows))
+        stats.enter("render")
     workbook = make_workbook(sortedrows, sortedcols, cols, formats, legend)
+    if stats is not None:
+        stats.enter("write")
     workbook.save(filename)
+    if stats is not None:
+        stats.enter(previous)
+        stats.count("bytes_written", os.path.getsize(filename))
     return "XLSX"
 
 def make_workbook(rows: JSONList, cols: List[str], colwidth: Dict[str, int],
@@ -392,10 +274,19 @@ def make_workbook(rows: JSONList, cols: List[str], colwidth: Dict[str, int],
                 set_cell(ws, row, 1, line, txt_style)
     return workbook
 
-def readFromXLSX(filename: str) -> JSONList:
-    tabtext = tabtextfileXLSX(filename)
+def readFromXLSX(filename: str, *, stats: Optional[TabStats] = None) -> JSONList:
+    tabtext = tabtextfileXLSX(filename, stats=stats)
     return tabtext.data
-def tabtextfileXLSX(filename: str) -> TabText:
+def tabtextfileXLSX(filename: str, *, stats: Optional[TabStats] = None) -> TabText:
+    if stats is not None:
+        previous = stats.enter("read")
+        try:
+            tabtext = tabtextfileXLSX(filename)
+        finally:
+            stats.enter(previous)
+        stats.count("rows_read", len(tabtext.data))
+        stats.count("bytes_read", os.path.getsize(filename))
+        return tabtext
     workbook = load_workbook(filename)
     ws = workbook.active
     cols = []